@@ -0,0 +1,118 @@
+from array import array
+
+from custos import custos_sob_demanda
+from jogo_tabuleiro_rafael import reconstruir_caminho
+from tabuleiro_compacto import DIRECOES, grade_plana
+
+def astar_baldes(tabuleiro, inicio, destino, estatisticas=None, custos=None, heuristica=True):
+    """
+    A* (ou Dijkstra) com fila de baldes no lugar do heap.
+
+    Com custos inteiros pequenos, as prioridades f também são inteiras e, com
+    uma heurística consistente, nunca diminuem. Então basta uma lista circular
+    de baldes, um por valor de f: inserir e retirar custam O(1), em vez do
+    O(log n) do heap, e o custo de um terreno caro não pesa na fila. Dentro de
+    um balde sai primeiro a célula inserida por último, o que favorece as mais
+    avançadas nos empates.
+
+    Args:
+        tabuleiro: Tabuleiro compacto ou matriz representando o tabuleiro
+        inicio: Tupla (linha, coluna) da posição inicial
+        destino: Tupla (linha, coluna) da posição de destino
+        estatisticas: EstatisticasBusca que recebe os contadores da busca (opcional)
+        custos: TabelaCustos ou custos por célula (padrão: 'X' bloqueia, o resto custa 1)
+        heuristica: Se False, não usa heurística (algoritmo de Dijkstra com baldes)
+
+    Returns:
+        Lista de tuplas representando o caminho de menor custo do início ao
+        destino, ou None se não houver caminho possível
+    """
+    if estatisticas is None:
+        return _busca_baldes(tabuleiro, inicio, destino, None, custos, heuristica)
+    return estatisticas.medir(_busca_baldes, tabuleiro, inicio, destino, estatisticas, custos, heuristica)
+
+def _busca_baldes(tabuleiro, inicio, destino, estatisticas=None, custos=None, heuristica=True):
+    """
+    Núcleo do A* com fila de baldes.
+
+    Returns:
+        Caminho (lista de tuplas) ou None
+    """
+    linhas, colunas, celulas = grade_plana(tabuleiro)
+    # Custo de cada célula consultado só quando a busca chega a ela
+    fonte, tabela, menor_custo, maior_custo = custos_sob_demanda(celulas, custos)
+    linha_destino, coluna_destino = destino
+    peso = menor_custo if heuristica else 0
+
+    total = linhas * colunas
+    melhor_custo = array('i', [-1]) * total
+    antecessor = array('i', [-1]) * total
+    visitados = bytearray(total)
+
+    indice_inicio = inicio[0] * colunas + inicio[1]
+    indice_destino = linha_destino * colunas + coluna_destino
+    melhor_custo[indice_inicio] = 0
+
+    # De um nó para o vizinho, f aumenta no máximo custo do vizinho + variação
+    # da heurística: com esta largura, os valores de f pendentes nunca se
+    # sobrepõem na lista circular e cada balde guarda um único valor de f
+    largura = maior_custo + peso + 1
+    baldes = [[] for _ in range(largura)]
+    f_atual = (abs(inicio[0] - linha_destino) + abs(inicio[1] - coluna_destino)) * peso
+    baldes[f_atual % largura].append(indice_inicio)
+    pendentes = 1
+    insercoes = 1
+
+    expansoes = obsoletas = 0
+    medir = estatisticas is not None
+    pico_fronteira = profundidade_maxima = 0
+    caminho = None
+
+    while pendentes:
+        if medir and pendentes > pico_fronteira:
+            pico_fronteira = pendentes
+        # Avança até o próximo balde não vazio
+        balde = baldes[f_atual % largura]
+        while not balde:
+            f_atual += 1
+            balde = baldes[f_atual % largura]
+        atual = balde.pop()
+        pendentes -= 1
+
+        if visitados[atual]:
+            obsoletas += 1
+            continue
+        visitados[atual] = 1
+        expansoes += 1
+        custo_g = melhor_custo[atual]
+        if medir and custo_g > profundidade_maxima:
+            profundidade_maxima = custo_g
+
+        if atual == indice_destino:
+            caminho = reconstruir_caminho(antecessor, colunas, indice_destino)
+            break
+
+        linha, coluna = divmod(atual, colunas)
+        for dr, dc in DIRECOES:
+            nr, nc = linha + dr, coluna + dc
+            if 0 <= nr < linhas and 0 <= nc < colunas:
+                vizinho = nr * colunas + nc
+                custo_celula = tabela[fonte[vizinho]]
+                if not custo_celula:
+                    continue
+                novo_custo_g = custo_g + custo_celula
+                custo_conhecido = melhor_custo[vizinho]
+                if custo_conhecido != -1 and custo_conhecido <= novo_custo_g:
+                    continue
+                melhor_custo[vizinho] = novo_custo_g
+                antecessor[vizinho] = atual
+                novo_f = novo_custo_g + (abs(nr - linha_destino) + abs(nc - coluna_destino)) * peso
+                baldes[novo_f % largura].append(vizinho)
+                pendentes += 1
+                insercoes += 1
+
+    if medir:
+        estatisticas.registrar(expansoes=expansoes, insercoes=insercoes,
+                               remocoes=expansoes + obsoletas, remocoes_obsoletas=obsoletas,
+                               pico_fronteira=pico_fronteira, profundidade_maxima=profundidade_maxima)
+    return caminho
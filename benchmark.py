@@ -0,0 +1,717 @@
+import heapq
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from carregador import abrir, salvar_binario, salvar_texto
+from componentes import ComponentesConexas
+from custos import TabelaCustos
+from estatisticas import EstatisticasBusca
+from gerador import gerar_consultas, gerar_tabuleiro
+from baldes import astar_baldes
+from bidirecional import astar_bidirecional
+from jogo_tabuleiro_rafael import astar, backtracking, distancia_manhattan, movimento_valido
+from hierarquico import GrafoHierarquico
+from jps import astar_jps, comparar_expansoes
+from marcos import MarcosALT
+from multiagente import colisoes, planejar_agentes
+from paralelo import resolver_paralelo
+from replanejamento import PlanejadorIncremental
+from tabuleiro_compacto import Tabuleiro
+
+def astar_original(tabuleiro, inicio, destino):
+    """
+    Versão original do A*, que copia o caminho inteiro em cada entrada do heap.
+    Mantida aqui apenas como referência para comparação de desempenho.
+
+    Args:
+        tabuleiro: Matriz representando o tabuleiro
+        inicio: Tupla (linha, coluna) da posição inicial
+        destino: Tupla (linha, coluna) da posição de destino
+
+    Returns:
+        Lista de tuplas representando o caminho, ou None se não houver caminho
+    """
+    direcoes = [(-1, 0), (0, 1), (1, 0), (0, -1)]
+    contador = 0
+    heap = [(distancia_manhattan(inicio, destino), contador, inicio, [inicio], 0)]
+    visitados = set()
+    melhor_custo = {inicio: 0}
+
+    while heap:
+        f_score, _, atual, caminho, custo_g = heapq.heappop(heap)
+        if atual in visitados:
+            continue
+        visitados.add(atual)
+        if atual == destino:
+            return caminho
+        for dr, dc in direcoes:
+            nr, nc = atual[0] + dr, atual[1] + dc
+            nova_posicao = (nr, nc)
+            if 0 <= nr < len(tabuleiro) and 0 <= nc < len(tabuleiro[0]):
+                if tabuleiro[nr][nc] != 'X':
+                    novo_custo_g = custo_g + 1
+                    if nova_posicao in melhor_custo and melhor_custo[nova_posicao] <= novo_custo_g:
+                        continue
+                    melhor_custo[nova_posicao] = novo_custo_g
+                    novo_f_score = novo_custo_g + distancia_manhattan(nova_posicao, destino)
+                    contador += 1
+                    heapq.heappush(heap, (novo_f_score, contador, nova_posicao, caminho + [nova_posicao], novo_custo_g))
+    return None
+
+# A versão original do Backtracking marca no tabuleiro as células já visitadas
+# ('*' e '+') e depende de movimento_valido tratá-las como bloqueadas
+_CUSTOS_ORIGINAL = TabelaCustos({'*': 0, '+': 0})
+
+def backtracking_original(tabuleiro, inicio, destino):
+    """
+    Versão original (recursiva) do Backtracking, cuja única poda é comparar a
+    profundidade atual com o tamanho do melhor caminho. Mantida como referência.
+
+    Args:
+        tabuleiro: Matriz representando o tabuleiro
+        inicio: Tupla (linha, coluna) da posição inicial
+        destino: Tupla (linha, coluna) da posição de destino
+
+    Returns:
+        Tupla (caminho ou None, número de nós expandidos)
+    """
+    direcoes = [(0, 1), (1, 0), (0, -1), (-1, 0)]
+    tabuleiro_copia = [linha[:] for linha in tabuleiro]
+    tabuleiro_copia[inicio[0]][inicio[1]] = '*'
+    caminho_atual = [inicio]
+    melhor_caminho = []
+    expansoes = 0
+
+    def explorar(linha_atual, coluna_atual, profundidade):
+        nonlocal expansoes
+        expansoes += 1
+        if melhor_caminho and len(melhor_caminho) <= profundidade:
+            return
+        if (linha_atual, coluna_atual) == destino:
+            if not melhor_caminho or profundidade < len(melhor_caminho):
+                melhor_caminho[:] = caminho_atual
+            return
+        for dr, dc in direcoes:
+            nova_linha, nova_coluna = linha_atual + dr, coluna_atual + dc
+            if movimento_valido(tabuleiro_copia, nova_linha, nova_coluna, _CUSTOS_ORIGINAL):
+                tabuleiro_copia[nova_linha][nova_coluna] = '+'
+                caminho_atual.append((nova_linha, nova_coluna))
+                explorar(nova_linha, nova_coluna, profundidade + 1)
+                tabuleiro_copia[nova_linha][nova_coluna] = ' '
+                caminho_atual.pop()
+
+    limite_anterior = sys.getrecursionlimit()
+    sys.setrecursionlimit(10000)
+    try:
+        explorar(inicio[0], inicio[1], 0)
+    finally:
+        sys.setrecursionlimit(limite_anterior)
+    return (melhor_caminho or None), expansoes
+
+def tabuleiro_serpentina(tamanho):
+    """
+    Cria um tabuleiro quadrado em forma de serpentina: paredes horizontais
+    alternadas que forçam um corredor longo (o pior caso para copiar caminhos).
+
+    Args:
+        tamanho: Número de linhas e colunas do tabuleiro
+
+    Returns:
+        Matriz 2D representando o tabuleiro
+    """
+    tabuleiro = [[' '] * tamanho for _ in range(tamanho)]
+    for linha in range(1, tamanho, 2):
+        for coluna in range(tamanho):
+            tabuleiro[linha][coluna] = 'X'
+        # Abre a passagem alternando entre a última e a primeira coluna
+        abertura = tamanho - 1 if linha % 4 == 1 else 0
+        tabuleiro[linha][abertura] = ' '
+    return tabuleiro
+
+def cronometrar(funcao, *args, repeticoes=3):
+    """
+    Executa a função algumas vezes e devolve o menor tempo observado.
+
+    Args:
+        funcao: Função a ser medida
+        *args: Argumentos repassados à função
+        repeticoes: Quantidade de execuções
+
+    Returns:
+        Tupla (resultado, melhor_tempo_em_segundos)
+    """
+    melhor_tempo = None
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao(*args)
+        decorrido = time.perf_counter() - inicio
+        if melhor_tempo is None or decorrido < melhor_tempo:
+            melhor_tempo = decorrido
+    return resultado, melhor_tempo
+
+def comparar_astar(tamanhos):
+    """
+    Compara o A* com tabela de antecessores com a versão original que copia caminhos.
+
+    Args:
+        tamanhos: Lista com os tamanhos de tabuleiro a medir
+    """
+    print("=== A*: tabela de antecessores x cópia de caminhos ===")
+    print(f"{'tamanho':>8} {'passos':>9} {'original (s)':>13} {'novo (s)':>10} {'ganho':>7}")
+    for tamanho in tamanhos:
+        tabuleiro = tabuleiro_serpentina(tamanho)
+        inicio = (0, 0)
+        destino = (tamanho - 1, tamanho - 1) if tamanho % 2 == 1 else (tamanho - 2, 0)
+
+        caminho_original, tempo_original = cronometrar(astar_original, tabuleiro, inicio, destino)
+        caminho_novo, tempo_novo = cronometrar(astar, tabuleiro, inicio, destino)
+
+        # As duas versões devem devolver exatamente o mesmo caminho
+        assert caminho_original == caminho_novo
+
+        passos = len(caminho_novo) - 1 if caminho_novo else 0
+        print(f"{tamanho:>8} {passos:>9} {tempo_original:>13.4f} {tempo_novo:>10.4f} {tempo_original / tempo_novo:>6.1f}x")
+
+def comparar_backtracking(tamanhos):
+    """
+    Compara os nós expandidos pelo Backtracking iterativo com podas e pela
+    versão recursiva original, em tabuleiros abertos (sem obstáculos).
+
+    Args:
+        tamanhos: Lista com os tamanhos de tabuleiro a medir (a versão original
+                  é exponencial, então use tabuleiros pequenos)
+    """
+    print("\n=== Backtracking: podas iterativas x recursão original ===")
+    print(f"{'tamanho':>8} {'nós original':>13} {'nós novo':>9} {'original (s)':>13} {'novo (s)':>10}")
+    for tamanho in tamanhos:
+        tabuleiro = [[' '] * tamanho for _ in range(tamanho)]
+        inicio = (tamanho - 1, 0)
+        destino = (0, tamanho - 1)
+
+        (caminho_original, nos_original), tempo_original = cronometrar(
+            backtracking_original, tabuleiro, inicio, destino, repeticoes=1)
+        estatisticas = EstatisticasBusca()
+        caminho_novo = backtracking(tabuleiro, inicio, destino, estatisticas=estatisticas)
+        nos_novo, tempo_novo = estatisticas.expansoes, estatisticas.tempo
+
+        # Os dois devem encontrar caminhos de mesmo comprimento (o mais curto)
+        assert len(caminho_original) == len(caminho_novo)
+
+        print(f"{tamanho:>8} {nos_original:>13} {nos_novo:>9} {tempo_original:>13.4f} {tempo_novo:>10.4f}")
+
+def comparar_paralelo(tamanho, consultas, semente=0):
+    """
+    Mede a escala do resolvedor paralelo com 1, 2, 4, ... processos.
+
+    Args:
+        tamanho: Número de linhas e colunas do tabuleiro aleatório
+        consultas: Número de consultas (início, destino) aleatórias
+        semente: Semente do gerador aleatório
+    """
+    gerador = random.Random(semente)
+    tabuleiro = Tabuleiro(tamanho, tamanho)
+    for indice in range(tamanho * tamanho):
+        if gerador.random() < 0.2:
+            tabuleiro.celulas[indice] = ord('X')
+    pares = []
+    for _ in range(consultas):
+        inicio = (gerador.randrange(tamanho), gerador.randrange(tamanho))
+        destino = (gerador.randrange(tamanho), gerador.randrange(tamanho))
+        tabuleiro[inicio] = tabuleiro[destino] = ' '
+        pares.append((inicio, destino))
+
+    print(f"\n=== Resolvedor paralelo: {consultas} consultas em {tamanho}x{tamanho} ===")
+    print(f"{'processos':>10} {'tempo (s)':>10} {'aceleração':>11}")
+    processos = 1
+    tempo_base = None
+    while processos <= (os.cpu_count() or 1):
+        _, tempo = cronometrar(lambda: list(resolver_paralelo(tabuleiro, pares, processos)), repeticoes=1)
+        tempo_base = tempo_base or tempo
+        print(f"{processos:>10} {tempo:>10.3f} {tempo_base / tempo:>10.1f}x")
+        processos *= 2
+
+def comparar_replanejamento(tamanho, passos, mudancas_por_passo, semente=0):
+    """
+    Mede o custo de replanejar a cada passo com o PlanejadorIncremental (D* Lite)
+    em comparação com rodar o A* do zero, enquanto algumas células mudam a cada
+    passo. Também confere, a cada passo, que o caminho reparado tem o mesmo
+    comprimento do caminho de um A* novo.
+
+    Args:
+        tamanho: Número de linhas e colunas do tabuleiro aleatório
+        passos: Número de passos simulados
+        mudancas_por_passo: Quantas células mudam entre livre e obstáculo por passo
+        semente: Semente do gerador aleatório
+    """
+    gerador = random.Random(semente)
+    tabuleiro = Tabuleiro(tamanho, tamanho)
+    for indice in range(tamanho * tamanho):
+        if gerador.random() < 0.2:
+            tabuleiro.celulas[indice] = ord('X')
+    posicao, destino = (0, 0), (tamanho - 1, tamanho - 1)
+    tabuleiro[posicao] = tabuleiro[destino] = ' '
+
+    planejador = PlanejadorIncremental(tabuleiro, posicao, destino)
+    inicio = time.perf_counter()
+    planejador.proximo_passo(posicao)
+    tempo_inicial = time.perf_counter() - inicio
+
+    tempo_incremental = tempo_astar = 0.0
+    for _ in range(passos):
+        inicio = time.perf_counter()
+        for _ in range(mudancas_por_passo):
+            celula = (gerador.randrange(tamanho), gerador.randrange(tamanho))
+            if celula not in (posicao, destino):
+                planejador.atualizar_celula(celula[0], celula[1], gerador.random() < 0.5)
+        proximo = planejador.proximo_passo(posicao)
+        tempo_incremental += time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        caminho_novo = astar(tabuleiro, posicao, destino)
+        tempo_astar += time.perf_counter() - inicio
+
+        caminho_reparado = planejador.caminho(posicao)
+        assert (caminho_reparado is None) == (caminho_novo is None)
+        if caminho_reparado is not None:
+            assert len(caminho_reparado) == len(caminho_novo)
+        if proximo is not None and proximo != destino:
+            posicao = proximo
+
+    # Posição do agente bloqueada (a atual e uma para onde ele salta): como no
+    # A*, o caminho sai dela por uma vizinha livre
+    bloqueada = divmod(tabuleiro.celulas.index(ord('X')), tamanho)
+    if posicao != destino:
+        planejador.atualizar_celula(posicao[0], posicao[1], True)
+    for celula in (posicao, bloqueada):
+        caminho_reparado = planejador.caminho(celula)
+        caminho_novo = astar(tabuleiro, celula, destino)
+        assert (caminho_reparado is None) == (caminho_novo is None)
+        if caminho_reparado is not None:
+            assert len(caminho_reparado) == len(caminho_novo)
+
+    print(f"\n=== Replanejamento incremental: {tamanho}x{tamanho}, {mudancas_por_passo} mudanças por passo ===")
+    print(f"busca inicial (D* Lite):   {tempo_inicial * 1000:10.2f} ms")
+    print(f"por passo (D* Lite):       {tempo_incremental / passos * 1000:10.2f} ms")
+    print(f"por passo (A* do zero):    {tempo_astar / passos * 1000:10.2f} ms")
+
+def comparar_jps(tamanho, densidades, consultas=20, semente=0):
+    """
+    Compara nós expandidos e tempo do A* comum e do A* com Jump Point Search,
+    de canto a canto e em consultas aleatórias, em tabuleiros aleatórios com
+    diferentes densidades de obstáculos. Confere que os caminhos do JPS têm o
+    mesmo comprimento dos do A* e informa em que densidades o JPS foi mais rápido.
+
+    Args:
+        tamanho: Número de linhas e colunas dos tabuleiros
+        densidades: Lista de frações de células bloqueadas
+        consultas: Número de consultas (início, destino) aleatórias por densidade
+        semente: Semente do gerador aleatório
+    """
+    print(f"\n=== A* x Jump Point Search: {tamanho}x{tamanho} ===")
+    print(f"{'densidade':>10} {'nós A*':>8} {'nós JPS':>8} {'A* (s)':>8} {'JPS (s)':>8} "
+          f"{'A* aleat. (s)':>14} {'JPS aleat. (s)':>15}")
+    vantajosas = []
+    for densidade in densidades:
+        gerador = random.Random(semente)
+        tabuleiro = Tabuleiro(tamanho, tamanho)
+        for indice in range(tamanho * tamanho):
+            if gerador.random() < densidade:
+                tabuleiro.celulas[indice] = ord('X')
+        inicio, destino = (0, 0), (tamanho - 1, tamanho - 1)
+        tabuleiro[inicio] = tabuleiro[destino] = ' '
+
+        caminho_astar, tempo_astar = cronometrar(astar, tabuleiro, inicio, destino)
+        caminho_jps, tempo_jps = cronometrar(astar_jps, tabuleiro, inicio, destino)
+        assert (caminho_astar is None) == (caminho_jps is None)
+        assert caminho_astar is None or len(caminho_astar) == len(caminho_jps)
+
+        # Consultas aleatórias: o JPS deve achar caminhos tão curtos quanto os do A*
+        aleatorio_astar = aleatorio_jps = 0.0
+        for inicio_aleatorio, destino_aleatorio in gerar_consultas(tabuleiro, consultas, semente):
+            caminho_astar, tempo = cronometrar(astar, tabuleiro, inicio_aleatorio, destino_aleatorio,
+                                               repeticoes=1)
+            aleatorio_astar += tempo
+            caminho_jps, tempo = cronometrar(astar_jps, tabuleiro, inicio_aleatorio, destino_aleatorio,
+                                             repeticoes=1)
+            aleatorio_jps += tempo
+            assert (caminho_astar is None) == (caminho_jps is None)
+            assert caminho_astar is None or len(caminho_astar) == len(caminho_jps)
+        if aleatorio_jps < aleatorio_astar:
+            vantajosas.append(densidade)
+
+        expansoes = comparar_expansoes(tabuleiro, inicio, destino)
+        print(f"{densidade:>10.2f} {expansoes['astar']:>8} {expansoes['jps']:>8} "
+              f"{tempo_astar:>8.4f} {tempo_jps:>8.4f} {aleatorio_astar:>14.4f} {aleatorio_jps:>15.4f}")
+    if vantajosas:
+        print(f"JPS mais rápido que o A* nas consultas aleatórias com densidade "
+              f"{', '.join(f'{densidade:.2f}' for densidade in vantajosas)}")
+    else:
+        print("JPS mais lento que o A* nas consultas aleatórias em todas as densidades medidas")
+
+def comparar_hierarquico(tamanho, tamanho_cluster, consultas, semente=0):
+    """
+    Mede o pré-processamento e a latência das consultas do GrafoHierarquico
+    (HPA*) contra o A*, e o quanto os caminhos ficam mais longos.
+
+    Args:
+        tamanho: Número de linhas e colunas do tabuleiro aleatório
+        tamanho_cluster: Lado dos clusters da abstração
+        consultas: Número de consultas (início, destino) aleatórias
+        semente: Semente do gerador aleatório
+    """
+    gerador = random.Random(semente)
+    tabuleiro = Tabuleiro(tamanho, tamanho)
+    for indice in range(tamanho * tamanho):
+        if gerador.random() < 0.2:
+            tabuleiro.celulas[indice] = ord('X')
+    pares = []
+    for _ in range(consultas):
+        inicio = (gerador.randrange(tamanho), gerador.randrange(tamanho))
+        destino = (gerador.randrange(tamanho), gerador.randrange(tamanho))
+        tabuleiro[inicio] = tabuleiro[destino] = ' '
+        pares.append((inicio, destino))
+
+    grafo, tempo_preparo = cronometrar(GrafoHierarquico, tabuleiro, tamanho_cluster, repeticoes=1)
+    tempo_hierarquico = tempo_astar = 0.0
+    passos_hierarquico = passos_astar = 0
+    for inicio, destino in pares:
+        caminho_hierarquico, tempo = cronometrar(grafo.caminho, inicio, destino, repeticoes=1)
+        tempo_hierarquico += tempo
+        caminho_astar, tempo = cronometrar(astar, tabuleiro, inicio, destino, repeticoes=1)
+        tempo_astar += tempo
+        assert (caminho_hierarquico is None) == (caminho_astar is None)
+        if caminho_astar is not None:
+            passos_hierarquico += len(caminho_hierarquico) - 1
+            passos_astar += len(caminho_astar) - 1
+
+    # Início bloqueado: como no A*, o caminho sai por uma célula vizinha livre
+    bloqueadas = [indice for indice in range(tamanho * tamanho) if tabuleiro.celulas[indice] == ord('X')]
+    for indice in gerador.sample(bloqueadas, min(consultas, len(bloqueadas))):
+        inicio = divmod(indice, tamanho)
+        destino = gerador.choice(pares)[1]
+        caminho_hierarquico = grafo.caminho(inicio, destino)
+        caminho_astar = astar(tabuleiro, inicio, destino)
+        assert (caminho_hierarquico is None) == (caminho_astar is None)
+        if caminho_astar is not None:
+            assert caminho_hierarquico[0] == inicio and caminho_hierarquico[-1] == destino
+
+    print(f"\n=== HPA* x A*: {tamanho}x{tamanho}, clusters de {tamanho_cluster} ===")
+    print(f"pré-processamento:         {tempo_preparo:10.3f} s")
+    print(f"consulta média (HPA*):     {tempo_hierarquico / consultas * 1000:10.2f} ms")
+    print(f"consulta média (A*):       {tempo_astar / consultas * 1000:10.2f} ms")
+    print(f"caminhos mais longos em:   {(passos_hierarquico / max(passos_astar, 1) - 1) * 100:10.1f} %")
+
+def memoria_alocada(funcao, *args):
+    """
+    Mede, com tracemalloc, quantos bytes continuam alocados pelo resultado da função.
+
+    Returns:
+        Tupla (resultado, bytes_alocados)
+    """
+    tracemalloc.start()
+    resultado = funcao(*args)
+    alocado, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, alocado
+
+def comparar_tabuleiros(tamanhos):
+    """
+    Compara a memória e o tempo do A* entre a lista de listas e o Tabuleiro compacto.
+
+    Args:
+        tamanhos: Lista com os tamanhos de tabuleiro a medir
+    """
+    print("\n=== Tabuleiro: lista de listas x buffer compacto ===")
+    print(f"{'tamanho':>8} {'lista (KiB)':>12} {'compacto (KiB)':>15} {'A* lista (s)':>13} {'A* compacto (s)':>16}")
+    for tamanho in tamanhos:
+        matriz, memoria_lista = memoria_alocada(tabuleiro_serpentina, tamanho)
+        compacto, memoria_compacta = memoria_alocada(Tabuleiro.de_lista, matriz)
+        inicio = (0, 0)
+        destino = (tamanho - 1, tamanho - 1) if tamanho % 2 == 1 else (tamanho - 2, 0)
+
+        caminho_lista, tempo_lista = cronometrar(astar, matriz, inicio, destino)
+        caminho_compacto, tempo_compacto = cronometrar(astar, compacto, inicio, destino)
+        assert caminho_lista == caminho_compacto
+
+        print(f"{tamanho:>8} {memoria_lista / 1024:>12.1f} {memoria_compacta / 1024:>15.1f} "
+              f"{tempo_lista:>13.4f} {tempo_compacto:>16.4f}")
+
+def comparar_carregador(tamanho, densidade=0.2, semente=0):
+    """
+    Compara o tempo de abertura e o tamanho em disco de um tabuleiro grande nos
+    formatos texto, binário (um byte por célula) e compactado (um bit por célula).
+
+    Args:
+        tamanho: Número de linhas e colunas do tabuleiro aleatório
+        densidade: Fração de células com obstáculo
+        semente: Semente do gerador aleatório
+    """
+    gerador = random.Random(semente)
+    tabuleiro = Tabuleiro(tamanho, tamanho)
+    for indice in range(tamanho * tamanho):
+        if gerador.random() < densidade:
+            tabuleiro.celulas[indice] = ord('X')
+    tabuleiro[0, 0] = tabuleiro[tamanho - 1, tamanho - 1] = ' '
+
+    print(f"\n=== Carregamento: {tamanho}x{tamanho} ===")
+    print(f"{'formato':>11} {'disco (KiB)':>12} {'abrir (s)':>10} {'A* (s)':>8}")
+    with tempfile.TemporaryDirectory() as pasta:
+        formatos = [
+            ('texto', salvar_texto, ()),
+            ('binário', salvar_binario, (False,)),
+            ('compactado', salvar_binario, (True,)),
+        ]
+        for nome, salvar, argumentos in formatos:
+            arquivo = os.path.join(pasta, nome)
+            salvar(tabuleiro, arquivo, *argumentos)
+            aberto, tempo_abrir = cronometrar(abrir, arquivo, repeticoes=1)
+            assert aberto == tabuleiro
+            _, tempo_astar = cronometrar(astar, aberto, (0, 0), (tamanho - 1, tamanho - 1), repeticoes=1)
+            print(f"{nome:>11} {os.path.getsize(arquivo) / 1024:>12.1f} {tempo_abrir:>10.4f} {tempo_astar:>8.3f}")
+            del aberto
+
+def comparar_bidirecional(tamanho, densidades, semente=1):
+    """
+    Compara nós expandidos e tempo do A* e do A* bidirecional de canto a canto,
+    em tabuleiros abertos com diferentes densidades e em um labirinto.
+
+    Args:
+        tamanho: Número de linhas e colunas dos tabuleiros (ímpar, para o labirinto
+                 ter corredores nos dois cantos)
+        densidades: Lista de frações de células bloqueadas
+        semente: Semente do gerador de tabuleiros
+    """
+    print(f"\n=== A* x A* bidirecional: {tamanho}x{tamanho}, de canto a canto ===")
+    print(f"{'tabuleiro':>10} {'nós A*':>8} {'nós bidir.':>10} {'A* (s)':>8} {'bidir. (s)':>10}")
+    cenarios = [(f"{densidade:.2f}", 'aberto', densidade) for densidade in densidades]
+    cenarios.append(('labirinto', 'labirinto', 0.0))
+    for nome, tipo, densidade in cenarios:
+        tabuleiro = gerar_tabuleiro(tamanho, tamanho, densidade, tipo, semente)
+        inicio, destino = (0, 0), (tamanho - 1, tamanho - 1)
+        tabuleiro[inicio] = tabuleiro[destino] = ' '
+
+        estatisticas_astar = EstatisticasBusca()
+        estatisticas_bidirecional = EstatisticasBusca()
+        caminho_astar = astar(tabuleiro, inicio, destino, estatisticas_astar)
+        caminho_bidirecional = astar_bidirecional(tabuleiro, inicio, destino, estatisticas_bidirecional)
+        assert (caminho_astar is None) == (caminho_bidirecional is None)
+        assert caminho_astar is None or len(caminho_astar) == len(caminho_bidirecional)
+
+        print(f"{nome:>10} {estatisticas_astar.expansoes:>8} {estatisticas_bidirecional.expansoes:>10} "
+              f"{estatisticas_astar.tempo:>8.4f} {estatisticas_bidirecional.tempo:>10.4f}")
+
+def comparar_custos(tamanho, semente=0):
+    """
+    Compara o A* com heap e o A* com fila de baldes em um tabuleiro com terrenos
+    de custos diferentes (lama, estrada e terreno comum), de canto a canto.
+
+    Args:
+        tamanho: Número de linhas e colunas do tabuleiro
+        semente: Semente do gerador aleatório
+    """
+    custos = TabelaCustos({'~': 5, '=': 1}, padrao=2)
+    gerador = random.Random(semente)
+    # Um byte aleatório por célula: 10% de obstáculos, 30% de lama, 30% de estrada
+    terrenos = bytes(ord('X') if byte < 26 else ord('~') if byte < 103 else ord('=') if byte < 180 else ord(' ')
+                     for byte in range(256))
+    tabuleiro = Tabuleiro(tamanho, tamanho, bytearray(gerador.randbytes(tamanho * tamanho).translate(terrenos)))
+    inicio, destino = (0, 0), (tamanho - 1, tamanho - 1)
+    tabuleiro[inicio] = tabuleiro[destino] = ' '
+
+    print(f"\n=== Terrenos com custos {custos}: {tamanho}x{tamanho} ===")
+    print(f"{'algoritmo':>18} {'custo':>7} {'nós':>8} {'tempo (s)':>10}")
+    algoritmos = [
+        ('A* (heap)', lambda estatisticas: astar(tabuleiro, inicio, destino, estatisticas, custos)),
+        ('A* (baldes)', lambda estatisticas: astar_baldes(tabuleiro, inicio, destino, estatisticas, custos)),
+        ('Dijkstra (baldes)', lambda estatisticas: astar_baldes(tabuleiro, inicio, destino, estatisticas,
+                                                               custos, heuristica=False)),
+    ]
+    custo_esperado = None
+    for nome, resolver in algoritmos:
+        estatisticas = EstatisticasBusca()
+        caminho = resolver(estatisticas)
+        custo = sum(custos.custo(tabuleiro[posicao]) for posicao in caminho[1:]) if caminho else None
+        custo_esperado = custo_esperado if custo_esperado is not None else custo
+        assert custo == custo_esperado
+        print(f"{nome:>18} {custo if custo is not None else '-':>7} {estatisticas.expansoes:>8} "
+              f"{estatisticas.tempo:>10.4f}")
+
+def comparar_marcos(tamanho, consultas, tamanho_todos_pares=40, semente=0):
+    """
+    Mede o pré-cálculo de marcos (ALT) e as consultas com ele contra o A*,
+    a gravação e a reabertura do pré-cálculo e, em um tabuleiro pequeno, a
+    consulta de distância na tabela de todos os pares.
+
+    Args:
+        tamanho: Número de linhas e colunas do tabuleiro aleatório
+        consultas: Número de consultas (início, destino) aleatórias
+        tamanho_todos_pares: Lado do tabuleiro usado para a tabela de todos os pares
+        semente: Semente do gerador aleatório
+    """
+    tabuleiro = gerar_tabuleiro(tamanho, tamanho, 0.2, semente=semente)
+    pares = gerar_consultas(tabuleiro, consultas, semente)
+    marcos, tempo_preparo = cronometrar(MarcosALT, tabuleiro, repeticoes=1)
+
+    estatisticas_astar = EstatisticasBusca()
+    estatisticas_alt = EstatisticasBusca()
+    for inicio, destino in pares:
+        caminho_astar = astar(tabuleiro, inicio, destino, estatisticas_astar)
+        caminho_alt = marcos.caminho(inicio, destino, estatisticas_alt)
+        assert (caminho_astar is None) == (caminho_alt is None)
+        assert caminho_astar is None or len(caminho_astar) == len(caminho_alt)
+    # Início igual ao destino numa célula bloqueada: o astar devolve o caminho trivial
+    bloqueada = divmod(tabuleiro.celulas.index(ord('X')), tamanho)
+    assert marcos.caminho(bloqueada, bloqueada) == astar(tabuleiro, bloqueada, bloqueada) == [bloqueada]
+    assert marcos.distancia(bloqueada, bloqueada) == 0
+
+    with tempfile.TemporaryDirectory() as pasta:
+        arquivo = os.path.join(pasta, 'marcos.alt')
+        _, tempo_salvar = cronometrar(marcos.salvar, arquivo, repeticoes=1)
+        _, tempo_carregar = cronometrar(MarcosALT.carregar, arquivo, tabuleiro, repeticoes=1)
+
+    print(f"\n=== Marcos (ALT) x A*: {tamanho}x{tamanho}, {len(marcos.marcos)} marcos ===")
+    print(f"pré-cálculo:               {tempo_preparo:10.3f} s")
+    print(f"salvar / carregar:         {tempo_salvar:10.4f} s / {tempo_carregar:.4f} s")
+    print(f"nós por consulta (A*):     {estatisticas_astar.expansoes / consultas:10.0f}")
+    print(f"nós por consulta (ALT):    {estatisticas_alt.expansoes / consultas:10.0f}")
+    print(f"consulta média (A*):       {estatisticas_astar.tempo / consultas * 1000:10.2f} ms")
+    print(f"consulta média (ALT):      {estatisticas_alt.tempo / consultas * 1000:10.2f} ms")
+
+    pequeno = gerar_tabuleiro(tamanho_todos_pares, tamanho_todos_pares, 0.2, semente=semente)
+    pares = gerar_consultas(pequeno, consultas, semente)
+    todos_pares, tempo_preparo = cronometrar(MarcosALT, pequeno, 8, None, True, repeticoes=1)
+    inicio_consultas = time.perf_counter()
+    for inicio, destino in pares:
+        todos_pares.distancia(inicio, destino)
+    tempo_consultas = time.perf_counter() - inicio_consultas
+    print(f"todos os pares ({tamanho_todos_pares}x{tamanho_todos_pares}): pré-cálculo {tempo_preparo:.3f} s, "
+          f"distância em {tempo_consultas / consultas * 1e6:.2f} µs")
+
+def comparar_multiagente(tamanho, quantidades, semente=0):
+    """
+    Mede o planejamento cooperativo de vários agentes em agentes por segundo,
+    conferindo que os caminhos não colidem.
+
+    Args:
+        tamanho: Número de linhas e colunas do tabuleiro aleatório
+        quantidades: Lista com os números de agentes a planejar
+        semente: Semente do gerador aleatório
+    """
+    tabuleiro = gerar_tabuleiro(tamanho, tamanho, 0.15, semente=semente)
+    pares = gerar_consultas(tabuleiro, max(quantidades) * 4, semente)
+    # Inícios e destinos diferentes entre si, como exige o planejamento
+    inicios, destinos, agentes = set(), set(), []
+    for inicio, destino in pares:
+        if inicio not in inicios and destino not in destinos:
+            inicios.add(inicio)
+            destinos.add(destino)
+            agentes.append((inicio, destino))
+
+    print(f"\n=== Vários agentes (A* cooperativo): {tamanho}x{tamanho} ===")
+    print(f"{'agentes':>8} {'tempo (s)':>10} {'agentes/s':>10} {'sem caminho':>12} {'espera total':>13}")
+    for quantidade in quantidades:
+        grupo = agentes[:quantidade]
+        caminhos, tempo = cronometrar(planejar_agentes, tabuleiro, grupo, repeticoes=1)
+        assert not colisoes(caminhos, grupo)
+        falhas = sum(caminho is None for caminho in caminhos)
+        # Instantes a mais que cada agente gastou em relação ao caminho sozinho
+        espera = sum(len(caminho) - len(astar(tabuleiro, inicio, destino))
+                     for (inicio, destino), caminho in zip(grupo, caminhos) if caminho)
+        print(f"{len(grupo):>8} {tempo:>10.3f} {len(grupo) / tempo:>10.0f} {falhas:>12} {espera:>13}")
+
+def comparar_componentes(tamanho, consultas, mudancas, semente=0):
+    """
+    Mede consultas sem caminho com e sem os rótulos de componentes conexas,
+    em um tabuleiro dividido ao meio por uma parede (cerca de metade das
+    consultas é impossível), e a atualização incremental dos rótulos contra
+    o cálculo completo.
+
+    Args:
+        tamanho: Número de linhas e colunas do tabuleiro aleatório
+        consultas: Número de consultas (início, destino) aleatórias
+        mudancas: Número de células alternadas entre livre e obstáculo
+        semente: Semente do gerador aleatório
+    """
+    tabuleiro = gerar_tabuleiro(tamanho, tamanho, 0.2, semente=semente)
+    for linha in range(tamanho):
+        tabuleiro[linha, tamanho // 2] = 'X'
+    pares = gerar_consultas(tabuleiro, consultas, semente)
+    componentes, tempo_preparo = cronometrar(ComponentesConexas, tabuleiro, repeticoes=1)
+
+    estatisticas_astar = EstatisticasBusca()
+    estatisticas_rotulos = EstatisticasBusca()
+    estatisticas_backtracking = EstatisticasBusca()
+    impossiveis = 0
+    for inicio, destino in pares:
+        caminho = astar(tabuleiro, inicio, destino, estatisticas_astar)
+        caminho_rotulos = astar(tabuleiro, inicio, destino, estatisticas_rotulos, componentes=componentes)
+        assert (caminho is None) == (caminho_rotulos is None)
+        if caminho is None:
+            impossiveis += 1
+            # Sem os rótulos, o Backtracking esgotaria a região alcançável inteira
+            assert backtracking(tabuleiro, inicio, destino, estatisticas=estatisticas_backtracking,
+                                componentes=componentes) is None
+
+    def conferir(atualizadas, tabuleiro, pares):
+        # Os rótulos atualizados devem separar as células exatamente como um
+        # cálculo completo (a menos da numeração) e responder igual às consultas
+        referencia = ComponentesConexas(tabuleiro)
+        correspondencia = {}
+        for linha in range(tabuleiro.linhas):
+            for coluna in range(tabuleiro.colunas):
+                esperado = referencia.componente(linha, coluna)
+                assert correspondencia.setdefault(atualizadas.componente(linha, coluna), esperado) == esperado
+        assert len(set(correspondencia.values())) == len(correspondencia)
+        for inicio, destino in pares:
+            assert atualizadas.alcancavel(inicio, destino) == referencia.alcancavel(inicio, destino)
+
+    aleatorio = random.Random(semente)
+    inicio_mudancas = time.perf_counter()
+    for _ in range(mudancas):
+        linha, coluna = aleatorio.randrange(tamanho), aleatorio.randrange(tamanho)
+        componentes.atualizar_celula(linha, coluna, tabuleiro[linha, coluna] != 'X')
+    tempo_mudancas = time.perf_counter() - inicio_mudancas
+    conferir(componentes, tabuleiro, pares)
+
+    # Conferência a cada mudança, num tabuleiro menor: um cálculo completo por
+    # mudança no tabuleiro grande dominaria o tempo do benchmark
+    lado = min(tamanho, 40)
+    pequeno = gerar_tabuleiro(lado, lado, 0.2, semente=semente)
+    for linha in range(lado):
+        pequeno[linha, lado // 2] = 'X'
+    pares_pequeno = gerar_consultas(pequeno, consultas, semente)
+    atualizadas = ComponentesConexas(pequeno)
+    for _ in range(mudancas):
+        linha, coluna = aleatorio.randrange(lado), aleatorio.randrange(lado)
+        atualizadas.atualizar_celula(linha, coluna, pequeno[linha, coluna] != 'X')
+        conferir(atualizadas, pequeno, pares_pequeno)
+
+    print(f"\n=== Componentes conexas: {tamanho}x{tamanho}, {impossiveis} de {consultas} consultas sem caminho ===")
+    print(f"rótulos iniciais:          {tempo_preparo:10.3f} s ({componentes.quantidade} componentes)")
+    print(f"A* sem rótulos:            {estatisticas_astar.tempo:10.3f} s, {estatisticas_astar.expansoes} nós")
+    print(f"A* com rótulos:            {estatisticas_rotulos.tempo:10.3f} s, {estatisticas_rotulos.expansoes} nós")
+    print(f"Backtracking sem caminho:  {estatisticas_backtracking.tempo:10.4f} s, "
+          f"{estatisticas_backtracking.expansoes} nós")
+    print(f"atualização incremental:   {tempo_mudancas / mudancas * 1e6:10.1f} µs por célula "
+          f"(cálculo completo: {tempo_preparo * 1e3:.1f} ms)")
+
+if __name__ == "__main__":
+    tamanhos = [int(valor) for valor in sys.argv[1:]] or [51, 101, 201, 301]
+    comparar_astar(tamanhos)
+    comparar_tabuleiros(tamanhos)
+    comparar_backtracking([3, 4, 5, 6, 7])
+    comparar_paralelo(200, 2000)
+    comparar_replanejamento(200, 100, 5)
+    comparar_jps(300, [0.0, 0.05, 0.2, 0.3])
+    comparar_bidirecional(301, [0.0, 0.1, 0.2, 0.3])
+    comparar_custos(500)
+    comparar_marcos(400, 50)
+    comparar_componentes(300, 100, 2000)
+    comparar_hierarquico(400, 32, 50)
+    comparar_multiagente(300, [50, 100, 300])
+    comparar_carregador(2000)
@@ -0,0 +1,151 @@
+import heapq
+from array import array
+
+from custos import custos_sob_demanda
+from jogo_tabuleiro_rafael import reconstruir_caminho
+from tabuleiro_compacto import DIRECOES, grade_plana
+
+def astar_bidirecional(tabuleiro, inicio, destino, estatisticas=None, custos=None):
+    """
+    A* bidirecional: busca a partir do início e do destino ao mesmo tempo.
+
+    As duas frentes usam a heurística "equilibrada": metade da diferença entre
+    as distâncias de Manhattan até a ponta oposta e até a própria origem. Como
+    as heurísticas das duas frentes se somam a zero, as frentes avançam uma em
+    direção à outra em vez de atravessar o tabuleiro inteiro cada uma. Sempre
+    que uma frente alcança uma célula já alcançada pela outra, o caminho que
+    passa por ela é um candidato; a busca para quando a soma das menores
+    prioridades das duas filas não é menor que o melhor candidato, porque
+    nenhum caminho ainda não visto pode ser mais curto. O caminho devolvido é
+    ótimo, como o do astar, e tem a mesma forma.
+
+    Args:
+        tabuleiro: Tabuleiro compacto ou matriz representando o tabuleiro
+        inicio: Tupla (linha, coluna) da posição inicial
+        destino: Tupla (linha, coluna) da posição de destino
+        estatisticas: EstatisticasBusca que recebe os contadores da busca (opcional)
+        custos: TabelaCustos ou custos por célula (padrão: 'X' bloqueia, o resto custa 1)
+
+    Returns:
+        Lista de tuplas representando o caminho de menor custo do início ao
+        destino, ou None se não houver caminho possível
+    """
+    if estatisticas is None:
+        return _busca_bidirecional(tabuleiro, inicio, destino, None, custos)
+    return estatisticas.medir(_busca_bidirecional, tabuleiro, inicio, destino, estatisticas, custos)
+
+def _busca_bidirecional(tabuleiro, inicio, destino, estatisticas=None, custos=None):
+    """
+    Núcleo do A* bidirecional.
+
+    Returns:
+        Caminho (lista de tuplas) ou None
+    """
+    linhas, colunas, celulas = grade_plana(tabuleiro)
+    # Custo de cada célula consultado só quando a busca chega a ela
+    fonte, tabela, menor_custo, _ = custos_sob_demanda(celulas, custos)
+    indice_inicio = inicio[0] * colunas + inicio[1]
+    indice_destino = destino[0] * colunas + destino[1]
+    if indice_inicio == indice_destino:
+        return [tuple(inicio)]
+    # Como no astar, o destino precisa estar livre (o início não)
+    if not tabela[fonte[indice_destino]]:
+        return None
+
+    total = linhas * colunas
+    # Índice 0: frente que parte do início; índice 1: frente que parte do destino
+    melhor_custo = (array('i', [-1]) * total, array('i', [-1]) * total)
+    antecessor = (array('i', [-1]) * total, array('i', [-1]) * total)
+    visitados = (bytearray(total), bytearray(total))
+    melhor_custo[0][indice_inicio] = 0
+    melhor_custo[1][indice_destino] = 0
+    linha_inicio, coluna_inicio = inicio
+    linha_destino, coluna_destino = destino
+
+    # Prioridades dobradas para ficarem inteiras: 2 * g + h_destino - h_inicio na
+    # frente do início e 2 * g + h_inicio - h_destino na frente do destino, com
+    # as distâncias h multiplicadas pelo menor custo de célula. Em
+    # empates vence o maior g (entradas (prioridade, -g, índice)): em áreas
+    # abertas muitas células empatam, e preferir as mais avançadas faz as
+    # frentes seguirem direto uma para a outra
+    distancia = (abs(linha_inicio - linha_destino) + abs(coluna_inicio - coluna_destino)) * menor_custo
+    heaps = ([(distancia, 0, indice_inicio)], [(distancia, 0, indice_destino)])
+    contador = 0
+
+    # Melhor caminho completo já encontrado e a célula onde as frentes se tocam
+    melhor_total = -1
+    encontro = -1
+
+    expansoes = obsoletas = 0
+    medir = estatisticas is not None
+    pico_fronteira = profundidade_maxima = 0
+
+    while True:
+        # Descarta entradas obsoletas do topo das duas filas
+        for heap, fechados in zip(heaps, visitados):
+            while heap and fechados[heap[0][2]]:
+                heapq.heappop(heap)
+                obsoletas += 1
+        if not heaps[0] or not heaps[1]:
+            break
+        if melhor_total != -1 and heaps[0][0][0] + heaps[1][0][0] >= 2 * melhor_total:
+            break
+        if medir and len(heaps[0]) + len(heaps[1]) > pico_fronteira:
+            pico_fronteira = len(heaps[0]) + len(heaps[1])
+
+        # Expande a frente com menos nós na fila
+        lado = 0 if len(heaps[0]) <= len(heaps[1]) else 1
+        custo, fechados, anteriores, heap = melhor_custo[lado], visitados[lado], antecessor[lado], heaps[lado]
+        custo_oposto = melhor_custo[1 - lado]
+        sinal = menor_custo if lado == 0 else -menor_custo
+
+        _, _, atual = heapq.heappop(heap)
+        fechados[atual] = 1
+        expansoes += 1
+        if medir and custo[atual] > profundidade_maxima:
+            profundidade_maxima = custo[atual]
+
+        linha, coluna = divmod(atual, colunas)
+        # O custo de um passo é o de entrar na célula de chegada: na frente do
+        # início é a vizinha; na frente do destino, que anda ao contrário, é a atual
+        custo_atual = tabela[fonte[atual]]
+        for dr, dc in DIRECOES:
+            nr, nc = linha + dr, coluna + dc
+            if not (0 <= nr < linhas and 0 <= nc < colunas):
+                continue
+            vizinho = nr * colunas + nc
+            custo_vizinho = tabela[fonte[vizinho]]
+            if not custo_vizinho and vizinho != indice_inicio:
+                continue
+            novo_custo_g = custo[atual] + (custo_vizinho if lado == 0 else custo_atual)
+            custo_conhecido = custo[vizinho]
+            if custo_conhecido != -1 and custo_conhecido <= novo_custo_g:
+                continue
+            custo[vizinho] = novo_custo_g
+            anteriores[vizinho] = atual
+
+            # A outra frente já alcançou esta célula: há um caminho completo
+            if custo_oposto[vizinho] != -1 and (melhor_total == -1 or
+                                                novo_custo_g + custo_oposto[vizinho] < melhor_total):
+                melhor_total = novo_custo_g + custo_oposto[vizinho]
+                encontro = vizinho
+
+            equilibrio = (abs(nr - linha_destino) + abs(nc - coluna_destino)
+                          - abs(nr - linha_inicio) - abs(nc - coluna_inicio))
+            contador += 1
+            heapq.heappush(heap, (2 * novo_custo_g + sinal * equilibrio, -novo_custo_g, vizinho))
+
+    if medir:
+        estatisticas.registrar(expansoes=expansoes, insercoes=contador + 2,
+                               remocoes=expansoes + obsoletas, remocoes_obsoletas=obsoletas,
+                               pico_fronteira=pico_fronteira, profundidade_maxima=profundidade_maxima)
+    if encontro == -1:
+        return None
+
+    # Início -> encontro pela frente do início; encontro -> destino pela do destino
+    caminho = reconstruir_caminho(antecessor[0], colunas, encontro)
+    atual = antecessor[1][encontro]
+    while atual != -1:
+        caminho.append(divmod(atual, colunas))
+        atual = antecessor[1][atual]
+    return caminho
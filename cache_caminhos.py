@@ -0,0 +1,185 @@
+import hashlib
+import sys
+from array import array
+from collections import OrderedDict
+
+from custos import TabelaCustos
+from tabuleiro_compacto import CelulasCompactadas, grade_plana
+
+# Memória máxima, em bytes, ocupada pelas entradas de um cache (padrão de CacheCaminhos)
+LIMITE_BYTES_PADRAO = 256 << 20
+
+def assinatura_tabuleiro(tabuleiro):
+    """
+    Calcula uma assinatura (hash) do conteúdo do tabuleiro.
+
+    Qualquer mudança de obstáculo muda a assinatura, então ela serve de chave
+    para resultados que só valem enquanto o tabuleiro não muda.
+
+    Args:
+        tabuleiro: Tabuleiro compacto ou matriz representando o tabuleiro
+
+    Returns:
+        bytes com o resumo BLAKE2 das dimensões e das células
+    """
+    linhas, colunas, celulas = grade_plana(tabuleiro)
+    resumo = hashlib.blake2b(digest_size=16)
+    resumo.update(linhas.to_bytes(4, 'little'))
+    resumo.update(colunas.to_bytes(4, 'little'))
+    # Tabuleiros compactados em bits são resumidos pelos próprios bits, sem decodificar
+    resumo.update(celulas.bits if isinstance(celulas, CelulasCompactadas) else celulas)
+    return resumo.digest()
+
+def assinatura_custos(custos):
+    """
+    Calcula uma chave para os custos usados numa busca, que junto com a
+    assinatura do tabuleiro identifica resultados calculados com esses custos.
+
+    Args:
+        custos: TabelaCustos ou buffer com um byte de custo por célula
+
+    Returns:
+        bytes: a própria tabela de 256 custos, ou o resumo BLAKE2 do buffer
+    """
+    if isinstance(custos, TabelaCustos):
+        return custos.tabela
+    return hashlib.blake2b(custos, digest_size=16).digest()
+
+def tamanho_entrada(valor):
+    """
+    Estima a memória ocupada por um valor guardado no cache.
+
+    Args:
+        valor: Árvore de busca (array), buffer, caminho (lista de tuplas) ou
+               qualquer outro objeto
+
+    Returns:
+        Número aproximado de bytes
+    """
+    if isinstance(valor, array):
+        return valor.itemsize * len(valor)
+    if isinstance(valor, (bytes, bytearray)):
+        return len(valor)
+    if isinstance(valor, list):
+        # A lista e uma tupla (linha, coluna) por posição
+        return sys.getsizeof(valor) + 64 * len(valor)
+    return sys.getsizeof(valor)
+
+class CacheCaminhos:
+    """
+    Cache LRU de resultados de busca, com chaves que começam pela assinatura
+    do tabuleiro (por exemplo, (assinatura, origem) ou (assinatura, origem, destino)).
+
+    As entradas menos usadas são descartadas quando o número de entradas passa
+    da capacidade ou quando a memória estimada delas passa do limite em bytes:
+    uma árvore de busca ocupa 4 bytes por célula, então poucas árvores de um
+    tabuleiro grande já enchem o cache. Além disso, o cache lembra a última assinatura vista para cada objeto de tabuleiro: se
+    os obstáculos daquele tabuleiro mudarem, as entradas antigas são invalidadas.
+    """
+
+    def __init__(self, capacidade=128, limite_bytes=LIMITE_BYTES_PADRAO):
+        """
+        Args:
+            capacidade: Número máximo de entradas mantidas
+            limite_bytes: Memória máxima, em bytes, ocupada pelas entradas
+        """
+        self.capacidade = capacidade
+        self.limite_bytes = limite_bytes
+        self._entradas = OrderedDict()
+        # Tamanho estimado de cada entrada e a soma deles
+        self._tamanhos = {}
+        self.bytes = 0
+        self._assinaturas = OrderedDict()
+        self.acertos = 0
+        self.falhas = 0
+
+    def registrar(self, tabuleiro, assinatura=None):
+        """
+        Calcula a assinatura do tabuleiro e invalida as entradas do estado
+        anterior do mesmo objeto, caso os obstáculos tenham mudado.
+
+        O objeto registrado deve ser o que o chamador guarda e altera (não uma
+        cópia temporária), senão a troca de obstáculos não é percebida.
+
+        Args:
+            tabuleiro: Tabuleiro compacto ou matriz representando o tabuleiro
+            assinatura: Assinatura já calculada do conteúdo atual do tabuleiro
+                        (por exemplo, a partir de uma cópia compacta dele)
+
+        Returns:
+            Assinatura atual do tabuleiro
+        """
+        if assinatura is None:
+            assinatura = assinatura_tabuleiro(tabuleiro)
+        anterior = self._assinaturas.get(id(tabuleiro))
+        if anterior is not None and anterior != assinatura:
+            self.invalidar(anterior)
+        self._assinaturas[id(tabuleiro)] = assinatura
+        self._assinaturas.move_to_end(id(tabuleiro))
+        while len(self._assinaturas) > self.capacidade:
+            self._assinaturas.popitem(last=False)
+        return assinatura
+
+    def obter(self, chave, padrao=None):
+        """
+        Args:
+            chave: Chave procurada
+            padrao: Valor devolvido quando a chave não está no cache
+
+        Returns:
+            Valor guardado para a chave, ou padrao se não estiver no cache
+        """
+        if chave not in self._entradas:
+            self.falhas += 1
+            return padrao
+        self._entradas.move_to_end(chave)
+        self.acertos += 1
+        return self._entradas[chave]
+
+    def guardar(self, chave, valor, tamanho=None):
+        """
+        Guarda um valor, descartando as entradas menos usadas se necessário.
+
+        Um valor maior que o limite em bytes não fica no cache.
+
+        Args:
+            chave: Chave do valor
+            valor: Valor a guardar
+            tamanho: Memória ocupada pelo valor, em bytes (padrão: estimada
+                     por tamanho_entrada)
+        """
+        if tamanho is None:
+            tamanho = tamanho_entrada(valor)
+        self._remover(chave)
+        self._entradas[chave] = valor
+        self._tamanhos[chave] = tamanho
+        self.bytes += tamanho
+        while self._entradas and (len(self._entradas) > self.capacidade or self.bytes > self.limite_bytes):
+            self._remover(next(iter(self._entradas)))
+
+    def _remover(self, chave):
+        if chave in self._entradas:
+            del self._entradas[chave]
+            self.bytes -= self._tamanhos.pop(chave)
+
+    def invalidar(self, assinatura):
+        """
+        Remove todas as entradas associadas a uma assinatura de tabuleiro.
+        """
+        for chave in [chave for chave in self._entradas if chave[0] == assinatura]:
+            self._remover(chave)
+
+    def limpar(self):
+        """
+        Remove todas as entradas do cache.
+        """
+        self._entradas.clear()
+        self._tamanhos.clear()
+        self.bytes = 0
+        self._assinaturas.clear()
+
+    def __len__(self):
+        return len(self._entradas)
+
+# Cache compartilhado usado quando nenhum outro é informado
+CACHE_PADRAO = CacheCaminhos()
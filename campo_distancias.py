@@ -0,0 +1,170 @@
+from array import array
+from collections import deque
+
+from tabuleiro_compacto import DIRECOES, OBSTACULO, CelulasCompactadas, grade_plana, np
+
+# Marca, na árvore de busca, as células que a busca não alcançou
+NAO_ALCANCADA = -2
+
+def campo_distancias(tabuleiro, origem):
+    """
+    Calcula a distância (em passos) da origem até todas as células do tabuleiro.
+
+    Como todo movimento custa 1, uma busca em largura resolve o problema. Com o
+    NumPy disponível, cada camada da busca é calculada de uma vez, deslocando a
+    fronteira nas quatro direções e filtrando pela máscara de células livres;
+    sem o NumPy, usa uma busca em largura comum sobre o buffer plano.
+
+    Args:
+        tabuleiro: Tabuleiro compacto ou matriz representando o tabuleiro
+        origem: Tupla (linha, coluna) de onde as distâncias são medidas
+
+    Returns:
+        Grade (linhas x colunas) de distâncias, com -1 nas células inalcançáveis
+        e nos obstáculos: um numpy.ndarray int32 se o NumPy estiver instalado,
+        ou uma lista de listas de inteiros caso contrário
+    """
+    linhas, colunas, celulas = grade_plana(tabuleiro)
+    if np is not None:
+        return _campo_numpy(linhas, colunas, celulas, origem)
+    distancias = _campo_plano(linhas, colunas, celulas, origem)
+    return [distancias[inicio:inicio + colunas].tolist()
+            for inicio in range(0, linhas * colunas, colunas)]
+
+def _campo_numpy(linhas, colunas, celulas, origem):
+    """
+    Busca em largura vetorizada: uma camada inteira da fronteira por iteração.
+
+    A fronteira é um array com os índices planos das células da camada atual;
+    os vizinhos são obtidos deslocando esse array de -colunas, +colunas, -1 e +1
+    e filtrando pela máscara de células livres ainda não alcançadas. Assim, o
+    custo de cada camada é proporcional ao tamanho da fronteira, não à área.
+    """
+    total = linhas * colunas
+    if isinstance(celulas, CelulasCompactadas):
+        bits = np.frombuffer(celulas.bits, dtype=np.uint8)
+        pendentes = np.unpackbits(bits, count=total, bitorder='little') == 0
+    else:
+        pendentes = np.frombuffer(celulas, dtype=np.uint8) != OBSTACULO
+    distancias = np.full(total, -1, dtype=np.int32)
+
+    indice_origem = origem[0] * colunas + origem[1]
+    distancias[indice_origem] = 0
+    pendentes[indice_origem] = False
+    fronteira = np.array([indice_origem], dtype=np.int64)
+    distancia = 0
+
+    while fronteira.size:
+        distancia += 1
+        coluna = fronteira % colunas
+
+        # Vizinhos da fronteira: cima, baixo, esquerda e direita (sem atravessar bordas)
+        vizinhos = np.concatenate((
+            fronteira - colunas,
+            fronteira + colunas,
+            fronteira[coluna > 0] - 1,
+            fronteira[coluna < colunas - 1] + 1,
+        ))
+        vizinhos = vizinhos[(vizinhos >= 0) & (vizinhos < total)]
+        vizinhos = np.unique(vizinhos[pendentes[vizinhos]])
+
+        pendentes[vizinhos] = False
+        distancias[vizinhos] = distancia
+        fronteira = vizinhos
+
+    return distancias.reshape(linhas, colunas)
+
+def _campo_plano(linhas, colunas, celulas, origem):
+    """
+    Busca em largura sobre o buffer plano, sem dependências externas.
+
+    Returns:
+        array('i') plano com as distâncias (-1 = inalcançável)
+    """
+    distancias = array('i', [-1]) * (linhas * colunas)
+    indice_origem = origem[0] * colunas + origem[1]
+    distancias[indice_origem] = 0
+    fila = deque([indice_origem])
+
+    while fila:
+        atual = fila.popleft()
+        linha, coluna = divmod(atual, colunas)
+        proxima = distancias[atual] + 1
+        for dr, dc in DIRECOES:
+            nr, nc = linha + dr, coluna + dc
+            if 0 <= nr < linhas and 0 <= nc < colunas:
+                vizinho = nr * colunas + nc
+                if distancias[vizinho] == -1 and celulas[vizinho] != OBSTACULO:
+                    distancias[vizinho] = proxima
+                    fila.append(vizinho)
+
+    return distancias
+
+def arvore_busca(tabuleiro, origem):
+    """
+    Árvore de caminhos mais curtos a partir da origem (busca em largura).
+
+    Uma única árvore responde a consultas da mesma origem para qualquer destino.
+
+    Args:
+        tabuleiro: Tabuleiro compacto ou matriz representando o tabuleiro
+        origem: Tupla (linha, coluna) da raiz da árvore
+
+    Returns:
+        array('i') plano com o índice do antecessor de cada célula: -1 na
+        origem e NAO_ALCANCADA nas células inalcançáveis
+    """
+    linhas, colunas, celulas = grade_plana(tabuleiro)
+    antecessor = array('i', [NAO_ALCANCADA]) * (linhas * colunas)
+    indice_origem = origem[0] * colunas + origem[1]
+    antecessor[indice_origem] = -1
+    fila = deque([indice_origem])
+
+    while fila:
+        atual = fila.popleft()
+        linha, coluna = divmod(atual, colunas)
+        for dr, dc in DIRECOES:
+            nr, nc = linha + dr, coluna + dc
+            if 0 <= nr < linhas and 0 <= nc < colunas:
+                vizinho = nr * colunas + nc
+                if antecessor[vizinho] == NAO_ALCANCADA and celulas[vizinho] != OBSTACULO:
+                    antecessor[vizinho] = atual
+                    fila.append(vizinho)
+
+    return antecessor
+
+def caminho_do_campo(campo, destino):
+    """
+    Extrai um caminho mais curto a partir de um campo de distâncias.
+
+    Partindo do destino, desce sempre para um vizinho com distância uma unidade
+    menor até chegar à origem (distância 0). O caminho tem o mesmo comprimento
+    do encontrado pelo A* para a mesma origem e destino.
+
+    Args:
+        campo: Grade de distâncias devolvida por campo_distancias
+        destino: Tupla (linha, coluna) da posição de destino
+
+    Returns:
+        Lista de tuplas (linha, coluna) da origem ao destino,
+        ou None se o destino for inalcançável
+    """
+    linhas = len(campo)
+    colunas = len(campo[0])
+    linha, coluna = destino
+    distancia = int(campo[linha][coluna])
+    if distancia < 0:
+        return None
+
+    caminho = [(linha, coluna)]
+    while distancia > 0:
+        for dr, dc in DIRECOES:
+            nr, nc = linha + dr, coluna + dc
+            if 0 <= nr < linhas and 0 <= nc < colunas and campo[nr][nc] == distancia - 1:
+                linha, coluna = nr, nc
+                break
+        distancia -= 1
+        caminho.append((linha, coluna))
+
+    caminho.reverse()
+    return caminho
@@ -0,0 +1,130 @@
+import mmap
+import struct
+
+from tabuleiro_compacto import CelulasCompactadas, Tabuleiro, compactar_celulas, grade_plana
+
+# Cabeçalho dos formatos binários: assinatura, versão, linhas e colunas
+CABECALHO = struct.Struct('<4sIII')
+VERSAO = 1
+# Um byte por célula, com o próprio caractere (' ' / 'X')
+ASSINATURA_BINARIO = b'TABB'
+# Um bit por célula (1 = obstáculo), bit menos significativo primeiro
+ASSINATURA_COMPACTADO = b'TABC'
+
+def carregar_texto(caminho_arquivo):
+    """
+    Carrega um tabuleiro de um arquivo de texto, uma linha do arquivo por linha
+    do tabuleiro, usando a mesma convenção de caracteres ' ' / 'X'.
+
+    O arquivo é lido linha a linha diretamente para o buffer do Tabuleiro, sem
+    passar por listas de caracteres.
+
+    Args:
+        caminho_arquivo: Caminho do arquivo de texto
+
+    Returns:
+        Tabuleiro com o conteúdo do arquivo
+    """
+    celulas = bytearray()
+    linhas = 0
+    colunas = None
+    with open(caminho_arquivo, 'rb') as arquivo:
+        for linha in arquivo:
+            linha = linha.rstrip(b'\r\n')
+            if not linha:
+                # Linhas vazias (como a que pode haver no fim do arquivo) são ignoradas
+                continue
+            if colunas is None:
+                colunas = len(linha)
+            elif len(linha) != colunas:
+                raise ValueError(f"linha {linhas + 1} tem {len(linha)} colunas, esperado {colunas}")
+            celulas += linha
+            linhas += 1
+    return Tabuleiro(linhas, colunas or 0, celulas)
+
+def salvar_texto(tabuleiro, caminho_arquivo):
+    """
+    Salva o tabuleiro em texto, uma linha do arquivo por linha do tabuleiro.
+
+    Args:
+        tabuleiro: Tabuleiro compacto ou matriz representando o tabuleiro
+        caminho_arquivo: Caminho do arquivo de saída
+    """
+    linhas, colunas, celulas = grade_plana(tabuleiro)
+    with open(caminho_arquivo, 'wb') as arquivo:
+        for inicio in range(0, linhas * colunas, colunas):
+            arquivo.write(bytes(celulas[inicio:inicio + colunas]) + b'\n')
+
+def salvar_binario(tabuleiro, caminho_arquivo, compactado=True):
+    """
+    Salva o tabuleiro em um dos formatos binários que podem ser abertos com mmap.
+
+    Args:
+        tabuleiro: Tabuleiro compacto ou matriz representando o tabuleiro
+        caminho_arquivo: Caminho do arquivo de saída
+        compactado: True para um bit por célula (só obstáculo/livre); False para
+                    um byte por célula (preserva o caractere de cada célula)
+    """
+    linhas, colunas, celulas = grade_plana(tabuleiro)
+    assinatura = ASSINATURA_COMPACTADO if compactado else ASSINATURA_BINARIO
+    with open(caminho_arquivo, 'wb') as arquivo:
+        arquivo.write(CABECALHO.pack(assinatura, VERSAO, linhas, colunas))
+        if compactado:
+            if isinstance(celulas, CelulasCompactadas):
+                arquivo.write(celulas.bits[:(linhas * colunas + 7) // 8])
+            else:
+                arquivo.write(compactar_celulas(celulas))
+        else:
+            arquivo.write(bytes(celulas))
+
+def abrir_binario(caminho_arquivo, gravavel=False):
+    """
+    Abre um tabuleiro binário mapeando o arquivo em memória (mmap).
+
+    Nada é lido para listas do Python: as células são consultadas diretamente
+    no arquivo mapeado, então abrir o tabuleiro leva o mesmo tempo qualquer que
+    seja o tamanho do mapa. No formato compactado, cada célula ocupa um bit.
+
+    Args:
+        caminho_arquivo: Caminho do arquivo salvo por salvar_binario
+        gravavel: Se True, alterações no tabuleiro são gravadas no arquivo
+
+    Returns:
+        Tabuleiro cujas células ficam no arquivo mapeado
+    """
+    with open(caminho_arquivo, 'r+b' if gravavel else 'rb') as arquivo:
+        mapa = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_WRITE if gravavel else mmap.ACCESS_READ)
+
+    if len(mapa) < CABECALHO.size:
+        raise ValueError("arquivo de tabuleiro binário truncado")
+    assinatura, versao, linhas, colunas = CABECALHO.unpack_from(mapa)
+    if versao != VERSAO:
+        raise ValueError(f"versão {versao} do formato de tabuleiro não suportada")
+
+    dados = memoryview(mapa)[CABECALHO.size:]
+    total = linhas * colunas
+    if assinatura == ASSINATURA_COMPACTADO:
+        celulas = CelulasCompactadas(dados, total)
+    elif assinatura == ASSINATURA_BINARIO:
+        if len(dados) < total:
+            raise ValueError("arquivo de tabuleiro binário truncado")
+        celulas = dados[:total]
+    else:
+        raise ValueError("o arquivo não é um tabuleiro binário")
+    return Tabuleiro(linhas, colunas, celulas)
+
+def abrir(caminho_arquivo):
+    """
+    Abre um tabuleiro em qualquer formato, reconhecendo os binários pela assinatura.
+
+    Args:
+        caminho_arquivo: Caminho do arquivo de texto ou binário
+
+    Returns:
+        Tabuleiro com o conteúdo do arquivo
+    """
+    with open(caminho_arquivo, 'rb') as arquivo:
+        inicio = arquivo.read(len(ASSINATURA_BINARIO))
+    if inicio in (ASSINATURA_BINARIO, ASSINATURA_COMPACTADO):
+        return abrir_binario(caminho_arquivo)
+    return carregar_texto(caminho_arquivo)
@@ -0,0 +1,325 @@
+import re
+from array import array
+from collections import deque
+
+from custos import CUSTOS_PADRAO, TabelaCustos, custos_por_celula
+from tabuleiro_compacto import DIRECOES, grade_plana
+
+# As oito células em volta de uma célula, em ordem circular: duas seguidas são sempre vizinhas
+ANEL = [(-1, -1), (-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1)]
+
+# Trechos contínuos de células transitáveis (custo diferente de 0) em uma linha
+_TRECHO = re.compile(rb'[^\x00]+')
+
+class ComponentesConexas:
+    """
+    Rótulos de componentes conexas do tabuleiro, para descartar em O(1)
+    consultas sem caminho antes de qualquer busca.
+
+    Cada célula transitável guarda um rótulo; duas células estão na mesma
+    componente (há caminho entre elas) se os rótulos têm a mesma raiz em uma
+    estrutura union-find de rótulos. O cálculo inicial une os trechos
+    contínuos de células livres de cada linha com os da linha anterior que os
+    tocam, sem visitar as células uma a uma. Depois, atualizar_celula e
+    alterar_celula mantêm os rótulos quando uma célula muda: liberar uma
+    célula só une rótulos; bloquear pode dividir a componente, e só a parte
+    separada (a menor, em geral) é rotulada de novo.
+
+    Os rótulos valem para os custos informados na criação; use o mesmo
+    objeto só com buscas que usam esses custos.
+    """
+    __slots__ = ('tabuleiro', 'linhas', 'colunas', 'tabela', 'rotulos', 'quantidade', '_pai')
+
+    def __init__(self, tabuleiro, custos=None):
+        """
+        Args:
+            tabuleiro: Tabuleiro compacto ou matriz representando o tabuleiro
+            custos: TabelaCustos ou custos por célula (padrão: 'X' bloqueia, o resto custa 1)
+        """
+        linhas, colunas, celulas = grade_plana(tabuleiro)
+        passos, _, _ = custos_por_celula(celulas, custos)
+        self.tabuleiro = tabuleiro
+        self.linhas = linhas
+        self.colunas = colunas
+        # Tabela caractere -> custo, para saber se uma célula alterada é transitável
+        # (não existe quando os custos são um buffer por célula)
+        if custos is None:
+            custos = CUSTOS_PADRAO
+        self.tabela = custos.tabela if isinstance(custos, TabelaCustos) else None
+        # Rótulo de cada célula (-1 = bloqueada); a componente é a raiz do rótulo em _pai
+        self.rotulos = array('i', [-1]) * (linhas * colunas)
+        self._pai = []
+        self.quantidade = 0
+        self._rotular(bytes(passos))
+
+    def _rotular(self, passos):
+        """
+        Rotula todas as células a partir do buffer de custos, por trechos de linha.
+        """
+        colunas = self.colunas
+        pai = self._pai
+        trechos = []
+        anteriores = []
+        for inicio in range(0, self.linhas * colunas, colunas):
+            atuais = []
+            posicao = 0
+            for encontrado in _TRECHO.finditer(passos, inicio, inicio + colunas):
+                comeco, fim = encontrado.start() - inicio, encontrado.end() - inicio
+                rotulo = len(pai)
+                pai.append(rotulo)
+                # Une com os trechos da linha de cima que têm alguma coluna em comum
+                while posicao < len(anteriores) and anteriores[posicao][1] <= comeco:
+                    posicao += 1
+                seguinte = posicao
+                while seguinte < len(anteriores) and anteriores[seguinte][0] < fim:
+                    self._unir(anteriores[seguinte][2], rotulo)
+                    seguinte += 1
+                if seguinte > posicao:
+                    # O último trecho de cima pode tocar também o próximo trecho desta linha
+                    posicao = seguinte - 1
+                atuais.append((comeco, fim, rotulo))
+                trechos.append((inicio + comeco, fim - comeco, rotulo))
+            anteriores = atuais
+
+        rotulos = self.rotulos
+        raizes = set()
+        for comeco, tamanho, rotulo in trechos:
+            raiz = self._raiz(rotulo)
+            raizes.add(raiz)
+            rotulos[comeco:comeco + tamanho] = array('i', [raiz]) * tamanho
+        self.quantidade = len(raizes)
+
+    def _raiz(self, rotulo):
+        # Raiz do rótulo, encurtando o caminho pela metade a cada consulta
+        pai = self._pai
+        while pai[rotulo] != rotulo:
+            pai[rotulo] = pai[pai[rotulo]]
+            rotulo = pai[rotulo]
+        return rotulo
+
+    def _unir(self, rotulo, outro):
+        # Une as componentes de dois rótulos; devolve True se eram diferentes
+        raiz, outra = self._raiz(rotulo), self._raiz(outro)
+        if raiz == outra:
+            return False
+        self._pai[outra] = raiz
+        return True
+
+    def componente(self, linha, coluna):
+        """
+        Returns:
+            Identificador da componente da célula, ou -1 se ela for bloqueada
+        """
+        rotulo = self.rotulos[linha * self.colunas + coluna]
+        return rotulo if rotulo == -1 else self._raiz(rotulo)
+
+    def alcancavel(self, inicio, destino):
+        """
+        Verifica, sem busca, se existe caminho do início ao destino.
+
+        Segue as mesmas regras do A*: o destino precisa ser transitável, mas o
+        início não (a busca sai dele para qualquer vizinho transitável).
+
+        Args:
+            inicio: Tupla (linha, coluna) da posição inicial
+            destino: Tupla (linha, coluna) da posição de destino
+
+        Returns:
+            Boolean indicando se o destino é alcançável a partir do início
+        """
+        if tuple(inicio) == tuple(destino):
+            return True
+        colunas = self.colunas
+        rotulos = self.rotulos
+        rotulo_destino = rotulos[destino[0] * colunas + destino[1]]
+        if rotulo_destino == -1:
+            return False
+        raiz_destino = self._raiz(rotulo_destino)
+        rotulo_inicio = rotulos[inicio[0] * colunas + inicio[1]]
+        if rotulo_inicio != -1:
+            return self._raiz(rotulo_inicio) == raiz_destino
+        # Início bloqueado: vale a componente de algum vizinho
+        linha, coluna = inicio
+        for dr, dc in DIRECOES:
+            nr, nc = linha + dr, coluna + dc
+            if 0 <= nr < self.linhas and 0 <= nc < colunas:
+                rotulo = rotulos[nr * colunas + nc]
+                if rotulo != -1 and self._raiz(rotulo) == raiz_destino:
+                    return True
+        return False
+
+    def atualizar_celula(self, linha, coluna, bloqueado):
+        """
+        Marca uma célula como obstáculo ou livre e atualiza os rótulos.
+
+        Args:
+            linha: Índice da linha da célula
+            coluna: Índice da coluna da célula
+            bloqueado: True para obstáculo ('X'), False para célula livre (' ')
+        """
+        self.alterar_celula(linha, coluna, 'X' if bloqueado else ' ')
+
+    def alterar_celula(self, linha, coluna, caractere):
+        """
+        Troca o caractere de uma célula no tabuleiro e atualiza os rótulos se
+        ela passou a ser (ou deixou de ser) transitável.
+
+        Também serve para uma célula que já foi alterada no tabuleiro por
+        outro meio: os rótulos são comparados com o novo caractere, não com o
+        conteúdo anterior do tabuleiro.
+
+        Args:
+            linha: Índice da linha da célula
+            coluna: Índice da coluna da célula
+            caractere: Novo caractere da célula; o custo vem da tabela de custos
+
+        Raises:
+            TypeError: Se os rótulos foram criados com um buffer de custos por
+                       célula, que não diz o custo de um caractere novo
+        """
+        if self.tabela is None:
+            raise TypeError("com um buffer de custos por célula não é possível alterar células")
+        indice = linha * self.colunas + coluna
+        self.tabuleiro[linha][coluna] = caractere
+        transitavel = self.tabela[ord(caractere)] != 0
+        if transitavel == (self.rotulos[indice] != -1):
+            return
+        if transitavel:
+            self._liberar(indice)
+        else:
+            self._bloquear(indice)
+
+    def _vizinhos_livres(self, indice):
+        # Índices dos vizinhos transitáveis de uma célula
+        linha, coluna = divmod(indice, self.colunas)
+        vizinhos = []
+        for dr, dc in DIRECOES:
+            nr, nc = linha + dr, coluna + dc
+            if 0 <= nr < self.linhas and 0 <= nc < self.colunas:
+                vizinho = nr * self.colunas + nc
+                if self.rotulos[vizinho] != -1:
+                    vizinhos.append(vizinho)
+        return vizinhos
+
+    def _liberar(self, indice):
+        """
+        Célula bloqueada que ficou transitável: une as componentes vizinhas.
+        """
+        vizinhos = self._vizinhos_livres(indice)
+        if not vizinhos:
+            rotulo = len(self._pai)
+            self._pai.append(rotulo)
+            self.quantidade += 1
+        else:
+            rotulo = self._raiz(self.rotulos[vizinhos[0]])
+            for vizinho in vizinhos[1:]:
+                if self._unir(rotulo, self.rotulos[vizinho]):
+                    self.quantidade -= 1
+        self.rotulos[indice] = rotulo
+
+    def _bloquear(self, indice):
+        """
+        Célula transitável que ficou bloqueada: separa a componente se a
+        célula era a única ligação entre partes dela.
+        """
+        rotulos = self.rotulos
+        rotulos[indice] = -1
+        vizinhos = self._vizinhos_livres(indice)
+        if not vizinhos:
+            self.quantidade -= 1
+            return
+        grupos = self._grupos_no_anel(indice, vizinhos)
+        if len(grupos) == 1:
+            return
+
+        # Buscas em largura intercaladas, uma por grupo de vizinhos: as que se
+        # encontram continuam como uma só, e a que se esgota sozinha é uma
+        # componente separada. Cada passo expande uma célula de cada busca, então
+        # o custo é proporcional às partes separadas, não à componente inteira.
+        linhas, colunas = self.linhas, self.colunas
+        dono = {}
+        filas = {}
+        visitadas = {}
+        juncao = list(range(len(grupos)))
+
+        def busca_de(celula):
+            busca = dono[celula]
+            while juncao[busca] != busca:
+                busca = juncao[busca]
+            return busca
+
+        for busca, celula in enumerate(grupos):
+            dono[celula] = busca
+            filas[busca] = deque([celula])
+            visitadas[busca] = [celula]
+
+        while len(filas) > 1:
+            for busca in list(filas):
+                fila = filas.get(busca)
+                if fila is None:
+                    continue
+                if not fila:
+                    # Esgotou sem encontrar as outras: nova componente
+                    del filas[busca]
+                    rotulo = len(self._pai)
+                    self._pai.append(rotulo)
+                    self.quantidade += 1
+                    for celula in visitadas.pop(busca):
+                        rotulos[celula] = rotulo
+                    if len(filas) == 1:
+                        break
+                    continue
+                atual = fila.popleft()
+                linha, coluna = divmod(atual, colunas)
+                for dr, dc in DIRECOES:
+                    nr, nc = linha + dr, coluna + dc
+                    if not (0 <= nr < linhas and 0 <= nc < colunas):
+                        continue
+                    vizinho = nr * colunas + nc
+                    if rotulos[vizinho] == -1:
+                        continue
+                    if vizinho not in dono:
+                        dono[vizinho] = busca
+                        fila.append(vizinho)
+                        visitadas[busca].append(vizinho)
+                        continue
+                    outra = busca_de(vizinho)
+                    if outra != busca:
+                        # As duas buscas estão na mesma parte: junta a outra nesta
+                        juncao[outra] = busca
+                        fila.extend(filas.pop(outra))
+                        visitadas[busca].extend(visitadas.pop(outra))
+                if len(filas) == 1:
+                    break
+
+    def _grupos_no_anel(self, indice, vizinhos):
+        """
+        Agrupa os vizinhos livres que continuam ligados pelas oito células em
+        volta da célula bloqueada, o caso mais comum, sem nenhuma busca.
+
+        Returns:
+            Um vizinho representante de cada grupo
+        """
+        linhas, colunas, rotulos = self.linhas, self.colunas, self.rotulos
+        linha, coluna = divmod(indice, colunas)
+        livres = []
+        for dr, dc in ANEL:
+            nr, nc = linha + dr, coluna + dc
+            livres.append(0 <= nr < linhas and 0 <= nc < colunas and rotulos[nr * colunas + nc] != -1)
+        if all(livres):
+            return vizinhos[:1]
+        # Percorre o anel a partir de uma célula bloqueada; cada sequência de livres é um arco
+        partida = livres.index(False)
+        representantes = []
+        representado = False
+        for passo in range(1, 9):
+            posicao = (partida + passo) % 8
+            if not livres[posicao]:
+                representado = False
+                continue
+            dr, dc = ANEL[posicao]
+            if (dr == 0 or dc == 0) and not representado:
+                # O primeiro vizinho direto de cada arco representa o arco
+                representantes.append((linha + dr) * colunas + coluna + dc)
+                representado = True
+        return representantes
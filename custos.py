@@ -0,0 +1,119 @@
+from tabuleiro_compacto import OBSTACULO
+
+class TabelaCustos:
+    """
+    Custo de entrar em uma célula, conforme o caractere dela.
+
+    Guarda uma tabela de 256 entradas (uma por valor de byte) usada com
+    bytes.translate, então converter o tabuleiro inteiro em custos é uma única
+    operação em C. Os custos são inteiros de 0 a 255; custo 0 significa
+    célula bloqueada. Por padrão 'X' é bloqueada e qualquer outro caractere
+    custa padrao.
+
+    Exemplo: TabelaCustos({'~': 5, '=': 1}, padrao=2) para lama, estrada e
+    terreno comum.
+    """
+    __slots__ = ('tabela', 'menor', 'maior')
+
+    def __init__(self, custos=None, padrao=1):
+        """
+        Args:
+            custos: Dicionário {caractere: custo} (opcional)
+            padrao: Custo dos caracteres que não estão no dicionário
+        """
+        tabela = [padrao] * 256
+        tabela[OBSTACULO] = 0
+        for caractere, custo in (custos or {}).items():
+            tabela[ord(caractere)] = custo
+        if any(not 0 <= custo <= 255 for custo in tabela):
+            raise ValueError("os custos devem ser inteiros entre 0 e 255")
+        self.tabela = bytes(tabela)
+        positivos = [custo for custo in tabela if custo]
+        # Menor e maior custo de uma célula transitável (0 se nenhuma for)
+        self.menor = min(positivos, default=0)
+        self.maior = max(positivos, default=0)
+
+    def custo(self, caractere):
+        """
+        Returns:
+            Custo de entrar em uma célula com o caractere informado (0 = bloqueada)
+        """
+        return self.tabela[ord(caractere)]
+
+    def bloqueado(self, caractere):
+        """
+        Returns:
+            Boolean indicando se o caractere é intransitável
+        """
+        return self.tabela[ord(caractere)] == 0
+
+    def custos_celulas(self, celulas):
+        """
+        Converte um buffer de caracteres em um buffer de custos, célula a célula.
+
+        Args:
+            celulas: Buffer com um caractere por célula
+
+        Returns:
+            bytes com o custo de cada célula
+        """
+        return bytes(celulas).translate(self.tabela)
+
+    def __repr__(self):
+        especiais = {chr(byte): custo for byte, custo in enumerate(self.tabela) if custo != self.tabela[0]}
+        return f"TabelaCustos({especiais!r}, padrao={self.tabela[0]})"
+
+# Custos usados quando nenhum é informado: 'X' bloqueia, o resto custa 1
+CUSTOS_PADRAO = TabelaCustos()
+
+# Tabela que devolve o próprio byte: usada quando a fonte já é um buffer de custos
+IDENTIDADE = bytes(range(256))
+
+def custos_por_celula(celulas, custos=None):
+    """
+    Obtém o custo de cada célula, a partir de uma TabelaCustos ou de um buffer
+    de custos já pronto.
+
+    Args:
+        celulas: Buffer com um caractere por célula (como em grade_plana)
+        custos: TabelaCustos, buffer com um byte de custo por célula (bytes,
+                bytearray, array('B'), NumPy uint8...; 0 = bloqueada) ou None
+                para CUSTOS_PADRAO
+
+    Returns:
+        Tupla (custos de cada célula, menor custo positivo, maior custo)
+    """
+    if custos is None:
+        custos = CUSTOS_PADRAO
+    if isinstance(custos, TabelaCustos):
+        return custos.custos_celulas(celulas), custos.menor, custos.maior
+    if len(custos) != len(celulas):
+        raise ValueError("o buffer de custos não corresponde ao número de células")
+    positivos = set(bytes(custos))
+    positivos.discard(0)
+    return custos, min(positivos, default=0), max(positivos, default=0)
+
+def custos_sob_demanda(celulas, custos=None):
+    """
+    Prepara a consulta do custo célula a célula, só quando a busca chega a
+    ela, sem converter o tabuleiro inteiro: o custo da célula i é
+    tabela[fonte[i]].
+
+    Com uma TabelaCustos, a fonte é o próprio buffer de células (que pode ser
+    um mmap ou CelulasCompactadas, sem decodificar nada antes da busca); com
+    um buffer de custos por célula, a fonte é o buffer e a tabela é IDENTIDADE.
+
+    Args:
+        celulas: Buffer com um caractere por célula (como em grade_plana)
+        custos: TabelaCustos, buffer com um byte de custo por célula ou None
+                para CUSTOS_PADRAO
+
+    Returns:
+        Tupla (fonte, tabela, menor custo positivo, maior custo)
+    """
+    if custos is None:
+        custos = CUSTOS_PADRAO
+    if isinstance(custos, TabelaCustos):
+        return celulas, custos.tabela, custos.menor, custos.maior
+    passos, menor, maior = custos_por_celula(celulas, custos)
+    return passos, IDENTIDADE, menor, maior
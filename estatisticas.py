@@ -0,0 +1,67 @@
+import time
+
+class EstatisticasBusca:
+    """
+    Contadores de uma ou mais buscas, preenchidos pelos algoritmos que recebem
+    o argumento opcional estatisticas.
+
+    Os valores se acumulam entre chamadas (os picos guardam o maior valor), então
+    o mesmo objeto pode medir uma consulta isolada ou um lote inteiro. Sem o
+    argumento, os algoritmos não fazem nenhuma medição além das que já precisam.
+
+    Atributos:
+        buscas: Número de buscas medidas
+        expansoes: Nós expandidos
+        insercoes: Entradas inseridas na fronteira (heap ou pilha)
+        remocoes: Entradas retiradas da fronteira
+        remocoes_obsoletas: Entradas retiradas e descartadas porque o nó já
+                            tinha sido expandido ou a entrada estava desatualizada
+        pico_fronteira: Maior tamanho da fronteira
+        profundidade_maxima: Maior custo g expandido (A*) ou maior
+                             profundidade da pilha (Backtracking)
+        tempo: Tempo total de parede, em segundos
+    """
+    __slots__ = ('buscas', 'expansoes', 'insercoes', 'remocoes', 'remocoes_obsoletas',
+                 'pico_fronteira', 'profundidade_maxima', 'tempo')
+
+    def __init__(self):
+        for campo in self.__slots__:
+            setattr(self, campo, 0)
+        self.tempo = 0.0
+
+    def registrar(self, expansoes=0, insercoes=0, remocoes=0, remocoes_obsoletas=0,
+                  pico_fronteira=0, profundidade_maxima=0):
+        """
+        Soma os contadores de uma busca aos já acumulados.
+        """
+        self.expansoes += expansoes
+        self.insercoes += insercoes
+        self.remocoes += remocoes
+        self.remocoes_obsoletas += remocoes_obsoletas
+        self.pico_fronteira = max(self.pico_fronteira, pico_fronteira)
+        self.profundidade_maxima = max(self.profundidade_maxima, profundidade_maxima)
+
+    def medir(self, funcao, *args):
+        """
+        Executa uma busca, contando-a e somando o tempo gasto.
+
+        Returns:
+            O resultado de funcao(*args)
+        """
+        self.buscas += 1
+        inicio = time.perf_counter()
+        try:
+            return funcao(*args)
+        finally:
+            self.tempo += time.perf_counter() - inicio
+
+    def como_dict(self):
+        """
+        Returns:
+            Dicionário com todos os contadores (útil para JSON e relatórios)
+        """
+        return {campo: getattr(self, campo) for campo in self.__slots__}
+
+    def __repr__(self):
+        campos = ", ".join(f"{campo}={valor!r}" for campo, valor in self.como_dict().items())
+        return f"EstatisticasBusca({campos})"
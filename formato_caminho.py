@@ -0,0 +1,173 @@
+import re
+
+# Letra de cada direção no código de um caminho: direita, esquerda, cima, baixo
+LETRAS = {(0, 1): 'R', (0, -1): 'L', (-1, 0): 'U', (1, 0): 'D'}
+DESLOCAMENTOS = {letra: direcao for direcao, letra in LETRAS.items()}
+
+# Formatos em que os caminhos podem ser devolvidos (ver formatar_caminhos)
+FORMATOS = ('lista', 'rle', 'gerador')
+
+# Um trecho do código: letra da direção seguida do número de passos (omitido quando é 1)
+_TRECHO = re.compile(r'([RLUD])(\d*)')
+
+def _juntar_trechos(trechos):
+    # [(letra, passos), ...] -> "R5U3D"
+    return ''.join(letra if passos == 1 else f"{letra}{passos}" for letra, passos in trechos)
+
+def codificar_caminho(caminho):
+    """
+    Codifica um caminho como uma sequência de direções com o número de passos
+    repetidos (run-length), por exemplo "R5U3": cinco passos para a direita e
+    três para cima. O número é omitido quando o trecho tem um passo só.
+
+    O código não guarda a posição inicial; junto com ela, decodificar_caminho
+    e iterar_caminho reconstroem o caminho inteiro. As posições são
+    consumidas uma a uma, então o caminho pode ser um gerador.
+
+    Args:
+        caminho: Sequência ou iterável de tuplas (linha, coluna), com posições
+                 seguidas vizinhas
+
+    Returns:
+        String com o código (vazia para um caminho com uma única posição)
+
+    Raises:
+        ValueError: Se duas posições seguidas não forem vizinhas
+    """
+    trechos = []
+    anterior = None
+    for linha, coluna in caminho:
+        if anterior is not None:
+            letra = LETRAS.get((linha - anterior[0], coluna - anterior[1]))
+            if letra is None:
+                raise ValueError(f"as posições {anterior} e {(linha, coluna)} não são vizinhas")
+            if trechos and trechos[-1][0] == letra:
+                trechos[-1][1] += 1
+            else:
+                trechos.append([letra, 1])
+        anterior = (linha, coluna)
+    return _juntar_trechos(trechos)
+
+def codificar_antecessores(antecessor, colunas, indice_destino):
+    """
+    Codifica o caminho de uma tabela de antecessores (como a do A* ou a de
+    arvore_busca) direto para o código de direções, sem criar a lista de
+    tuplas: equivale a codificar_caminho(reconstruir_caminho(...)).
+
+    Args:
+        antecessor: Sequência plana com o índice do antecessor de cada posição
+                    (-1 para a posição inicial)
+        colunas: Número de colunas do tabuleiro
+        indice_destino: Índice plano (linha * colunas + coluna) do destino
+
+    Returns:
+        Tupla (índice plano do início, código)
+    """
+    # Percorre do destino para o início, juntando os passos iguais
+    trechos = []
+    atual = indice_destino
+    anterior = antecessor[atual]
+    while anterior >= 0:
+        diferenca = atual - anterior
+        if diferenca == colunas:
+            letra = 'D'
+        elif diferenca == -colunas:
+            letra = 'U'
+        elif diferenca == 1:
+            letra = 'R'
+        else:
+            letra = 'L'
+        if trechos and trechos[-1][0] == letra:
+            trechos[-1][1] += 1
+        else:
+            trechos.append([letra, 1])
+        atual = anterior
+        anterior = antecessor[atual]
+    trechos.reverse()
+    return atual, _juntar_trechos(trechos)
+
+def iterar_trechos(codigo):
+    """
+    Lê os trechos de um código de caminho.
+
+    Args:
+        codigo: String como "R5U3"
+
+    Yields:
+        Tuplas (deslocamento (dr, dc), número de passos)
+
+    Raises:
+        ValueError: Se o código tiver algo diferente de trechos válidos
+    """
+    posicao = 0
+    while posicao < len(codigo):
+        trecho = _TRECHO.match(codigo, posicao)
+        if trecho is None:
+            raise ValueError(f"código de caminho inválido na posição {posicao}: "
+                             f"{codigo[posicao:posicao + 10]!r}")
+        passos = int(trecho.group(2)) if trecho.group(2) else 1
+        if passos == 0:
+            raise ValueError(f"trecho sem passos no código de caminho: {trecho.group(0)!r}")
+        yield DESLOCAMENTOS[trecho.group(1)], passos
+        posicao = trecho.end()
+
+def iterar_caminho(inicio, codigo):
+    """
+    Gera as posições de um caminho codificado, uma de cada vez, sem montar a
+    lista inteira.
+
+    Args:
+        inicio: Tupla (linha, coluna) da posição inicial
+        codigo: Código do caminho (ver codificar_caminho)
+
+    Yields:
+        Tuplas (linha, coluna), a começar pelo início
+    """
+    linha, coluna = inicio
+    yield linha, coluna
+    for (dr, dc), passos in iterar_trechos(codigo):
+        for _ in range(passos):
+            linha += dr
+            coluna += dc
+            yield linha, coluna
+
+def decodificar_caminho(inicio, codigo):
+    """
+    Args:
+        inicio: Tupla (linha, coluna) da posição inicial
+        codigo: Código do caminho (ver codificar_caminho)
+
+    Returns:
+        Lista de tuplas (linha, coluna) do início ao fim, como a dos algoritmos de busca
+    """
+    return list(iterar_caminho(inicio, codigo))
+
+def contar_passos(codigo):
+    """
+    Returns:
+        Número de passos do caminho codificado, sem decodificá-lo
+    """
+    return sum(passos for _, passos in iterar_trechos(codigo))
+
+def formatar_caminhos(caminhos, inicios, formato):
+    """
+    Converte caminhos em lista para o formato pedido.
+
+    Args:
+        caminhos: Lista de caminhos (listas de tuplas ou None)
+        inicios: Posição inicial de cada caminho (usada pelo formato 'gerador')
+        formato: 'lista' (sem conversão), 'rle' (código de direções, ver codificar_caminho) ou
+                 'gerador' (ver iterar_caminho)
+
+    Returns:
+        Lista com um caminho (ou None) por entrada, no formato pedido
+    """
+    if formato == 'lista':
+        return caminhos
+    if formato not in FORMATOS:
+        raise ValueError(f"formato de caminho desconhecido: {formato!r}")
+    codigos = [codificar_caminho(caminho) if caminho is not None else None for caminho in caminhos]
+    if formato == 'rle':
+        return codigos
+    return [iterar_caminho(tuple(inicio), codigo) if codigo is not None else None
+            for inicio, codigo in zip(inicios, codigos)]
@@ -0,0 +1,87 @@
+import random
+
+from tabuleiro_compacto import LIVRE, OBSTACULO, Tabuleiro, grade_plana
+
+# Tipos de tabuleiro aceitos por gerar_tabuleiro
+TIPOS = ('aberto', 'labirinto')
+
+def gerar_tabuleiro(linhas, colunas=None, densidade=0.2, tipo='aberto', semente=0):
+    """
+    Gera um tabuleiro aleatório reproduzível: a mesma semente e os mesmos
+    parâmetros produzem sempre o mesmo tabuleiro.
+
+    Args:
+        linhas: Número de linhas
+        colunas: Número de colunas (igual a linhas se omitido)
+        densidade: Fração aproximada de obstáculos no tipo 'aberto' (em passos
+                   de 1/256); ignorada no tipo 'labirinto'
+        tipo: 'aberto' (obstáculos espalhados ao acaso) ou 'labirinto'
+              (corredores de uma célula, com um único caminho entre duas células)
+        semente: Semente do gerador aleatório
+
+    Returns:
+        Tabuleiro gerado
+    """
+    if colunas is None:
+        colunas = linhas
+    gerador = random.Random(semente)
+    if tipo == 'aberto':
+        return _tabuleiro_aberto(linhas, colunas, densidade, gerador)
+    if tipo == 'labirinto':
+        return _tabuleiro_labirinto(linhas, colunas, gerador)
+    raise ValueError(f"tipo de tabuleiro desconhecido: {tipo!r} (use um de {TIPOS})")
+
+def _tabuleiro_aberto(linhas, colunas, densidade, gerador):
+    # Um byte aleatório por célula, convertido em ' ' / 'X' por uma tabela
+    limite = round(densidade * 256)
+    tabela = bytes(OBSTACULO if byte < limite else LIVRE for byte in range(256))
+    celulas = bytearray(gerador.randbytes(linhas * colunas).translate(tabela))
+    return Tabuleiro(linhas, colunas, celulas)
+
+def _tabuleiro_labirinto(linhas, colunas, gerador):
+    # Busca em profundidade aleatória (iterativa) sobre as células de
+    # coordenadas pares, derrubando a parede entre cada par visitado
+    celulas = bytearray([OBSTACULO]) * (linhas * colunas)
+    if not linhas or not colunas:
+        return Tabuleiro(linhas, colunas, celulas)
+    celulas[0] = LIVRE
+    pilha = [(0, 0)]
+    while pilha:
+        linha, coluna = pilha[-1]
+        vizinhos = [(linha + dr, coluna + dc) for dr, dc in ((-2, 0), (0, 2), (2, 0), (0, -2))
+                    if 0 <= linha + dr < linhas and 0 <= coluna + dc < colunas
+                    and celulas[(linha + dr) * colunas + coluna + dc] == OBSTACULO]
+        if not vizinhos:
+            pilha.pop()
+            continue
+        nova_linha, nova_coluna = gerador.choice(vizinhos)
+        celulas[(linha + nova_linha) // 2 * colunas + (coluna + nova_coluna) // 2] = LIVRE
+        celulas[nova_linha * colunas + nova_coluna] = LIVRE
+        pilha.append((nova_linha, nova_coluna))
+    return Tabuleiro(linhas, colunas, celulas)
+
+def gerar_consultas(tabuleiro, quantidade, semente=0):
+    """
+    Sorteia pares (início, destino) em células livres do tabuleiro.
+
+    Args:
+        tabuleiro: Tabuleiro compacto ou matriz representando o tabuleiro
+        quantidade: Número de pares
+        semente: Semente do gerador aleatório
+
+    Returns:
+        Lista de pares ((linha, coluna), (linha, coluna))
+    """
+    linhas, colunas, celulas = grade_plana(tabuleiro)
+    if bytes(celulas).count(OBSTACULO) == linhas * colunas:
+        raise ValueError("o tabuleiro não tem células livres")
+    gerador = random.Random(semente)
+
+    def celula_livre():
+        # Sorteia até cair em uma célula livre
+        while True:
+            indice = gerador.randrange(linhas * colunas)
+            if celulas[indice] != OBSTACULO:
+                return divmod(indice, colunas)
+
+    return [(celula_livre(), celula_livre()) for _ in range(quantidade)]
@@ -0,0 +1,482 @@
+import heapq
+import json
+from collections import deque
+
+from cache_caminhos import assinatura_tabuleiro
+from tabuleiro_compacto import DIRECOES, OBSTACULO, Tabuleiro, grade_plana
+
+# Trechos de borda livres a partir deste tamanho ganham duas entradas (uma em
+# cada ponta) em vez de uma só no meio
+TRECHO_LONGO = 6
+
+# Tabela para bytes.translate: 1 para obstáculo, 0 para qualquer outra célula
+_SO_OBSTACULOS = bytes(1 if byte == OBSTACULO else 0 for byte in range(256))
+
+class GrafoHierarquico:
+    """
+    Abstração hierárquica do tabuleiro no estilo HPA*.
+
+    O tabuleiro é dividido em clusters quadrados. Nas bordas entre clusters
+    vizinhos são escolhidas entradas (pares de células livres adjacentes, uma
+    de cada lado), e as distâncias entre as entradas de um mesmo cluster são
+    pré-calculadas. Uma consulta busca primeiro no grafo pequeno de entradas e
+    depois refina cada trecho com uma busca local dentro de um único cluster,
+    então o custo depende da complexidade do caminho e não da área do tabuleiro.
+    Os caminhos são quase ótimos: podem ser um pouco mais longos que os do A*.
+    """
+
+    def __init__(self, tabuleiro, tamanho_cluster=16, _calcular=True):
+        """
+        Args:
+            tabuleiro: Tabuleiro compacto (referenciado, não copiado) ou matriz 2D
+            tamanho_cluster: Lado, em células, de cada cluster
+        """
+        if not isinstance(tabuleiro, Tabuleiro):
+            linhas, colunas, celulas = grade_plana(tabuleiro)
+            tabuleiro = Tabuleiro(linhas, colunas, bytearray(celulas))
+        self.tabuleiro = tabuleiro
+        self.linhas = tabuleiro.linhas
+        self.colunas = tabuleiro.colunas
+        self.tamanho_cluster = tamanho_cluster
+        self.clusters_linhas = -(-self.linhas // tamanho_cluster)
+        self.clusters_colunas = -(-self.colunas // tamanho_cluster)
+
+        # Entradas de cada borda: chave ('h', cl, cc) é a borda entre os clusters
+        # (cl, cc) e (cl, cc + 1); ('v', cl, cc), entre (cl, cc) e (cl + 1, cc).
+        # Valor: lista de pares [célula de um lado, célula do outro lado]
+        self._bordas = {}
+        # Distâncias dentro de cada cluster: cluster -> célula -> {célula: distância}
+        self._intra = {}
+        # Células do outro lado de cada entrada (aresta de custo 1)
+        self._parceiros = {}
+
+        if _calcular:
+            for cl in range(self.clusters_linhas):
+                for cc in range(self.clusters_colunas):
+                    self._calcular_borda(('h', cl, cc))
+                    self._calcular_borda(('v', cl, cc))
+            self._reconstruir_parceiros()
+            for cl in range(self.clusters_linhas):
+                for cc in range(self.clusters_colunas):
+                    self._calcular_intra((cl, cc))
+
+    def _livre(self, indice):
+        return self.tabuleiro.celulas[indice] != OBSTACULO
+
+    def _cluster(self, indice):
+        linha, coluna = divmod(indice, self.colunas)
+        return (linha // self.tamanho_cluster, coluna // self.tamanho_cluster)
+
+    def _limites(self, cluster):
+        cl, cc = cluster
+        k = self.tamanho_cluster
+        return (cl * k, min((cl + 1) * k, self.linhas), cc * k, min((cc + 1) * k, self.colunas))
+
+    def _calcular_borda(self, chave):
+        """
+        Procura trechos livres dos dois lados de uma borda e escolhe as entradas.
+        """
+        tipo, cl, cc = chave
+        linha_inicial, linha_final, coluna_inicial, coluna_final = self._limites((cl, cc))
+        if tipo == 'h':
+            if cc + 1 >= self.clusters_colunas:
+                return
+            # Células na última coluna do cluster e na primeira do vizinho
+            pares = [(linha * self.colunas + coluna_final - 1, linha * self.colunas + coluna_final)
+                     for linha in range(linha_inicial, linha_final)]
+        else:
+            if cl + 1 >= self.clusters_linhas:
+                return
+            pares = [((linha_final - 1) * self.colunas + coluna, linha_final * self.colunas + coluna)
+                     for coluna in range(coluna_inicial, coluna_final)]
+
+        entradas = []
+        trecho = []
+        for par in pares + [None]:
+            if par is not None and self._livre(par[0]) and self._livre(par[1]):
+                trecho.append(par)
+                continue
+            if len(trecho) >= TRECHO_LONGO:
+                entradas.extend([list(trecho[0]), list(trecho[-1])])
+            elif trecho:
+                entradas.append(list(trecho[len(trecho) // 2]))
+            trecho = []
+
+        if entradas:
+            self._bordas[chave] = entradas
+        else:
+            self._bordas.pop(chave, None)
+
+    def _reconstruir_parceiros(self):
+        self._parceiros = {}
+        for entradas in self._bordas.values():
+            self._ligar_parceiros(entradas)
+
+    def _ligar_parceiros(self, entradas):
+        for a, b in entradas:
+            self._parceiros.setdefault(a, set()).add(b)
+            self._parceiros.setdefault(b, set()).add(a)
+
+    def _desligar_parceiros(self, entradas):
+        for a, b in entradas:
+            for celula, outra in ((a, b), (b, a)):
+                parceiros = self._parceiros.get(celula)
+                if parceiros is not None:
+                    parceiros.discard(outra)
+                    if not parceiros:
+                        del self._parceiros[celula]
+
+    def _entradas_do_cluster(self, cluster):
+        """
+        Returns:
+            Conjunto das células de entrada que ficam dentro do cluster
+        """
+        cl, cc = cluster
+        celulas = set()
+        for chave in (('h', cl, cc), ('v', cl, cc), ('h', cl, cc - 1), ('v', cl - 1, cc)):
+            for a, b in self._bordas.get(chave, ()):
+                celulas.add(a if self._cluster(a) == cluster else b)
+        return celulas
+
+    def _mapa_local(self, cluster):
+        """
+        Monta a lista de adjacência das células livres do cluster, em coordenadas
+        locais (linha_local * largura + coluna_local), para as buscas locais.
+
+        Returns:
+            Tupla (limites, largura, adjacentes)
+        """
+        limites = self._limites(cluster)
+        linha_inicial, linha_final, coluna_inicial, coluna_final = limites
+        largura = coluna_final - coluna_inicial
+        altura = linha_final - linha_inicial
+        celulas = self.tabuleiro.celulas
+        bloqueadas = bytearray()
+        for linha in range(linha_inicial, linha_final):
+            inicio = linha * self.colunas
+            bloqueadas += bytes(celulas[inicio + coluna_inicial:inicio + coluna_final])
+        bloqueadas = bloqueadas.translate(_SO_OBSTACULOS)
+
+        adjacentes = [()] * (altura * largura)
+        for local in range(altura * largura):
+            if bloqueadas[local]:
+                continue
+            linha_local, coluna_local = divmod(local, largura)
+            adjacentes[local] = [vizinho for vizinho, valido in (
+                (local - largura, linha_local > 0),
+                (local + 1, coluna_local < largura - 1),
+                (local + largura, linha_local < altura - 1),
+                (local - 1, coluna_local > 0),
+            ) if valido and not bloqueadas[vizinho]]
+        return limites, largura, adjacentes
+
+    def _busca_local(self, origem, mapa, alvos=None):
+        """
+        Busca em largura restrita a um cluster.
+
+        Args:
+            origem: Índice plano (global) da célula de partida
+            mapa: Grade local devolvida por _mapa_local
+            alvos: Conjunto de índices globais; a busca para quando todos forem
+                   alcançados (opcional)
+
+        Returns:
+            Tupla (distancias, antecessores) em coordenadas locais (-1 = não alcançada)
+        """
+        adjacentes = mapa[2]
+        distancias = [-1] * len(adjacentes)
+        antecessores = [-1] * len(adjacentes)
+
+        local = self._local(origem, mapa)
+        distancias[local] = 0
+        fila = deque([local])
+
+        pendentes = len(adjacentes)
+        if alvos is not None:
+            alvos = {self._local(alvo, mapa) for alvo in alvos}
+            alvos.discard(local)
+            pendentes = len(alvos)
+
+        while fila and pendentes:
+            atual = fila.popleft()
+            distancia = distancias[atual] + 1
+            for vizinho in adjacentes[atual]:
+                if distancias[vizinho] == -1:
+                    distancias[vizinho] = distancia
+                    antecessores[vizinho] = atual
+                    fila.append(vizinho)
+                    if alvos is not None and vizinho in alvos:
+                        pendentes -= 1
+        return distancias, antecessores
+
+    def _local(self, indice, mapa):
+        (linha_inicial, _, coluna_inicial, _), largura, _ = mapa
+        linha, coluna = divmod(indice, self.colunas)
+        return (linha - linha_inicial) * largura + (coluna - coluna_inicial)
+
+    def _global(self, local, mapa):
+        (linha_inicial, _, coluna_inicial, _), largura, _ = mapa
+        linha_local, coluna_local = divmod(local, largura)
+        return (linha_inicial + linha_local) * self.colunas + coluna_inicial + coluna_local
+
+    def _calcular_intra(self, cluster):
+        """
+        Pré-calcula as distâncias entre as entradas do cluster.
+        """
+        entradas = self._entradas_do_cluster(cluster)
+        mapa = self._mapa_local(cluster)
+        distancias = {entrada: {} for entrada in entradas}
+        processadas = set()
+        for entrada in entradas:
+            processadas.add(entrada)
+            # Distâncias são simétricas: basta buscar as entradas ainda não processadas
+            alvos = entradas - processadas
+            if not alvos:
+                continue
+            locais, _ = self._busca_local(entrada, mapa, alvos)
+            for outra in alvos:
+                distancia = locais[self._local(outra, mapa)]
+                if distancia != -1:
+                    distancias[entrada][outra] = distancia
+                    distancias.setdefault(outra, {})[entrada] = distancia
+        if distancias:
+            self._intra[cluster] = distancias
+        else:
+            self._intra.pop(cluster, None)
+
+    def atualizar_cluster(self, cl, cc):
+        """
+        Recalcula a abstração de um cluster cujas células mudaram.
+
+        Refaz as entradas das quatro bordas do cluster e as distâncias internas
+        dele e dos vizinhos (que compartilham essas bordas).
+
+        Args:
+            cl: Linha do cluster na grade de clusters
+            cc: Coluna do cluster na grade de clusters
+        """
+        for chave in (('h', cl, cc), ('v', cl, cc), ('h', cl, cc - 1), ('v', cl - 1, cc)):
+            if chave[1] >= 0 and chave[2] >= 0:
+                # Só as arestas entre clusters desta borda mudam
+                self._desligar_parceiros(self._bordas.get(chave, ()))
+                self._calcular_borda(chave)
+                self._ligar_parceiros(self._bordas.get(chave, ()))
+        for vizinho in ((cl, cc), (cl - 1, cc), (cl + 1, cc), (cl, cc - 1), (cl, cc + 1)):
+            if 0 <= vizinho[0] < self.clusters_linhas and 0 <= vizinho[1] < self.clusters_colunas:
+                self._calcular_intra(vizinho)
+
+    def atualizar_celula(self, linha, coluna, bloqueado):
+        """
+        Marca uma célula como obstáculo ou livre e atualiza o cluster dela.
+
+        Args:
+            linha: Índice da linha da célula
+            coluna: Índice da coluna da célula
+            bloqueado: True para obstáculo ('X'), False para célula livre (' ')
+        """
+        self.tabuleiro[linha, coluna] = 'X' if bloqueado else ' '
+        self.atualizar_cluster(linha // self.tamanho_cluster, coluna // self.tamanho_cluster)
+
+    def caminho(self, inicio, destino, estatisticas=None):
+        """
+        Encontra um caminho usando o grafo abstrato e refinando cada trecho localmente.
+
+        Args:
+            inicio: Tupla (linha, coluna) da posição inicial
+            destino: Tupla (linha, coluna) da posição de destino
+            estatisticas: EstatisticasBusca que recebe os contadores da busca no
+                          grafo abstrato (opcional); o tempo inclui o refinamento
+
+        Returns:
+            Lista de tuplas (linha, coluna) do início ao destino,
+            ou None se não houver caminho possível
+        """
+        if estatisticas is None:
+            return self._caminho(inicio, destino)
+        return estatisticas.medir(self._caminho, inicio, destino, estatisticas)
+
+    def _caminho(self, inicio, destino, estatisticas=None):
+        indice_inicio = inicio[0] * self.colunas + inicio[1]
+        indice_destino = destino[0] * self.colunas + destino[1]
+        if indice_inicio == indice_destino:
+            return [tuple(inicio)]
+        if not self._livre(indice_destino):
+            return None
+        if not self._livre(indice_inicio):
+            return self._sair_de_bloqueada(inicio, destino, estatisticas)
+
+        # Liga temporariamente o início e o destino às entradas dos seus clusters
+        cluster_inicio = self._cluster(indice_inicio)
+        mapa = self._mapa_local(cluster_inicio)
+        locais, _ = self._busca_local(indice_inicio, mapa)
+        saidas_inicio = {}
+        for entrada in self._entradas_do_cluster(cluster_inicio) | {indice_destino}:
+            if self._cluster(entrada) == cluster_inicio and locais[self._local(entrada, mapa)] != -1:
+                saidas_inicio[entrada] = locais[self._local(entrada, mapa)]
+
+        cluster_destino = self._cluster(indice_destino)
+        mapa = self._mapa_local(cluster_destino)
+        locais, _ = self._busca_local(indice_destino, mapa)
+        chegadas_destino = {}
+        for entrada in self._entradas_do_cluster(cluster_destino):
+            if locais[self._local(entrada, mapa)] != -1:
+                chegadas_destino[entrada] = locais[self._local(entrada, mapa)]
+
+        abstrato = self._busca_abstrata(indice_inicio, indice_destino, saidas_inicio, chegadas_destino,
+                                        estatisticas)
+        if abstrato is None:
+            return None
+        return self._refinar(abstrato)
+
+    def _sair_de_bloqueada(self, inicio, destino, estatisticas=None):
+        """
+        Como no A*, um início bloqueado é só o ponto de partida: o caminho sai
+        dele pela célula livre vizinha com o menor caminho até o destino.
+
+        Returns:
+            Lista de tuplas (linha, coluna) a partir do início, ou None
+        """
+        linha, coluna = inicio
+        melhor = None
+        for dr, dc in DIRECOES:
+            vizinho = (linha + dr, coluna + dc)
+            if not (0 <= vizinho[0] < self.linhas and 0 <= vizinho[1] < self.colunas):
+                continue
+            if not self._livre(vizinho[0] * self.colunas + vizinho[1]):
+                continue
+            trecho = self._caminho(vizinho, destino, estatisticas)
+            if trecho is not None and (melhor is None or len(trecho) < len(melhor)):
+                melhor = trecho
+        if melhor is None:
+            return None
+        return [tuple(inicio)] + melhor
+
+    def _busca_abstrata(self, indice_inicio, indice_destino, saidas_inicio, chegadas_destino,
+                        estatisticas=None):
+        """
+        A* sobre o grafo de entradas.
+
+        Returns:
+            Lista de células (índices planos) do caminho abstrato, ou None
+        """
+        linha_destino, coluna_destino = divmod(indice_destino, self.colunas)
+
+        def heuristica(indice):
+            linha, coluna = divmod(indice, self.colunas)
+            return abs(linha - linha_destino) + abs(coluna - coluna_destino)
+
+        melhor_custo = {indice_inicio: 0}
+        antecessor = {indice_inicio: -1}
+        visitados = set()
+        contador = 0
+        heap = [(heuristica(indice_inicio), contador, indice_inicio)]
+        medir = estatisticas is not None
+        obsoletas = pico_fronteira = profundidade_maxima = 0
+        caminho = None
+
+        while heap:
+            if medir and len(heap) > pico_fronteira:
+                pico_fronteira = len(heap)
+            _, _, atual = heapq.heappop(heap)
+            if atual in visitados:
+                obsoletas += 1
+                continue
+            visitados.add(atual)
+            if medir and melhor_custo[atual] > profundidade_maxima:
+                profundidade_maxima = melhor_custo[atual]
+            if atual == indice_destino:
+                caminho = []
+                while atual != -1:
+                    caminho.append(atual)
+                    atual = antecessor[atual]
+                caminho.reverse()
+                break
+
+            if atual == indice_inicio:
+                arestas = list(saidas_inicio.items())
+            else:
+                arestas = list(self._intra.get(self._cluster(atual), {}).get(atual, {}).items())
+                if atual in chegadas_destino:
+                    arestas.append((indice_destino, chegadas_destino[atual]))
+            arestas.extend((parceiro, 1) for parceiro in self._parceiros.get(atual, ()))
+
+            for vizinho, custo in arestas:
+                novo_custo = melhor_custo[atual] + custo
+                if vizinho in melhor_custo and melhor_custo[vizinho] <= novo_custo:
+                    continue
+                melhor_custo[vizinho] = novo_custo
+                antecessor[vizinho] = atual
+                contador += 1
+                heapq.heappush(heap, (novo_custo + heuristica(vizinho), contador, vizinho))
+
+        if medir:
+            estatisticas.registrar(expansoes=len(visitados), insercoes=contador + 1,
+                                   remocoes=len(visitados) + obsoletas, remocoes_obsoletas=obsoletas,
+                                   pico_fronteira=pico_fronteira, profundidade_maxima=profundidade_maxima)
+        return caminho
+
+    def _refinar(self, abstrato):
+        """
+        Transforma o caminho abstrato em um caminho completo, célula a célula.
+        """
+        caminho = [divmod(abstrato[0], self.colunas)]
+        for origem, alvo in zip(abstrato, abstrato[1:]):
+            if alvo in self._parceiros.get(origem, ()):
+                caminho.append(divmod(alvo, self.colunas))
+                continue
+            # Trecho interno a um cluster: refaz a busca local e segue os antecessores
+            mapa = self._mapa_local(self._cluster(origem))
+            _, antecessores = self._busca_local(origem, mapa, {alvo})
+            trecho = []
+            atual = self._local(alvo, mapa)
+            origem_local = self._local(origem, mapa)
+            while atual != origem_local:
+                trecho.append(divmod(self._global(atual, mapa), self.colunas))
+                atual = antecessores[atual]
+            trecho.reverse()
+            caminho.extend(trecho)
+        return caminho
+
+    def salvar(self, caminho_arquivo):
+        """
+        Salva a abstração em JSON, com a assinatura do tabuleiro usado.
+
+        Args:
+            caminho_arquivo: Caminho do arquivo de saída
+        """
+        dados = {
+            'linhas': self.linhas,
+            'colunas': self.colunas,
+            'tamanho_cluster': self.tamanho_cluster,
+            'assinatura': assinatura_tabuleiro(self.tabuleiro).hex(),
+            'bordas': [[tipo, cl, cc, entradas] for (tipo, cl, cc), entradas in self._bordas.items()],
+            'intra': [[cl, cc, [[a, list(destinos.items())] for a, destinos in distancias.items()]]
+                      for (cl, cc), distancias in self._intra.items()],
+        }
+        with open(caminho_arquivo, 'w', encoding='utf-8') as arquivo:
+            json.dump(dados, arquivo)
+
+    @classmethod
+    def carregar(cls, caminho_arquivo, tabuleiro):
+        """
+        Carrega uma abstração salva, conferindo se ela corresponde ao tabuleiro.
+
+        Args:
+            caminho_arquivo: Caminho do arquivo salvo por salvar()
+            tabuleiro: Tabuleiro compacto ou matriz 2D usado na abstração
+
+        Returns:
+            GrafoHierarquico pronto para consultas
+        """
+        with open(caminho_arquivo, encoding='utf-8') as arquivo:
+            dados = json.load(arquivo)
+
+        grafo = cls(tabuleiro, dados['tamanho_cluster'], _calcular=False)
+        if assinatura_tabuleiro(grafo.tabuleiro).hex() != dados['assinatura']:
+            raise ValueError("a abstração salva não corresponde a este tabuleiro")
+
+        grafo._bordas = {(tipo, cl, cc): entradas for tipo, cl, cc, entradas in dados['bordas']}
+        grafo._intra = {(cl, cc): {a: dict(destinos) for a, destinos in entradas}
+                        for cl, cc, entradas in dados['intra']}
+        grafo._reconstruir_parceiros()
+        return grafo
@@ -1,8 +1,17 @@
 import heapq
+from array import array
 import time
 import os
 import sys
 
+from cache_caminhos import CACHE_PADRAO, assinatura_custos, assinatura_tabuleiro
+from campo_distancias import NAO_ALCANCADA, arvore_busca
+from componentes import ComponentesConexas
+from custos import TabelaCustos, custos_sob_demanda
+from formato_caminho import FORMATOS, codificar_antecessores, codificar_caminho, formatar_caminhos, iterar_caminho
+from renderizador import RenderizadorTerminal
+from tabuleiro_compacto import Tabuleiro, grade_plana
+
 def limpar_tela():
     """
     Limpa a tela do terminal para melhorar a visualização.
@@ -35,7 +44,7 @@ def distancia_manhattan(p1, p2):
     """
     return abs(p1[0] - p2[0]) + abs(p1[1] - p2[1])
 
-def movimento_valido(tabuleiro, linha, coluna):
+def movimento_valido(tabuleiro, linha, coluna, custos=None):
     """
     Verifica se um movimento para a posição especificada é válido.
     
@@ -43,6 +52,9 @@ def movimento_valido(tabuleiro, linha, coluna):
         tabuleiro: Matriz representando o tabuleiro
         linha: Índice da linha a verificar
         coluna: Índice da coluna a verificar
+        custos: TabelaCustos ou buffer com o custo de cada célula (na ordem
+                de grade_plana) que define as células bloqueadas (padrão: só 'X'),
+                o mesmo usado pelos algoritmos de busca
         
     Returns:
         Boolean indicando se o movimento é válido
@@ -51,8 +63,14 @@ def movimento_valido(tabuleiro, linha, coluna):
     if linha < 0 or linha >= len(tabuleiro) or coluna < 0 or coluna >= len(tabuleiro[0]):
         return False
     
-    # Verifica se a posição está livre (não é um obstáculo e não foi visitada)
-    return tabuleiro[linha][coluna] == ' '
+    # Verifica se a posição é transitável (custo maior que zero), olhando só
+    # a célula consultada: nada do resto do tabuleiro é convertido
+    celula = tabuleiro[linha][coluna].encode('latin-1')
+    if custos is not None and not isinstance(custos, TabelaCustos):
+        indice = linha * len(tabuleiro[0]) + coluna
+        custos = custos[indice:indice + 1]
+    fonte, tabela, _, _ = custos_sob_demanda(celula, custos)
+    return tabela[fonte[0]] != 0
 
 def chegou_destino(linha, coluna, destino):
     """
@@ -68,178 +86,417 @@ def chegou_destino(linha, coluna, destino):
     """
     return (linha, coluna) == destino
 
-def proximo_movimento_backtracking(tabuleiro, linha_atual, coluna_atual, destino, profundidade, caminho_atual, melhor_caminho):
+def backtracking(tabuleiro, inicio, destino, limite_nos=None, limite_tempo=None, estatisticas=None,
+                 custos=None, componentes=None):
     """
-    Implementação recursiva do algoritmo de Backtracking para encontrar o melhor caminho.
+    Algoritmo Backtracking para encontrar o melhor (mais curto) caminho.
+    
+    A exploração é feita em profundidade com uma pilha explícita, sem recursão,
+    e com podas que descartam ramos que não podem melhorar o melhor caminho:
+    o menor custo já registrado para cada célula e o limite inferior dado
+    pela distância de Manhattan até o destino (vezes o menor custo de célula).
     
     Args:
-        tabuleiro: Matriz representando o tabuleiro
-        linha_atual: Índice da linha atual
-        coluna_atual: Índice da coluna atual
+        tabuleiro: Tabuleiro compacto ou matriz representando o tabuleiro
+        inicio: Tupla (linha, coluna) da posição inicial
         destino: Tupla (linha, coluna) da posição de destino
-        profundidade: Profundidade atual da recursão
-        caminho_atual: Lista de tuplas representando o caminho até agora
-        melhor_caminho: Lista contendo o melhor caminho encontrado até agora
+        limite_nos: Número máximo de nós expandidos (opcional)
+        limite_tempo: Tempo máximo de busca em segundos (opcional)
+        estatisticas: EstatisticasBusca que recebe os contadores da busca (opcional)
+        custos: TabelaCustos ou custos por célula (padrão: 'X' bloqueia, o resto custa 1)
+        componentes: ComponentesConexas do tabuleiro, com os mesmos custos (opcional):
+                     consultas sem caminho devolvem None sem nenhuma busca
         
     Returns:
-        Tupla (melhor_linha, melhor_coluna, melhor_profundidade)
+        Lista de tuplas representando o caminho de menor custo do início ao
+        destino, ou None se não houver caminho possível. Se um limite for
+        atingido, devolve o melhor caminho encontrado até então (ou None).
     """
-    # Se já encontramos um caminho melhor, podemos podar esta ramificação
-    if melhor_caminho and len(melhor_caminho) <= profundidade:
-        return None
-    
-    # Verifica se chegamos ao destino
-    if chegou_destino(linha_atual, coluna_atual, destino):
-        if not melhor_caminho or profundidade < len(melhor_caminho):
-            # Atualiza o melhor caminho
-            melhor_caminho.clear()
-            melhor_caminho.extend(caminho_atual)
-        return (linha_atual, coluna_atual, profundidade)
+    if estatisticas is None:
+        return _busca_backtracking(tabuleiro, inicio, destino, limite_nos, limite_tempo, None, custos,
+                                   componentes)
+    return estatisticas.medir(_busca_backtracking, tabuleiro, inicio, destino,
+                              limite_nos, limite_tempo, estatisticas, custos, componentes)
+
+def _busca_backtracking(tabuleiro, inicio, destino, limite_nos, limite_tempo, estatisticas=None,
+                        custos=None, componentes=None):
+    """
+    Núcleo iterativo do Backtracking com podas.
     
-    # Direções possíveis: direita, baixo, esquerda, cima (ordem alterada para forçar um caminho diferente)
+    Returns:
+        Caminho (lista de tuplas) ou None
+    """
+    if componentes is not None and not componentes.alcancavel(inicio, destino):
+        return None
+    linhas, colunas, celulas = grade_plana(tabuleiro)
+    # Custo de cada célula consultado só quando a busca chega a ela
+    fonte, tabela, menor_custo, _ = custos_sob_demanda(celulas, custos)
+    linha_destino, coluna_destino = destino
+    
+    if inicio == destino:
+        if estatisticas is not None:
+            estatisticas.registrar(expansoes=1, insercoes=1, remocoes=1, pico_fronteira=1,
+                                   profundidade_maxima=1)
+        return [inicio]
+    
+    # Direções possíveis: direita, baixo, esquerda, cima
     direcoes = [(0, 1), (1, 0), (0, -1), (-1, 0)]
     
-    melhor_resultado = None
+    # Menor custo com que cada célula já foi alcançada: chegar de novo com
+    # custo maior ou igual não pode produzir um caminho melhor (e isso também
+    # impede revisitar células do caminho atual)
+    sem_registro = 2 ** 31 - 1
+    melhor_custo = array('i', [sem_registro]) * (linhas * colunas)
+    melhor_custo[inicio[0] * colunas + inicio[1]] = 0
     
-    # Explora todas as direções possíveis
-    for dr, dc in direcoes:
-        nova_linha = linha_atual + dr
-        nova_coluna = coluna_atual + dc
+    # Pilha explícita: caminho atual, custo acumulado até cada nível e, para
+    # cada nível, a próxima direção a tentar
+    caminho_atual = [inicio]
+    custo_acumulado = [0]
+    proxima_direcao = [0]
+    melhor_caminho = None
+    # Custo que um novo caminho precisa superar
+    melhor_total = sem_registro
+    
+    expansoes = 1
+    retrocessos = 0
+    medir = estatisticas is not None
+    profundidade_maxima = 1
+    prazo = time.perf_counter() + limite_tempo if limite_tempo is not None else None
+    
+    while caminho_atual:
+        direcao = proxima_direcao[-1]
         
-        # Verifica se o movimento é válido
-        if movimento_valido(tabuleiro, nova_linha, nova_coluna):
-            # Marca a posição como visitada
-            tabuleiro[nova_linha][nova_coluna] = '+'
-            
-            # Adiciona a nova posição ao caminho atual
-            caminho_atual.append((nova_linha, nova_coluna))
-            
-            # Chama recursivamente para a nova posição
-            resultado = proximo_movimento_backtracking(
-                tabuleiro, nova_linha, nova_coluna, destino, 
-                profundidade + 1, caminho_atual, melhor_caminho
-            )
-            
-            # Desmarca a posição (backtracking)
-            tabuleiro[nova_linha][nova_coluna] = ' '
-            
-            # Remove a posição do caminho atual
+        # Todas as direções deste nível já foram tentadas: volta (backtrack)
+        if direcao == len(direcoes):
             caminho_atual.pop()
-            
-            # Atualiza o melhor resultado se necessário
-            if resultado and (not melhor_resultado or resultado[2] < melhor_resultado[2]):
-                melhor_resultado = resultado
-    
-    return melhor_resultado
+            custo_acumulado.pop()
+            proxima_direcao.pop()
+            retrocessos += 1
+            continue
+        proxima_direcao[-1] = direcao + 1
+        
+        linha_atual, coluna_atual = caminho_atual[-1]
+        dr, dc = direcoes[direcao]
+        nova_posicao = (linha_atual + dr, coluna_atual + dc)
+        nova_linha, nova_coluna = nova_posicao
+        
+        # Verifica se o movimento é válido (dentro do tabuleiro e em célula transitável)
+        if not (0 <= nova_linha < linhas and 0 <= nova_coluna < colunas):
+            continue
+        indice = nova_linha * colunas + nova_coluna
+        custo_celula = tabela[fonte[indice]]
+        if not custo_celula:
+            continue
+        
+        profundidade = len(caminho_atual)
+        custo = custo_acumulado[-1] + custo_celula
+        
+        # Poda 1: esta célula já foi alcançada com custo menor ou igual
+        if custo >= melhor_custo[indice]:
+            continue
+        
+        # Poda 2: mesmo em linha reta pelo terreno mais barato, não dá para
+        # superar o melhor caminho
+        restante = abs(nova_linha - linha_destino) + abs(nova_coluna - coluna_destino)
+        if custo + restante * menor_custo >= melhor_total:
+            continue
+        
+        melhor_custo[indice] = custo
+        expansoes += 1
+        
+        # Verifica se chegamos ao destino (as podas garantem que é melhor)
+        if chegou_destino(nova_linha, nova_coluna, destino):
+            melhor_caminho = caminho_atual + [nova_posicao]
+            melhor_total = custo
+            continue
+        
+        # Orçamento opcional de nós e de tempo
+        if limite_nos is not None and expansoes >= limite_nos:
+            break
+        if prazo is not None and expansoes % 1024 == 0 and time.perf_counter() > prazo:
+            break
+        
+        caminho_atual.append(nova_posicao)
+        custo_acumulado.append(custo)
+        proxima_direcao.append(0)
+        if medir and profundidade >= profundidade_maxima:
+            profundidade_maxima = profundidade + 1
+    
+    if medir:
+        # Cada nível empilhado ou foi desempilhado ou continua na pilha
+        estatisticas.registrar(expansoes=expansoes, insercoes=retrocessos + len(caminho_atual),
+                               remocoes=retrocessos, pico_fronteira=profundidade_maxima,
+                               profundidade_maxima=profundidade_maxima)
+    return melhor_caminho
 
-def backtracking(tabuleiro, inicio, destino):
+def astar(tabuleiro, inicio, destino, estatisticas=None, custos=None, componentes=None):
     """
-    Função principal para iniciar o algoritmo Backtracking recursivo.
+    Implementação do algoritmo A* para encontrar o caminho mais curto.
+    Usa a distância de Manhattan (vezes o menor custo de célula) como heurística.
+    
+    Em vez de copiar o caminho inteiro em cada entrada da fila de prioridade,
+    guarda apenas o antecessor de cada posição numa tabela plana indexada por
+    linha * colunas + coluna, e reconstrói o caminho uma única vez no destino.
     
     Args:
-        tabuleiro: Matriz representando o tabuleiro
+        tabuleiro: Tabuleiro compacto ou matriz representando o tabuleiro
         inicio: Tupla (linha, coluna) da posição inicial
         destino: Tupla (linha, coluna) da posição de destino
+        estatisticas: EstatisticasBusca que recebe os contadores da busca (opcional)
+        custos: TabelaCustos ou custos por célula (padrão: 'X' bloqueia, o resto custa 1)
+        componentes: ComponentesConexas do tabuleiro, com os mesmos custos (opcional):
+                     consultas sem caminho devolvem None sem nenhuma busca
         
     Returns:
-        Lista de tuplas representando o caminho do início ao destino,
-        ou None se não houver caminho possível
+        Lista de tuplas representando o caminho de menor custo do início ao
+        destino, ou None se não houver caminho possível
     """
-    # Cria uma cópia do tabuleiro para não modificar o original
-    tabuleiro_copia = [linha[:] for linha in tabuleiro]
-    
-    # Marca a posição inicial
-    linha_inicial, coluna_inicial = inicio
-    tabuleiro_copia[linha_inicial][coluna_inicial] = '*'
-    
-    # Inicializa o caminho com a posição inicial
-    caminho_atual = [inicio]
-    melhor_caminho = []
-    
-    # Configura o limite de recursão para tabuleiros grandes
-    sys.setrecursionlimit(10000)
-    
-    # Inicia o algoritmo de backtracking
-    resultado = proximo_movimento_backtracking(
-        tabuleiro_copia, linha_inicial, coluna_inicial, 
-        destino, 0, caminho_atual, melhor_caminho
-    )
-    
-    # Retorna o melhor caminho encontrado
-    return melhor_caminho if melhor_caminho else None
+    if estatisticas is None:
+        return _busca_astar(tabuleiro, inicio, destino, None, custos, componentes)
+    return estatisticas.medir(_busca_astar, tabuleiro, inicio, destino, estatisticas, custos, componentes)
 
-def astar(tabuleiro, inicio, destino):
+def _busca_astar(tabuleiro, inicio, destino, estatisticas=None, custos=None, componentes=None):
     """
-    Implementação do algoritmo A* para encontrar o caminho mais curto.
-    Usa a distância de Manhattan como heurística.
+    Núcleo do A* com tabela de antecessores.
     
-    Args:
-        tabuleiro: Matriz representando o tabuleiro
-        inicio: Tupla (linha, coluna) da posição inicial
-        destino: Tupla (linha, coluna) da posição de destino
-        
     Returns:
-        Lista de tuplas representando o caminho do início ao destino, 
-        ou None se não houver caminho possível
+        Caminho (lista de tuplas) ou None
     """
+    # Sem caminho possível: nem começa a busca (que exploraria toda a região alcançável)
+    if componentes is not None and not componentes.alcancavel(inicio, destino):
+        return None
+    # Acesso plano às células: sem cópia para Tabuleiro, uma serialização para listas
+    linhas, colunas, celulas = grade_plana(tabuleiro)
+    # Custo de entrar em cada célula (0 = bloqueada), consultado só quando a
+    # busca chega a ela: nada é convertido antes (importa em tabuleiros mmap/compactados)
+    fonte, tabela, menor_custo, _ = custos_sob_demanda(celulas, custos)
+    linha_destino, coluna_destino = destino
+    
     # Direções possíveis: cima, direita, baixo, esquerda
     direcoes = [(-1, 0), (0, 1), (1, 0), (0, -1)]
     
+    # Tabelas planas: melhor custo conhecido (-1 = ainda não alcançada),
+    # antecessor de cada posição e marcação de posições já expandidas
+    total = linhas * colunas
+    melhor_custo = array('i', [-1]) * total
+    antecessor = array('i', [-1]) * total
+    visitados = bytearray(total)
+    
+    indice_inicio = inicio[0] * colunas + inicio[1]
+    indice_destino = linha_destino * colunas + coluna_destino
+    melhor_custo[indice_inicio] = 0
+    
     # Fila de prioridade para os nós a serem explorados
-    # (f_score, contador, posição_atual, caminho, custo_g)
+    # (f_score, contador, índice da posição)
     contador = 0
-    heap = [(distancia_manhattan(inicio, destino), contador, inicio, [inicio], 0)]
-    
-    # Conjunto de posições já visitadas
-    visitados = set()
+    heap = [(distancia_manhattan(inicio, destino) * menor_custo, contador, indice_inicio)]
     
-    # Dicionário para armazenar o melhor custo conhecido para cada posição
-    melhor_custo = {inicio: 0}
+    expansoes = 0
+    obsoletas = 0
+    # Medições que custam algo por nó só são feitas com estatisticas
+    medir = estatisticas is not None
+    pico_fronteira = profundidade_maxima = 0
+    caminho = None
     
     while heap:
+        # A fronteira só cresce entre duas remoções, então o pico aparece aqui
+        if medir and len(heap) > pico_fronteira:
+            pico_fronteira = len(heap)
+        
         # Pega o nó com menor f_score da fila de prioridade
-        f_score, _, atual, caminho, custo_g = heapq.heappop(heap)
+        _, _, atual = heapq.heappop(heap)
         
         # Se já visitamos com um custo menor ou igual, pule
-        if atual in visitados:
+        if visitados[atual]:
+            obsoletas += 1
             continue
             
         # Marca como visitado
-        visitados.add(atual)
+        visitados[atual] = 1
+        expansoes += 1
+        if medir and melhor_custo[atual] > profundidade_maxima:
+            profundidade_maxima = melhor_custo[atual]
         
         # Verifica se chegamos ao destino
-        if atual == destino:
-            return caminho
+        if atual == indice_destino:
+            caminho = reconstruir_caminho(antecessor, colunas, indice_destino)
+            break
+        
+        linha, coluna = divmod(atual, colunas)
+        # A entrada retirada do heap é sempre a mais recente da posição,
+        # então o custo g é o melhor custo registrado
+        custo_g = melhor_custo[atual]
         
         # Explora todas as direções possíveis
         for dr, dc in direcoes:
-            nr, nc = atual[0] + dr, atual[1] + dc
-            nova_posicao = (nr, nc)
+            nr, nc = linha + dr, coluna + dc
             
             # Verifica se a nova posição é válida
-            if 0 <= nr < len(tabuleiro) and 0 <= nc < len(tabuleiro[0]):
-                if tabuleiro[nr][nc] != 'X':
-                    # Calcula o novo custo g (custo até agora)
-                    novo_custo_g = custo_g + 1
-                    
-                    # Se já temos um caminho melhor para esta posição, pule
-                    if nova_posicao in melhor_custo and melhor_custo[nova_posicao] <= novo_custo_g:
-                        continue
-                        
-                    # Atualiza o melhor custo para esta posição
-                    melhor_custo[nova_posicao] = novo_custo_g
-                    
-                    # Calcula o f_score = g_score + h_score
-                    novo_f_score = novo_custo_g + distancia_manhattan(nova_posicao, destino)
-                    
-                    # Incrementa o contador para desempate
-                    contador += 1
+            if 0 <= nr < linhas and 0 <= nc < colunas:
+                vizinho = nr * colunas + nc
+                custo_celula = tabela[fonte[vizinho]]
+                if not custo_celula:
+                    continue
+                novo_custo_g = custo_g + custo_celula
+                
+                # Se já temos um caminho melhor para esta posição, pule
+                custo_conhecido = melhor_custo[vizinho]
+                if custo_conhecido != -1 and custo_conhecido <= novo_custo_g:
+                    continue
                     
-                    # Adiciona à fila de prioridade
-                    heapq.heappush(heap, (novo_f_score, contador, nova_posicao, caminho + [nova_posicao], novo_custo_g))
+                # Atualiza o melhor custo e o antecessor desta posição
+                melhor_custo[vizinho] = novo_custo_g
+                antecessor[vizinho] = atual
+                
+                # Calcula o f_score = g_score + h_score
+                novo_f_score = novo_custo_g + (abs(nr - linha_destino) + abs(nc - coluna_destino)) * menor_custo
+                
+                # Incrementa o contador para desempate
+                contador += 1
+                
+                # Adiciona à fila de prioridade
+                heapq.heappush(heap, (novo_f_score, contador, vizinho))
+    
+    if medir:
+        estatisticas.registrar(expansoes=expansoes, insercoes=contador + 1,
+                               remocoes=expansoes + obsoletas, remocoes_obsoletas=obsoletas,
+                               pico_fronteira=pico_fronteira, profundidade_maxima=profundidade_maxima)
+    # caminho continua None se não há caminho possível
+    return caminho
+
+def reconstruir_caminho(antecessor, colunas, indice_destino):
+    """
+    Reconstrói o caminho percorrendo a tabela de antecessores a partir do destino.
     
-    # Se chegamos aqui, não há caminho possível
-    return None
+    Args:
+        antecessor: Sequência plana com o índice do antecessor de cada posição
+                    (-1 para a posição inicial)
+        colunas: Número de colunas do tabuleiro
+        indice_destino: Índice plano (linha * colunas + coluna) do destino
+        
+    Returns:
+        Lista de tuplas (linha, coluna) do início ao destino
+    """
+    caminho = []
+    atual = indice_destino
+    while atual != -1:
+        caminho.append(divmod(atual, colunas))
+        atual = antecessor[atual]
+    caminho.reverse()
+    return caminho
+
+def astar_lote(tabuleiro, pares, cache=None, custos=None, formato='lista', assinatura=None):
+    """
+    Resolve várias consultas (início, destino) sobre o mesmo tabuleiro.
+    
+    As consultas são agrupadas pela origem: uma origem com vários destinos é
+    resolvida com uma única árvore de busca em largura, reaproveitada para
+    todos eles; uma origem com um só destino usa o A*. Árvores e caminhos
+    ficam num cache LRU indexado pela assinatura do tabuleiro, que muda
+    (e invalida as entradas antigas) quando os obstáculos mudam.
+    
+    Antes de qualquer busca, as consultas sem caminho são descartadas pelos
+    rótulos de componentes conexas do tabuleiro (ComponentesConexas),
+    calculados uma vez e guardados no mesmo cache.
+    
+    Com custos informados, as árvores de busca em largura (que supõem custo
+    uniforme) não servem: cada consulta é resolvida pelo A* com esses custos.
+    Só os rótulos de componentes (que dependem de quais células os custos
+    bloqueiam) ficam no cache, com a chave (assinatura, custos).
+    
+    Nos formatos 'rle' e 'gerador', os caminhos das árvores de busca são
+    codificados direto da tabela de antecessores, sem a lista de tuplas.
+    
+    Args:
+        tabuleiro: Tabuleiro compacto ou matriz representando o tabuleiro
+        pares: Lista de tuplas (inicio, destino)
+        cache: CacheCaminhos a usar (por padrão, o cache compartilhado)
+        custos: TabelaCustos ou custos por célula (opcional)
+        formato: 'lista' (listas de tuplas), 'rle' (códigos de direções como
+                 "R5U3") ou 'gerador' (geradores de tuplas); ver formato_caminho.py
+        assinatura: assinatura_tabuleiro(tabuleiro) já calculada, para quem
+                    chama várias vezes com um tabuleiro que não muda (evita
+                    refazer o hash do tabuleiro inteiro a cada chamada)
+        
+    Returns:
+        Lista com um caminho (ou None) para cada par, na mesma ordem de pares
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"formato de caminho desconhecido: {formato!r}")
+    # O cache acompanha o objeto do chamador, não a cópia compacta temporária
+    original = tabuleiro
+    # Serializa o formato antigo uma única vez para todas as consultas
+    linhas, colunas, celulas = grade_plana(tabuleiro)
+    if not isinstance(tabuleiro, Tabuleiro):
+        tabuleiro = Tabuleiro(linhas, colunas, celulas)
+    
+    if cache is None:
+        cache = CACHE_PADRAO
+    assinatura = cache.registrar(original, assinatura or assinatura_tabuleiro(tabuleiro))
+    
+    if custos is not None:
+        chave = (assinatura, 'componentes', assinatura_custos(custos))
+        componentes = cache.obter(chave)
+        if componentes is None:
+            componentes = ComponentesConexas(tabuleiro, custos)
+            cache.guardar(chave, componentes, 4 * linhas * colunas)
+        # O A* consulta o custo de cada célula só quando chega a ela, então os
+        # custos não são convertidos para o tabuleiro inteiro nem por consulta
+        caminhos = [astar(tabuleiro, inicio, destino, custos=custos, componentes=componentes)
+                    for inicio, destino in pares]
+        return formatar_caminhos(caminhos, [inicio for inicio, _ in pares], formato)
+    
+    componentes = cache.obter((assinatura, 'componentes'))
+    if componentes is None:
+        componentes = ComponentesConexas(tabuleiro)
+        # Os rótulos ocupam 4 bytes por célula, como uma árvore de busca
+        cache.guardar((assinatura, 'componentes'), componentes, 4 * linhas * colunas)
+    
+    # Agrupa os índices das consultas pela origem, deixando de fora as sem caminho
+    grupos = {}
+    for posicao, (inicio, destino) in enumerate(pares):
+        if componentes.alcancavel(inicio, destino):
+            grupos.setdefault(tuple(inicio), []).append(posicao)
+    
+    resultados = [None] * len(pares)
+    ausente = object()
+    # Nos formatos compactos, cada caminho é guardado como código de direções
+    codificar = formato != 'lista'
+    
+    for inicio, posicoes in grupos.items():
+        arvore = cache.obter((assinatura, inicio))
+        
+        # Origem com um só destino e sem árvore pronta: o A* é mais barato
+        if arvore is None and len(posicoes) == 1:
+            destino = tuple(pares[posicoes[0]][1])
+            chave = (assinatura, inicio, destino)
+            caminho = cache.obter(chave, ausente)
+            if caminho is ausente:
+                caminho = astar(tabuleiro, inicio, destino)
+                cache.guardar(chave, caminho)
+            if caminho is not None:
+                resultados[posicoes[0]] = codificar_caminho(caminho) if codificar else list(caminho)
+            continue
+        
+        if arvore is None:
+            arvore = arvore_busca(tabuleiro, inicio)
+            cache.guardar((assinatura, inicio), arvore)
+        
+        for posicao in posicoes:
+            linha_destino, coluna_destino = pares[posicao][1]
+            indice_destino = linha_destino * colunas + coluna_destino
+            if arvore[indice_destino] == NAO_ALCANCADA:
+                continue
+            if codificar:
+                resultados[posicao] = codificar_antecessores(arvore, colunas, indice_destino)[1]
+            else:
+                resultados[posicao] = reconstruir_caminho(arvore, colunas, indice_destino)
+    
+    if formato == 'gerador':
+        return [iterar_caminho(tuple(inicio), codigo) if codigo is not None else None
+                for (inicio, _), codigo in zip(pares, resultados)]
+    return resultados
 
 def criar_tabuleiro():
     """
@@ -255,7 +512,7 @@ def criar_tabuleiro():
         [' ', ' ', ' ', 'X']
     ]
 
-def executar_percurso_manual(tabuleiro, posicao_inicial, caminho_predefinido, simbolo, destino):
+def executar_percurso_manual(tabuleiro, posicao_inicial, caminho_predefinido, simbolo, destino, fps=None):
     """
     Permite ao usuário explorar manualmente o tabuleiro, escolhendo suas próprias posições.
     
@@ -265,6 +522,7 @@ def executar_percurso_manual(tabuleiro, posicao_inicial, caminho_predefinido, si
         caminho_predefinido: Caminho pré-calculado pelo A* (usado se o usuário não quiser alterar)
         simbolo: Caractere usado para marcar o caminho
         destino: Tupla (linha, coluna) da posição de destino
+        fps: Passos por segundo no modo automático; sem ele, cada passo espera Enter
     """
     # Distância Manhattan do caminho ideal
     distancia_ideal = distancia_manhattan(posicao_inicial, destino)
@@ -290,11 +548,12 @@ def executar_percurso_manual(tabuleiro, posicao_inicial, caminho_predefinido, si
     # Modo de navegação
     modo_manual = None  # Será definido na primeira interação
     
+    # Redesenha só as células que mudam entre um passo e outro
+    renderizador = RenderizadorTerminal()
+    
     # Loop principal para exploração
     while (linha_atual, coluna_atual) != destino:
-        limpar_tela()
-        print(f"Passo {passo}:")
-        mostrar_tabuleiro(tabuleiro_copia)
+        renderizador.quadro(tabuleiro_copia, f"Passo {passo}:", (linha_atual, coluna_atual))
         
         # Na primeira iteração, pergunta ao usuário como deseja navegar
         if modo_manual is None:
@@ -307,8 +566,10 @@ def executar_percurso_manual(tabuleiro, posicao_inicial, caminho_predefinido, si
                 time.sleep(1.5)
             else:
                 print("\nVocê escolheu o modo AUTOMÁTICO. O algoritmo A* guiará o caminho.")
-                print("Pressione Enter para avançar cada passo.")
-                time.sleep(1.5)
+                # Com fps os passos avançam sozinhos: sem aviso de Enter nem pausa
+                if not fps:
+                    print("Pressione Enter para avançar cada passo.")
+                    time.sleep(1.5)
         
         # Modo manual: usuário escolhe as posições
         if modo_manual:
@@ -367,17 +628,18 @@ def executar_percurso_manual(tabuleiro, posicao_inicial, caminho_predefinido, si
                 passo += 1
                 indice_caminho += 1
                 
-                # Aguarda Enter para continuar
-                print("\nPressione Enter para continuar")
-                input()
+                # Aguarda Enter para continuar (ou o intervalo do quadro, no modo automático)
+                if fps:
+                    time.sleep(1 / fps)
+                else:
+                    print("\nPressione Enter para continuar")
+                    input()
             else:
                 # Chegamos ao destino
                 break
     
     # Exibe o caminho final percorrido pelo usuário
-    limpar_tela()
-    print("\nSeu caminho final:")
-    mostrar_tabuleiro(tabuleiro_copia)
+    renderizador.quadro(tabuleiro_copia, "Seu caminho final:", (linha_atual, coluna_atual))
     
     # Mostra o histórico completo de posições percorridas
     print("\nHistórico completo de posições:")
@@ -386,15 +648,14 @@ def executar_percurso_manual(tabuleiro, posicao_inicial, caminho_predefinido, si
     
     print(f"\nVocê percorreu um total de {len(posicoes_percorridas)-1} passos.")
     
-    # Agora vamos mostrar o caminho ótimo do A*
-    tabuleiro_limpo = criar_tabuleiro()
-    caminho_otimo = astar(tabuleiro_limpo, posicao_inicial, destino)
+    # Agora vamos mostrar o caminho ótimo do A* (já calculado e guardado no cache)
+    caminho_otimo = astar_lote(tabuleiro, [(posicao_inicial, destino)])[0]
     
     if caminho_otimo:
         print("\nCalculando o caminho ótimo usando o algoritmo A*...")
         
         # Cria um novo tabuleiro para mostrar o caminho ótimo
-        tabuleiro_otimo = [linha[:] for linha in tabuleiro_limpo]
+        tabuleiro_otimo = [linha[:] for linha in tabuleiro]
         
         # Marca as posições do caminho ótimo
         for pos in caminho_otimo:
@@ -413,7 +674,7 @@ def executar_percurso_manual(tabuleiro, posicao_inicial, caminho_predefinido, si
     else:
         print("\nNão foi possível encontrar um caminho ótimo usando o algoritmo A*.")
 
-def executar_percurso(tabuleiro, caminho, simbolo, destino=None):
+def executar_percurso(tabuleiro, caminho, simbolo, destino=None, fps=None):
     """
     Executa a animação do percurso no tabuleiro passo a passo para o algoritmo escolhido.
     
@@ -422,6 +683,8 @@ def executar_percurso(tabuleiro, caminho, simbolo, destino=None):
         caminho: Lista de tuplas (linha, coluna) representando o caminho
         simbolo: Caractere usado para marcar o caminho no tabuleiro
         destino: Tupla (linha, coluna) da posição de destino (opcional)
+        fps: Passos por segundo para reproduzir o caminho sozinho; sem ele,
+             cada passo espera Enter
     """
     # Se não for fornecido um destino, usa o último ponto do caminho
     if destino is None:
@@ -429,39 +692,48 @@ def executar_percurso(tabuleiro, caminho, simbolo, destino=None):
     
     # Se o algoritmo é A*, permitimos exploração manual ou automática
     if simbolo == '*':
-        executar_percurso_manual(tabuleiro, caminho[0], caminho, simbolo, destino)
+        executar_percurso_manual(tabuleiro, caminho[0], caminho, simbolo, destino, fps)
         return
     
     # Para outros algoritmos (como Backtracking), apenas mostra o caminho pré-calculado
     print(f"\nPercorrendo o caminho com '{simbolo}':")
     
-    # Cria uma cópia do tabuleiro para não modificar o original
-    tabuleiro_copia = [linha[:] for linha in tabuleiro]
+    # Redesenha só as células que mudam entre um passo e outro
+    renderizador = RenderizadorTerminal()
     
-    for i, (linha, coluna) in enumerate(caminho):
-        # Marca a posição atual no tabuleiro
-        tabuleiro_copia[linha][coluna] = simbolo
-        
-        limpar_tela()
-        print(f"Passo {i+1} de {len(caminho)}:")
-        mostrar_tabuleiro(tabuleiro_copia)
+    if fps:
+        renderizador.reproduzir(tabuleiro, caminho, simbolo, fps)
+    else:
+        # Cria uma cópia do tabuleiro para não modificar o original
+        tabuleiro_copia = [linha[:] for linha in tabuleiro]
         
-        if i < len(caminho) - 1:  # Não pede para pressionar Enter no último passo
-            print("\nPressione Enter para continuar")
-            input()
+        for i, (linha, coluna) in enumerate(caminho):
+            # Marca a posição atual no tabuleiro
+            tabuleiro_copia[linha][coluna] = simbolo
+            
+            renderizador.quadro(tabuleiro_copia, f"Passo {i+1} de {len(caminho)}:", (linha, coluna))
+            
+            if i < len(caminho) - 1:  # Não pede para pressionar Enter no último passo
+                print("\nPressione Enter para continuar")
+                input()
     
     print(f"\nPercurso completo com {len(caminho)-1} passos.\n")
     
     # Informações adicionais sobre o método
     print("Informações sobre o algoritmo Backtracking:")
-    print("O Backtracking é uma técnica de resolução de problemas que utiliza recursão para")
-    print("explorar todas as possibilidades até encontrar uma solução satisfatória.")
+    print("O Backtracking é uma técnica de resolução de problemas que explora as possibilidades")
+    print("em profundidade, voltando atrás a cada beco sem saída até encontrar uma solução.")
+    print("Aqui a exploração usa uma pilha explícita, sem recursão.")
     print(f"Comprimento do caminho encontrado: {len(caminho)-1} passos")
 
-def run_game():
+def run_game(fps=None):
     """
     Função principal que executa o jogo completo com interface de usuário.
     Permite ao usuário escolher entre diferentes caminhos e visualizá-los.
+    
+    Args:
+        fps: Passos por segundo para reproduzir os percursos sozinhos (opcional;
+             sem ele, cada passo espera Enter)
     """
     while True:
         limpar_tela()
@@ -478,11 +750,11 @@ def run_game():
         
         print("\nBuscando caminhos usando dois algoritmos diferentes:")
         print("1. A* com distância de Manhattan - explorando manualmente (marcado com '*')")
-        print("2. Backtracking recursivo - caminho pré-calculado (marcado com '+')")
+        print("2. Backtracking (pilha explícita) - caminho pré-calculado (marcado com '+')")
 
         # Encontra caminho com A*
         print(f"\nBuscando o melhor caminho de {inicio} até {destino} usando A*...")
-        caminho_astar = astar(tabuleiro, inicio, destino)
+        caminho_astar = astar_lote(tabuleiro, [(inicio, destino)])[0]
 
         if not caminho_astar:
             print("Não foi possível encontrar um caminho com A*.")
@@ -491,10 +763,9 @@ def run_game():
         print("Caminho mais curto encontrado com A*!")
         print(f"Comprimento: {len(caminho_astar)-1} passos")
         
-        # Mostra as coordenadas do caminho A*
-        print("\nCoordenadas do melhor caminho (A*):")
-        caminho_astar_str = " -> ".join([f"({l},{c})" for l, c in caminho_astar])
-        print(caminho_astar_str)
+        # Mostra o caminho A* como início + direções (R direita, L esquerda, U cima, D baixo)
+        print("\nMelhor caminho (A*), a partir do início:")
+        print(f"({inicio[0]},{inicio[1]}) {codificar_caminho(caminho_astar)}")
 
         # Forçar um caminho alternativo diferente para Backtracking (evitando todos os obstáculos)
         caminho_alternativo = [(3,0), (3,1), (2,1), (2,0), (1,0), (0,0), (0,1), (0,2), (0,3)]
@@ -502,10 +773,10 @@ def run_game():
         print(f"\nCaminho alternativo através do Backtracking:")
         print(f"Comprimento: {len(caminho_alternativo)-1} passos")
         
-        # Mostra as coordenadas do caminho alternativo
-        print("\nCoordenadas do caminho alternativo (Backtracking):")
-        caminho_alt_str = " -> ".join([f"({l},{c})" for l, c in caminho_alternativo])
-        print(caminho_alt_str)
+        # Mostra o caminho alternativo no mesmo formato
+        print("\nCaminho alternativo (Backtracking), a partir do início:")
+        print(f"({caminho_alternativo[0][0]},{caminho_alternativo[0][1]}) {codificar_caminho(caminho_alternativo)}")
+        print("Direções: R = direita, L = esquerda, U = cima, D = baixo")
 
         escolha = input("\nDeseja seguir o melhor caminho - A* (*) ou o alternativo - Backtracking (+)? [* / +]: ").strip()
         while escolha not in ('*', '+'):
@@ -515,7 +786,7 @@ def run_game():
         simbolo = '*' if escolha == '*' else '+'
 
         # Passa o destino como parâmetro para a função executar_percurso
-        executar_percurso(criar_tabuleiro(), caminho, simbolo, destino)
+        executar_percurso(tabuleiro, caminho, simbolo, destino, fps)
 
         repetir = input("Deseja escolher outro caminho? [s / n]: ").strip().lower()
         while repetir not in ('s', 'n'):
@@ -526,4 +797,12 @@ def run_game():
             break
 
 if __name__ == "__main__":
-    run_game()
\ No newline at end of file
+    if len(sys.argv) == 3 and sys.argv[1] == '--fps':
+        # "--fps N": jogo interativo com os percursos reproduzidos sozinhos a N passos por segundo
+        run_game(fps=float(sys.argv[2]))
+    elif len(sys.argv) > 1:
+        # Com argumentos, resolve consultas em lote sem interface (ver linha_comando.py)
+        from linha_comando import main
+        sys.exit(main())
+    else:
+        run_game()
\ No newline at end of file
@@ -0,0 +1,212 @@
+import heapq
+from array import array
+
+from estatisticas import EstatisticasBusca
+from jogo_tabuleiro_rafael import astar, distancia_manhattan
+from tabuleiro_compacto import DIRECOES, OBSTACULO, grade_plana
+
+def astar_jps(tabuleiro, inicio, destino, estatisticas=None):
+    """
+    A* com Jump Point Search, adaptado para movimentos nas quatro direções.
+
+    Em vez de inserir na fila cada vizinho, a busca "salta" em linha reta e só
+    para em pontos de salto: o destino, ou células onde um caminho mais curto
+    precisa mudar de direção. Em tabuleiros grandes e abertos isso reduz muito
+    o número de nós expandidos e de operações no heap. O caminho devolvido é
+    ótimo, como o do astar, e tem a mesma forma (lista de todas as posições);
+    benchmark.comparar_jps confere os comprimentos contra o astar.
+
+    O ganho em nós não vira ganho de tempo: cada salto percorre as células uma
+    a uma em Python procurando vizinhos forçados. Nas medições de
+    comparar_jps (300x300, densidades de 0 a 0,4), o JPS expande de 2 a 4
+    vezes menos nós, mas só foi mais rápido que o astar de canto a canto no
+    tabuleiro sem obstáculos (onde o A* empata em muitos nós); em consultas
+    aleatórias foi mais lento em todas as densidades. Vale usá-lo quando o
+    número de nós expandidos importa mais que o tempo.
+
+    Args:
+        tabuleiro: Tabuleiro compacto ou matriz representando o tabuleiro
+        inicio: Tupla (linha, coluna) da posição inicial
+        destino: Tupla (linha, coluna) da posição de destino
+        estatisticas: EstatisticasBusca que recebe os contadores da busca (opcional)
+
+    Returns:
+        Lista de tuplas representando o caminho do início ao destino,
+        ou None se não houver caminho possível
+    """
+    if estatisticas is None:
+        return _busca_jps(tabuleiro, inicio, destino)
+    return estatisticas.medir(_busca_jps, tabuleiro, inicio, destino, estatisticas)
+
+def comparar_expansoes(tabuleiro, inicio, destino):
+    """
+    Compara o número de nós expandidos pelo A* comum e pelo A* com JPS.
+
+    Args:
+        tabuleiro: Tabuleiro compacto ou matriz representando o tabuleiro
+        inicio: Tupla (linha, coluna) da posição inicial
+        destino: Tupla (linha, coluna) da posição de destino
+
+    Returns:
+        Dicionário {'astar': expansões do A*, 'jps': expansões do JPS}
+    """
+    estatisticas_astar = EstatisticasBusca()
+    estatisticas_jps = EstatisticasBusca()
+    astar(tabuleiro, inicio, destino, estatisticas_astar)
+    astar_jps(tabuleiro, inicio, destino, estatisticas_jps)
+    return {'astar': estatisticas_astar.expansoes, 'jps': estatisticas_jps.expansoes}
+
+def _busca_jps(tabuleiro, inicio, destino, estatisticas=None):
+    """
+    Núcleo do A* com Jump Point Search.
+
+    Ordem canônica usada na poda: um caminho anda na vertical e, a partir de
+    qualquer célula da coluna, pode seguir na horizontal; na horizontal, só
+    volta para a vertical em um vizinho "forçado", isto é, quando a célula
+    acima (ou abaixo) acabou de ficar livre porque a anterior era obstáculo.
+    Qualquer caminho mais curto pode ser reescrito nessa forma com o mesmo
+    comprimento.
+
+    Returns:
+        Caminho (lista de tuplas) ou None
+    """
+    linhas, colunas, celulas = grade_plana(tabuleiro)
+    linha_destino, coluna_destino = destino
+
+    def livre(linha, coluna):
+        return 0 <= linha < linhas and 0 <= coluna < colunas and \
+            celulas[linha * colunas + coluna] != OBSTACULO
+
+    def saltar_horizontal(linha, coluna, dc):
+        # Anda na horizontal até o destino, um obstáculo ou um vizinho forçado
+        while True:
+            coluna += dc
+            if not livre(linha, coluna):
+                return None
+            if linha == linha_destino and coluna == coluna_destino:
+                return coluna
+            for dr in (-1, 1):
+                if livre(linha + dr, coluna) and not livre(linha + dr, coluna - dc):
+                    return coluna
+
+    def saltar_vertical(linha, coluna, dr):
+        # Anda na vertical até o destino ou uma célula de onde uma varredura
+        # horizontal encontra um ponto de salto
+        while True:
+            linha += dr
+            if not livre(linha, coluna):
+                return None
+            if linha == linha_destino and coluna == coluna_destino:
+                return linha
+            if saltar_horizontal(linha, coluna, 1) is not None or \
+                    saltar_horizontal(linha, coluna, -1) is not None:
+                return linha
+
+    total = linhas * colunas
+    melhor_custo = array('i', [-1]) * total
+    antecessor = array('i', [-1]) * total
+    # Direção (índice em DIRECOES) com que cada ponto de salto foi alcançado
+    direcao_chegada = array('b', [-1]) * total
+    visitados = bytearray(total)
+
+    indice_inicio = inicio[0] * colunas + inicio[1]
+    indice_destino = linha_destino * colunas + coluna_destino
+    melhor_custo[indice_inicio] = 0
+
+    contador = 0
+    heap = [(distancia_manhattan(inicio, destino), contador, indice_inicio)]
+    expansoes = 0
+    obsoletas = 0
+    medir = estatisticas is not None
+    pico_fronteira = profundidade_maxima = 0
+    caminho = None
+
+    while heap:
+        if medir and len(heap) > pico_fronteira:
+            pico_fronteira = len(heap)
+        _, _, atual = heapq.heappop(heap)
+        if visitados[atual]:
+            obsoletas += 1
+            continue
+        visitados[atual] = 1
+        expansoes += 1
+        if medir and melhor_custo[atual] > profundidade_maxima:
+            profundidade_maxima = melhor_custo[atual]
+
+        if atual == indice_destino:
+            caminho = _expandir_saltos(antecessor, colunas, indice_destino)
+            break
+
+        linha, coluna = divmod(atual, colunas)
+        chegada = direcao_chegada[atual]
+
+        # Direções a explorar a partir deste ponto de salto
+        if chegada == -1:
+            direcoes = range(4)
+        elif chegada in (0, 2):
+            # Chegou na vertical: segue na vertical e varre as duas horizontais
+            direcoes = (chegada, 1, 3)
+        else:
+            # Chegou na horizontal: segue na horizontal e vira só se for forçado
+            dc = DIRECOES[chegada][1]
+            direcoes = [chegada]
+            for direcao_vertical in (0, 2):
+                dr = DIRECOES[direcao_vertical][0]
+                if livre(linha + dr, coluna) and not livre(linha + dr, coluna - dc):
+                    direcoes.append(direcao_vertical)
+
+        for direcao in direcoes:
+            dr, dc = DIRECOES[direcao]
+            if dr:
+                nova_linha = saltar_vertical(linha, coluna, dr)
+                if nova_linha is None:
+                    continue
+                nova_coluna = coluna
+            else:
+                nova_coluna = saltar_horizontal(linha, coluna, dc)
+                if nova_coluna is None:
+                    continue
+                nova_linha = linha
+
+            vizinho = nova_linha * colunas + nova_coluna
+            novo_custo_g = melhor_custo[atual] + abs(nova_linha - linha) + abs(nova_coluna - coluna)
+            custo_conhecido = melhor_custo[vizinho]
+            if custo_conhecido != -1 and custo_conhecido <= novo_custo_g:
+                continue
+
+            melhor_custo[vizinho] = novo_custo_g
+            antecessor[vizinho] = atual
+            direcao_chegada[vizinho] = direcao
+            novo_f_score = novo_custo_g + abs(nova_linha - linha_destino) + abs(nova_coluna - coluna_destino)
+            contador += 1
+            heapq.heappush(heap, (novo_f_score, contador, vizinho))
+
+    if medir:
+        estatisticas.registrar(expansoes=expansoes, insercoes=contador + 1,
+                               remocoes=expansoes + obsoletas, remocoes_obsoletas=obsoletas,
+                               pico_fronteira=pico_fronteira, profundidade_maxima=profundidade_maxima)
+    return caminho
+
+def _expandir_saltos(antecessor, colunas, indice_destino):
+    """
+    Reconstrói o caminho completo, preenchendo os trechos retos entre pontos de salto.
+
+    Returns:
+        Lista de tuplas (linha, coluna) do início ao destino
+    """
+    pontos = []
+    atual = indice_destino
+    while atual != -1:
+        pontos.append(divmod(atual, colunas))
+        atual = antecessor[atual]
+    pontos.reverse()
+
+    caminho = [pontos[0]]
+    for (linha, coluna), (proxima_linha, proxima_coluna) in zip(pontos, pontos[1:]):
+        passo_linha = (proxima_linha > linha) - (proxima_linha < linha)
+        passo_coluna = (proxima_coluna > coluna) - (proxima_coluna < coluna)
+        while (linha, coluna) != (proxima_linha, proxima_coluna):
+            linha += passo_linha
+            coluna += passo_coluna
+            caminho.append((linha, coluna))
+    return caminho
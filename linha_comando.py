@@ -0,0 +1,216 @@
+import argparse
+import json
+import sys
+from contextlib import nullcontext
+
+from baldes import astar_baldes
+from bidirecional import astar_bidirecional
+from cache_caminhos import assinatura_tabuleiro
+from carregador import abrir
+from custos import TabelaCustos
+from formato_caminho import contar_passos, formatar_caminhos
+from hierarquico import GrafoHierarquico
+from jogo_tabuleiro_rafael import astar_lote
+from jps import astar_jps
+from marcos import MarcosALT
+
+# Tamanho dos blocos lidos da entrada; a saída de cada bloco vai em uma única escrita
+TAMANHO_BLOCO = 1 << 20
+
+# Cada algoritmo é uma função que recebe o tabuleiro, os custos e o formato
+# dos caminhos ('lista' ou 'rle'), faz o pré-processamento necessário e
+# devolve resolver(pares) -> lista de caminhos nesse formato
+
+def _um_a_um(resolver_par, formato):
+    # Resolve as consultas uma a uma e converte os caminhos para o formato pedido
+    return lambda pares: formatar_caminhos([resolver_par(inicio, destino) for inicio, destino in pares],
+                                           [inicio for inicio, _ in pares], formato)
+
+def _preparar_astar(tabuleiro, custos, formato):
+    # O tabuleiro não muda entre os blocos: o hash é calculado uma vez só
+    assinatura = assinatura_tabuleiro(tabuleiro)
+    return lambda pares: astar_lote(tabuleiro, pares, custos=custos, formato=formato, assinatura=assinatura)
+
+def _preparar_jps(tabuleiro, custos, formato):
+    return _um_a_um(lambda inicio, destino: astar_jps(tabuleiro, inicio, destino), formato)
+
+def _preparar_bidirecional(tabuleiro, custos, formato):
+    return _um_a_um(lambda inicio, destino: astar_bidirecional(tabuleiro, inicio, destino, custos=custos),
+                    formato)
+
+def _preparar_baldes(tabuleiro, custos, formato):
+    return _um_a_um(lambda inicio, destino: astar_baldes(tabuleiro, inicio, destino, custos=custos), formato)
+
+def _preparar_hierarquico(tabuleiro, custos, formato):
+    grafo = GrafoHierarquico(tabuleiro)
+    return _um_a_um(grafo.caminho, formato)
+
+def _preparar_marcos(tabuleiro, custos, formato):
+    marcos = MarcosALT(tabuleiro, custos=custos)
+    return _um_a_um(marcos.caminho, formato)
+
+# Nome -> (preparação, se o algoritmo aceita custos por tipo de célula)
+ALGORITMOS = {
+    'astar': (_preparar_astar, True),
+    'jps': (_preparar_jps, False),
+    'bidirecional': (_preparar_bidirecional, True),
+    'baldes': (_preparar_baldes, True),
+    'hierarquico': (_preparar_hierarquico, False),
+    'marcos': (_preparar_marcos, True),
+}
+
+def ler_consulta(linha):
+    """
+    Interpreta uma linha de consulta.
+
+    Aceita quatro inteiros "linha coluna linha coluna" (separados por espaços
+    ou vírgulas) ou JSON: [[linha, coluna], [linha, coluna]] ou
+    {"inicio": [linha, coluna], "destino": [linha, coluna]}.
+
+    Args:
+        linha: bytes ou str com a consulta, sem a quebra de linha
+
+    Returns:
+        Tupla (inicio, destino) de tuplas (linha, coluna)
+
+    Raises:
+        ValueError: Se a linha não estiver em nenhum dos formatos
+    """
+    if isinstance(linha, bytes):
+        linha = linha.decode('utf-8')
+    linha = linha.strip()
+    if linha[:1] in ('[', '{'):
+        dados = json.loads(linha)
+        if isinstance(dados, dict):
+            dados = [dados.get('inicio'), dados.get('destino')]
+        try:
+            (linha_inicio, coluna_inicio), (linha_destino, coluna_destino) = dados
+        except (TypeError, ValueError):
+            raise ValueError("consulta JSON deve ter início e destino com [linha, coluna]") from None
+        numeros = [linha_inicio, coluna_inicio, linha_destino, coluna_destino]
+        if not all(type(numero) is int for numero in numeros):
+            raise ValueError("as coordenadas devem ser inteiras")
+    else:
+        try:
+            numeros = [int(numero) for numero in linha.replace(',', ' ').split()]
+        except ValueError:
+            numeros = None
+        if numeros is None or len(numeros) != 4:
+            raise ValueError("consulta deve ter quatro inteiros: linha coluna linha coluna")
+    return (numeros[0], numeros[1]), (numeros[2], numeros[3])
+
+def processar(tabuleiro, entrada, saida, resolver):
+    """
+    Lê as consultas da entrada em blocos, resolve as de cada bloco juntas e
+    escreve um objeto JSON por linha na saída, na ordem das consultas.
+
+    Cada linha de saída tem o número da consulta (a partir de 0) e início,
+    destino, caminho (lista de [linha, coluna] ou código de direções como
+    "R5U3", conforme o resolver; null se não houver) e passos; uma consulta
+    inválida gera uma linha com "erro" em vez do caminho.
+    Linhas vazias e linhas que começam com '#' são ignoradas.
+
+    Args:
+        tabuleiro: Tabuleiro compacto
+        entrada: Arquivo binário com uma consulta por linha (ver ler_consulta)
+        saida: Arquivo binário onde os resultados são escritos
+        resolver: Função que recebe uma lista de pares e devolve os caminhos
+
+    Returns:
+        Número de consultas processadas
+    """
+    linhas_tabuleiro, colunas_tabuleiro = tabuleiro.linhas, tabuleiro.colunas
+    numero = 0
+    resto = b''
+    while True:
+        bloco = entrada.read(TAMANHO_BLOCO)
+        if bloco:
+            # A última linha do bloco pode estar incompleta: fica para o próximo
+            linhas = (resto + bloco).split(b'\n')
+            resto = linhas.pop()
+        else:
+            linhas = [resto]
+
+        consultas = []
+        pares = []
+        for linha in linhas:
+            linha = linha.strip()
+            if not linha or linha.startswith(b'#'):
+                continue
+            try:
+                inicio, destino = ler_consulta(linha)
+                for linha_posicao, coluna_posicao in (inicio, destino):
+                    if not (0 <= linha_posicao < linhas_tabuleiro and 0 <= coluna_posicao < colunas_tabuleiro):
+                        raise ValueError(f"posição ({linha_posicao}, {coluna_posicao}) fora do tabuleiro")
+            except ValueError as erro:
+                consultas.append({'consulta': numero, 'erro': str(erro)})
+            else:
+                consultas.append({'consulta': numero, 'inicio': inicio, 'destino': destino})
+                pares.append((inicio, destino))
+            numero += 1
+
+        caminhos = iter(resolver(pares)) if pares else iter(())
+        resultado = []
+        for consulta in consultas:
+            if 'erro' not in consulta:
+                caminho = next(caminhos)
+                consulta['caminho'] = caminho
+                if caminho is None:
+                    consulta['passos'] = None
+                elif isinstance(caminho, str):
+                    consulta['passos'] = contar_passos(caminho)
+                else:
+                    consulta['passos'] = len(caminho) - 1
+            resultado.append(json.dumps(consulta, separators=(',', ':'), ensure_ascii=False))
+        if resultado:
+            saida.write(('\n'.join(resultado) + '\n').encode('utf-8'))
+
+        if not bloco:
+            return numero
+
+def _abrir(caminho_arquivo, modo, padrao):
+    # Arquivo informado ou, sem ele, o fluxo padrão (que não deve ser fechado)
+    return open(caminho_arquivo, modo) if caminho_arquivo else nullcontext(padrao)
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(
+        description="Resolve consultas de caminho em lote, sem interface: lê um tabuleiro e as "
+                    "consultas (uma por linha) e escreve um resultado JSON por linha.")
+    parser.add_argument('tabuleiro', help="arquivo do tabuleiro (texto ou binário, ver carregador.py)")
+    parser.add_argument('--consultas', help="arquivo de consultas (padrão: entrada padrão)")
+    parser.add_argument('--saida', help="arquivo de saída (padrão: saída padrão)")
+    parser.add_argument('--algoritmo', choices=list(ALGORITMOS), default='astar')
+    parser.add_argument('--custos', type=json.loads,
+                        help='custos por caractere em JSON, por exemplo \'{"~": 5, "=": 1}\'')
+    parser.add_argument('--custo-padrao', type=int, default=1,
+                        help="custo dos caracteres sem custo em --custos (padrão: 1)")
+    parser.add_argument('--formato', choices=['lista', 'rle'], default='lista',
+                        help="caminho como lista de [linha, coluna] ou como código de direções "
+                             "com repetições, por exemplo \"R5U3\" (padrão: lista)")
+    opcoes = parser.parse_args(argumentos)
+
+    preparar, aceita_custos = ALGORITMOS[opcoes.algoritmo]
+    custos = None
+    if opcoes.custos is not None or opcoes.custo_padrao != 1:
+        if not aceita_custos:
+            parser.error(f"o algoritmo {opcoes.algoritmo} não aceita custos")
+        try:
+            custos = TabelaCustos(opcoes.custos, opcoes.custo_padrao)
+        except (TypeError, ValueError) as erro:
+            parser.error(f"custos inválidos: {erro}")
+
+    try:
+        tabuleiro = abrir(opcoes.tabuleiro)
+    except (OSError, ValueError) as erro:
+        print(f"erro ao abrir o tabuleiro: {erro}", file=sys.stderr)
+        return 2
+
+    resolver = preparar(tabuleiro, custos, opcoes.formato)
+    with _abrir(opcoes.consultas, 'rb', sys.stdin.buffer) as entrada, \
+            _abrir(opcoes.saida, 'wb', sys.stdout.buffer) as saida:
+        processar(tabuleiro, entrada, saida, resolver)
+        saida.flush()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,499 @@
+import heapq
+import mmap
+import struct
+import sys
+from array import array
+from collections import deque
+
+from cache_caminhos import assinatura_tabuleiro
+from custos import custos_por_celula
+from jogo_tabuleiro_rafael import reconstruir_caminho
+from tabuleiro_compacto import DIRECOES, Tabuleiro, grade_plana
+
+# Cabeçalho do arquivo de pré-cálculo: assinatura, versão, linhas, colunas,
+# número de marcos e número de células da tabela de todos os pares (0 = sem tabela)
+CABECALHO = struct.Struct('<4sIIIII')
+VERSAO = 1
+ASSINATURA_MARCOS = b'ALTM'
+
+# Maior número de células livres para a tabela de todos os pares: ocupa
+# 4 bytes por par, então 4096 células já são 64 MiB
+LIMITE_TODOS_PARES = 4096
+
+# Marcos usados em cada consulta: os que dão os maiores limites no início.
+# Mais marcos apertam pouco a heurística e encarecem cada nó
+MARCOS_ATIVOS = 4
+
+class MarcosALT:
+    """
+    Pré-cálculo de marcos (landmarks) para o A* com a heurística ALT.
+
+    Para um tabuleiro fixo, escolhe alguns marcos espalhados pelas bordas e
+    guarda a distância de cada marco a todas as células. Pela desigualdade
+    triangular, d(v, destino) >= d(marco, destino) - d(marco, v) (e o análogo
+    no sentido contrário), o que dá uma heurística admissível e consistente
+    muito mais forte que a distância de Manhattan: contornar obstáculos já está
+    embutido nas distâncias. Em tabuleiros pequenos, todos_pares=True monta
+    também a tabela com a distância entre quaisquer duas células livres, e a
+    distância de uma consulta passa a ser uma única leitura.
+
+    Os caminhos têm o mesmo custo dos do astar. O pré-cálculo vale para um
+    tabuleiro e uma tabela de custos: se o tabuleiro mudar, precisa ser refeito.
+    """
+
+    def __init__(self, tabuleiro, quantidade=8, custos=None, todos_pares=False, _calcular=True):
+        """
+        Args:
+            tabuleiro: Tabuleiro compacto (referenciado, não copiado) ou matriz 2D
+            quantidade: Número de marcos
+            custos: TabelaCustos ou custos por célula (padrão: 'X' bloqueia, o resto custa 1)
+            todos_pares: Se True, monta também a tabela de distâncias entre todos
+                         os pares de células livres (até LIMITE_TODOS_PARES células)
+        """
+        if not isinstance(tabuleiro, Tabuleiro):
+            linhas, colunas, celulas = grade_plana(tabuleiro)
+            tabuleiro = Tabuleiro(linhas, colunas, bytearray(celulas))
+        self.tabuleiro = tabuleiro
+        self.linhas = tabuleiro.linhas
+        self.colunas = tabuleiro.colunas
+        _, _, celulas = grade_plana(tabuleiro)
+        passos, self.menor_custo, self.maior_custo = custos_por_celula(celulas, custos)
+        self.passos = bytes(passos)
+
+        # Índice plano de cada marco e, para cada um, a distância (custo de
+        # entrar nas células do caminho) do marco até cada célula, -1 se inalcançável
+        self.marcos = array('i')
+        self.campos = []
+        # Tabela de todos os pares, indexada pela ordem das células livres
+        self.tabela = None
+        self._ordem_livres = None
+        self._livres = 0
+
+        if _calcular:
+            self._escolher_marcos(quantidade)
+            if todos_pares:
+                self._calcular_todos_pares()
+
+    def _campo(self, origem):
+        """
+        Distância da origem a todas as células: busca em largura quando todas as
+        células livres custam o mesmo, algoritmo de Dijkstra caso contrário.
+
+        Returns:
+            array('i') plano de distâncias, -1 nas células inalcançáveis
+        """
+        linhas, colunas, passos = self.linhas, self.colunas, self.passos
+        distancias = array('i', [-1]) * (linhas * colunas)
+        distancias[origem] = 0
+
+        if self.menor_custo == self.maior_custo:
+            fila = deque([origem])
+            while fila:
+                atual = fila.popleft()
+                proxima = distancias[atual] + self.menor_custo
+                linha, coluna = divmod(atual, colunas)
+                for dr, dc in DIRECOES:
+                    nr, nc = linha + dr, coluna + dc
+                    if 0 <= nr < linhas and 0 <= nc < colunas:
+                        vizinho = nr * colunas + nc
+                        if distancias[vizinho] == -1 and passos[vizinho]:
+                            distancias[vizinho] = proxima
+                            fila.append(vizinho)
+            return distancias
+
+        heap = [(0, origem)]
+        while heap:
+            distancia, atual = heapq.heappop(heap)
+            if distancia > distancias[atual]:
+                continue
+            linha, coluna = divmod(atual, colunas)
+            for dr, dc in DIRECOES:
+                nr, nc = linha + dr, coluna + dc
+                if 0 <= nr < linhas and 0 <= nc < colunas:
+                    vizinho = nr * colunas + nc
+                    if not passos[vizinho] or vizinho == origem:
+                        continue
+                    nova = distancia + passos[vizinho]
+                    if distancias[vizinho] == -1 or nova < distancias[vizinho]:
+                        distancias[vizinho] = nova
+                        heapq.heappush(heap, (nova, vizinho))
+        return distancias
+
+    def _escolher_marcos(self, quantidade):
+        """
+        Escolhe os marcos pelo critério do mais distante: o primeiro é a célula
+        mais distante de uma célula livre perto do centro, e cada novo marco é
+        a célula cuja menor distância aos marcos já escolhidos é a maior.
+        Assim os marcos ficam nas pontas do tabuleiro, onde dão os melhores limites.
+        """
+        total = self.linhas * self.colunas
+        centro = (self.linhas // 2) * self.colunas + self.colunas // 2
+        partida = next((indice % total for indice in range(centro, centro + total)
+                        if self.passos[indice % total]), None)
+        if partida is None or quantidade <= 0:
+            return
+
+        # Menor distância de cada célula aos marcos escolhidos até agora
+        menores = self._campo(partida)
+        while len(self.marcos) < quantidade:
+            mais_distante = max(range(total), key=menores.__getitem__)
+            if menores[mais_distante] <= 0:
+                # Todas as células alcançáveis já são marcos
+                break
+            campo = self._campo(mais_distante)
+            self.marcos.append(mais_distante)
+            self.campos.append(campo)
+            for indice in range(total):
+                if campo[indice] < menores[indice]:
+                    menores[indice] = campo[indice]
+
+    def _calcular_todos_pares(self):
+        """
+        Monta a tabela de distâncias entre todas as células livres, uma busca
+        por célula, com as células na ordem dos índices planos.
+
+        As buscas andam em um grafo só de células livres, montado uma vez (lista
+        de vizinhos livres de cada uma), sem conferir limites nem obstáculos a
+        cada passo como em _campo.
+        """
+        linhas, colunas, passos = self.linhas, self.colunas, self.passos
+        livres = [indice for indice, passo in enumerate(passos) if passo]
+        if len(livres) > LIMITE_TODOS_PARES:
+            raise ValueError(f"tabela de todos os pares limitada a {LIMITE_TODOS_PARES} células livres "
+                             f"(o tabuleiro tem {len(livres)})")
+        self._indexar_livres()
+        ordem = self._ordem_livres
+
+        vizinhos = []
+        for indice in livres:
+            linha, coluna = divmod(indice, colunas)
+            vizinhos.append([ordem[nr * colunas + nc] for nr, nc in
+                             ((linha + dr, coluna + dc) for dr, dc in DIRECOES)
+                             if 0 <= nr < linhas and 0 <= nc < colunas and passos[nr * colunas + nc]])
+        custos = [passos[indice] for indice in livres]
+        uniforme = self.menor_custo == self.maior_custo
+
+        self.tabela = array('i')
+        vazia = array('i', [-1]) * len(livres)
+        for origem in range(len(livres)):
+            distancias = vazia[:]
+            distancias[origem] = 0
+            if uniforme:
+                # A lista cresce enquanto é percorrida: funciona como fila
+                fila = [origem]
+                for atual in fila:
+                    proxima = distancias[atual] + self.menor_custo
+                    for vizinho in vizinhos[atual]:
+                        if distancias[vizinho] == -1:
+                            distancias[vizinho] = proxima
+                            fila.append(vizinho)
+            else:
+                heap = [(0, origem)]
+                while heap:
+                    distancia, atual = heapq.heappop(heap)
+                    if distancia > distancias[atual]:
+                        continue
+                    for vizinho in vizinhos[atual]:
+                        nova = distancia + custos[vizinho]
+                        if vizinho != origem and (distancias[vizinho] == -1 or nova < distancias[vizinho]):
+                            distancias[vizinho] = nova
+                            heapq.heappush(heap, (nova, vizinho))
+            self.tabela.extend(distancias)
+
+    def _indexar_livres(self):
+        # Posição de cada célula livre na tabela de todos os pares (-1 nas bloqueadas)
+        self._ordem_livres = array('i', [-1]) * (self.linhas * self.colunas)
+        posicao = 0
+        for indice, passo in enumerate(self.passos):
+            if passo:
+                self._ordem_livres[indice] = posicao
+                posicao += 1
+        self._livres = posicao
+
+    def distancia(self, inicio, destino):
+        """
+        Custo do caminho mais curto entre duas células.
+
+        Com a tabela de todos os pares e as duas células livres, é uma única
+        leitura; caso contrário, faz uma busca A* com a heurística ALT.
+
+        Args:
+            inicio: Tupla (linha, coluna) da posição inicial
+            destino: Tupla (linha, coluna) da posição de destino
+
+        Returns:
+            Soma dos custos das células do caminho (sem contar o início), ou
+            None se não houver caminho possível
+        """
+        indice_inicio = inicio[0] * self.colunas + inicio[1]
+        indice_destino = destino[0] * self.colunas + destino[1]
+        # Já no destino: custo zero, mesmo numa célula bloqueada (como no astar)
+        if indice_inicio == indice_destino:
+            return 0
+        if self.tabela is not None and self.passos[indice_inicio] and self.passos[indice_destino]:
+            distancia = self.tabela[self._ordem_livres[indice_inicio] * self._livres
+                                    + self._ordem_livres[indice_destino]]
+            return None if distancia == -1 else distancia
+
+        caminho = self._caminho(inicio, destino)
+        if caminho is None:
+            return None
+        return sum(self.passos[linha * self.colunas + coluna] for linha, coluna in caminho[1:])
+
+    def caminho(self, inicio, destino, estatisticas=None):
+        """
+        Caminho de menor custo entre duas células.
+
+        Com a tabela de todos os pares, o caminho é extraído sem busca: a cada
+        passo segue para um vizinho cuja distância ao destino diminui exatamente
+        o custo de entrar nele. Caso contrário, usa o A* com a heurística ALT.
+
+        Args:
+            inicio: Tupla (linha, coluna) da posição inicial
+            destino: Tupla (linha, coluna) da posição de destino
+            estatisticas: EstatisticasBusca que recebe os contadores da busca (opcional)
+
+        Returns:
+            Lista de tuplas representando o caminho do início ao destino, ou None
+            se não houver caminho possível
+        """
+        if estatisticas is None:
+            return self._caminho(inicio, destino)
+        return estatisticas.medir(self._caminho, inicio, destino, estatisticas)
+
+    def _caminho(self, inicio, destino, estatisticas=None):
+        """
+        Escolhe entre a tabela de todos os pares e a busca ALT.
+
+        Returns:
+            Caminho (lista de tuplas) ou None
+        """
+        indice_inicio = inicio[0] * self.colunas + inicio[1]
+        indice_destino = destino[0] * self.colunas + destino[1]
+        # Já no destino: como no astar, vale mesmo numa célula bloqueada,
+        # que nenhum marco alcança
+        if indice_inicio == indice_destino:
+            return [tuple(inicio)]
+        if self.tabela is not None and self.passos[indice_inicio] and self.passos[indice_destino]:
+            return self._caminho_tabela(indice_inicio, indice_destino)
+        return self._busca_alt(inicio, destino, estatisticas)
+
+    def _caminho_tabela(self, indice_inicio, indice_destino):
+        """
+        Desce pela tabela de todos os pares do início até o destino.
+
+        Returns:
+            Caminho (lista de tuplas) ou None
+        """
+        linhas, colunas, passos = self.linhas, self.colunas, self.passos
+        tabela, ordem, livres = self.tabela, self._ordem_livres, self._livres
+        coluna_destino = ordem[indice_destino]
+        restante = tabela[ordem[indice_inicio] * livres + coluna_destino]
+        if restante == -1:
+            return None
+
+        atual = indice_inicio
+        caminho = [divmod(atual, colunas)]
+        while atual != indice_destino:
+            linha, coluna = divmod(atual, colunas)
+            for dr, dc in DIRECOES:
+                nr, nc = linha + dr, coluna + dc
+                if 0 <= nr < linhas and 0 <= nc < colunas:
+                    vizinho = nr * colunas + nc
+                    if passos[vizinho] and tabela[ordem[vizinho] * livres + coluna_destino] == restante - passos[vizinho]:
+                        break
+            restante -= passos[vizinho]
+            atual = vizinho
+            caminho.append((nr, nc))
+        return caminho
+
+    def _busca_alt(self, inicio, destino, estatisticas=None):
+        """
+        Núcleo do A* com a heurística ALT, na mesma estrutura do astar.
+
+        Returns:
+            Caminho (lista de tuplas) ou None
+        """
+        linhas, colunas, passos = self.linhas, self.colunas, self.passos
+        menor_custo = self.menor_custo
+        linha_destino, coluna_destino = destino
+        indice_inicio = inicio[0] * colunas + inicio[1]
+        indice_destino = linha_destino * colunas + coluna_destino
+        if not passos[indice_destino]:
+            return None
+        custo_destino = passos[indice_destino]
+
+        # Marcos que alcançam o destino, com as duas parcelas fixas da consulta:
+        # d(marco, destino) e d(marco, destino) - custo do destino. Uma célula
+        # livre que um marco alcança e o destino não (ou vice-versa) está em
+        # outra região: a consulta é rejeitada sem busca
+        referencias = []
+        for campo in self.campos:
+            alvo = campo[indice_destino]
+            if passos[indice_inicio] and (alvo == -1) != (campo[indice_inicio] == -1):
+                return None
+            if alvo != -1:
+                referencias.append((campo, alvo, alvo - custo_destino))
+        # Só os marcos que dão os maiores limites no início entram na heurística
+        if passos[indice_inicio] and len(referencias) > MARCOS_ATIVOS:
+            custo_inicio = passos[indice_inicio]
+            referencias.sort(key=lambda referencia: -max(
+                referencia[1] - referencia[0][indice_inicio],
+                referencia[0][indice_inicio] - custo_inicio - referencia[2]))
+            del referencias[MARCOS_ATIVOS:]
+
+        def heuristica(indice, linha, coluna, custo_celula):
+            # Maior dos limites inferiores: Manhattan e, para cada marco,
+            # d(marco, destino) - d(marco, v) e d(v, marco) - d(destino, marco)
+            h = (abs(linha - linha_destino) + abs(coluna - coluna_destino)) * menor_custo
+            for campo, alvo, alvo_volta in referencias:
+                distancia = campo[indice]
+                if alvo - distancia > h:
+                    h = alvo - distancia
+                if distancia - custo_celula - alvo_volta > h:
+                    h = distancia - custo_celula - alvo_volta
+            return h
+
+        total = linhas * colunas
+        melhor_custo = array('i', [-1]) * total
+        antecessor = array('i', [-1]) * total
+        visitados = bytearray(total)
+        melhor_custo[indice_inicio] = 0
+
+        # Entradas (f, -g, índice): nos empates vence o maior g. Com a heurística
+        # ALT muitas células do caminho ótimo empatam em f, e preferir as mais
+        # avançadas leva a busca direto ao destino
+        contador = 0
+        if passos[indice_inicio]:
+            h_inicio = heuristica(indice_inicio, inicio[0], inicio[1], passos[indice_inicio])
+        else:
+            h_inicio = (abs(inicio[0] - linha_destino) + abs(inicio[1] - coluna_destino)) * menor_custo
+        heap = [(h_inicio, 0, indice_inicio)]
+
+        expansoes = obsoletas = 0
+        medir = estatisticas is not None
+        pico_fronteira = profundidade_maxima = 0
+        caminho = None
+
+        while heap:
+            if medir and len(heap) > pico_fronteira:
+                pico_fronteira = len(heap)
+            _, _, atual = heapq.heappop(heap)
+            if visitados[atual]:
+                obsoletas += 1
+                continue
+            visitados[atual] = 1
+            expansoes += 1
+            custo_g = melhor_custo[atual]
+            if medir and custo_g > profundidade_maxima:
+                profundidade_maxima = custo_g
+
+            if atual == indice_destino:
+                caminho = reconstruir_caminho(antecessor, colunas, indice_destino)
+                break
+
+            linha, coluna = divmod(atual, colunas)
+            for dr, dc in DIRECOES:
+                nr, nc = linha + dr, coluna + dc
+                if 0 <= nr < linhas and 0 <= nc < colunas:
+                    vizinho = nr * colunas + nc
+                    custo_celula = passos[vizinho]
+                    if not custo_celula:
+                        continue
+                    novo_custo_g = custo_g + custo_celula
+                    custo_conhecido = melhor_custo[vizinho]
+                    if custo_conhecido != -1 and custo_conhecido <= novo_custo_g:
+                        continue
+                    melhor_custo[vizinho] = novo_custo_g
+                    antecessor[vizinho] = atual
+                    contador += 1
+                    heapq.heappush(heap, (novo_custo_g + heuristica(vizinho, nr, nc, custo_celula),
+                                          -novo_custo_g, vizinho))
+
+        if medir:
+            estatisticas.registrar(expansoes=expansoes, insercoes=contador + 1,
+                                   remocoes=expansoes + obsoletas, remocoes_obsoletas=obsoletas,
+                                   pico_fronteira=pico_fronteira, profundidade_maxima=profundidade_maxima)
+        return caminho
+
+    def salvar(self, caminho_arquivo):
+        """
+        Salva o pré-cálculo em formato binário, com a assinatura do tabuleiro
+        e o custo de cada célula, para ser reaberto com mmap por carregar().
+
+        Args:
+            caminho_arquivo: Caminho do arquivo de saída
+        """
+        total = self.linhas * self.colunas
+        livres = self._livres if self.tabela is not None else 0
+        with open(caminho_arquivo, 'wb') as arquivo:
+            arquivo.write(CABECALHO.pack(ASSINATURA_MARCOS, VERSAO, self.linhas, self.colunas,
+                                         len(self.marcos), livres))
+            arquivo.write(assinatura_tabuleiro(self.tabuleiro))
+            # Custos completados até múltiplo de 4, para os inteiros seguintes ficarem alinhados
+            arquivo.write(self.passos + bytes(-total % 4))
+            for dados in [self.marcos, *self.campos] + ([self.tabela] if self.tabela is not None else []):
+                arquivo.write(_inteiros_little_endian(dados))
+
+    @classmethod
+    def carregar(cls, caminho_arquivo, tabuleiro, custos=None):
+        """
+        Abre um pré-cálculo salvo, mapeando o arquivo em memória: os campos e a
+        tabela são lidos diretamente do arquivo, sem cópia.
+
+        Args:
+            caminho_arquivo: Caminho do arquivo salvo por salvar()
+            tabuleiro: Tabuleiro compacto ou matriz 2D usado no pré-cálculo
+            custos: Os mesmos custos usados no pré-cálculo
+
+        Returns:
+            MarcosALT pronto para consultas
+        """
+        with open(caminho_arquivo, 'rb') as arquivo:
+            mapa = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(mapa) < CABECALHO.size:
+            raise ValueError("arquivo de marcos truncado")
+        assinatura, versao, linhas, colunas, quantidade, livres = CABECALHO.unpack_from(mapa)
+        if assinatura != ASSINATURA_MARCOS:
+            raise ValueError("o arquivo não é um pré-cálculo de marcos")
+        if versao != VERSAO:
+            raise ValueError(f"versão {versao} do formato de marcos não suportada")
+
+        marcos = cls(tabuleiro, custos=custos, _calcular=False)
+        total = linhas * colunas
+        inicio_inteiros = CABECALHO.size + 16 + total + (-total % 4)
+        tamanho = inicio_inteiros + 4 * (quantidade + quantidade * total + livres * livres)
+        if len(mapa) < tamanho:
+            raise ValueError("arquivo de marcos truncado")
+        dados = memoryview(mapa)
+        if ((marcos.linhas, marcos.colunas) != (linhas, colunas)
+                or assinatura_tabuleiro(marcos.tabuleiro) != dados[CABECALHO.size:CABECALHO.size + 16]):
+            raise ValueError("o pré-cálculo salvo não corresponde a este tabuleiro")
+        if dados[CABECALHO.size + 16:CABECALHO.size + 16 + total] != marcos.passos:
+            raise ValueError("o pré-cálculo salvo foi feito com outros custos")
+
+        inteiros = _inteiros_nativos(dados[inicio_inteiros:tamanho])
+        marcos.marcos = inteiros[:quantidade]
+        marcos.campos = [inteiros[quantidade + k * total:quantidade + (k + 1) * total]
+                         for k in range(quantidade)]
+        if livres:
+            marcos.tabela = inteiros[quantidade + quantidade * total:]
+            marcos._indexar_livres()
+        return marcos
+
+def _inteiros_little_endian(inteiros):
+    # Bytes de uma sequência de inteiros de 32 bits, em little-endian
+    dados = array('i', inteiros)
+    if sys.byteorder == 'big':
+        dados.byteswap()
+    return dados.tobytes()
+
+def _inteiros_nativos(dados):
+    # Inteiros de 32 bits em little-endian: lidos sem cópia em máquinas
+    # little-endian, copiados e convertidos nas demais
+    if sys.byteorder == 'little':
+        return dados.cast('i')
+    inteiros = array('i')
+    inteiros.frombytes(dados)
+    inteiros.byteswap()
+    return inteiros
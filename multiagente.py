@@ -0,0 +1,369 @@
+import heapq
+from array import array
+
+from tabuleiro_compacto import DIRECOES, OBSTACULO, grade_plana
+
+# Movimentos possíveis em um instante: cima, direita, baixo, esquerda e esperar
+MOVIMENTOS = DIRECOES + [(0, 0)]
+
+class TabelaReservas:
+    """
+    Tabela de reservas espaço-tempo do A* cooperativo.
+
+    Cada par (célula, instante) ocupado por um agente é guardado com a chave
+    inteira instante * total + célula (total = número de células), então a
+    tabela é um único dicionário de inteiros para o número do agente. Um
+    agente que chega ao destino fica parado nele para sempre: em vez de
+    reservar todos os instantes seguintes, a tabela guarda a partir de quando
+    a célula fica ocupada.
+    """
+    __slots__ = ('total', 'ocupacao', 'finais', 'ultima')
+
+    def __init__(self, total):
+        """
+        Args:
+            total: Número de células do tabuleiro
+        """
+        self.total = total
+        # instante * total + célula -> agente
+        self.ocupacao = {}
+        # Célula de destino -> instante a partir do qual o agente fica parado nela
+        self.finais = {}
+        # Célula -> último instante reservado nela (para saber se um agente pode parar ali)
+        self.ultima = {}
+
+    def ocupante(self, celula, instante):
+        """
+        Returns:
+            Agente que ocupa a célula no instante, ou None se estiver livre
+        """
+        agente = self.ocupacao.get(instante * self.total + celula)
+        if agente is None:
+            chegada = self.finais.get(celula)
+            if chegada is not None and chegada <= instante:
+                # Agente parado no destino desde a chegada
+                return self.ocupacao[chegada * self.total + celula]
+        return agente
+
+    def reservar(self, agente, celulas):
+        """
+        Reserva um caminho: a célula celulas[t] no instante t e, depois do último
+        instante, a célula final para sempre.
+
+        Args:
+            agente: Número do agente
+            celulas: Lista de índices planos, um por instante
+        """
+        for instante, celula in enumerate(celulas):
+            self.ocupacao[instante * self.total + celula] = agente
+            if instante > self.ultima.get(celula, -1):
+                self.ultima[celula] = instante
+        self.finais[celulas[-1]] = len(celulas) - 1
+
+    def liberar_inicio(self, celula):
+        """
+        Desfaz a reserva permanente do início de um agente (feita com
+        reservar(agente, [celula])), para que ele possa sair de lá.
+
+        Args:
+            celula: Índice plano do início do agente
+        """
+        del self.finais[celula]
+
+class DistanciaReversa:
+    """
+    Distância real de cada célula até um destino, calculada sob demanda.
+
+    É um A* que parte do destino em direção ao início do agente e pode ser
+    retomado (Reverse Resumable A*): consultar uma célula ainda não fechada
+    continua a busca até fechá-la. Como a heurística de Manhattan é
+    consistente, toda célula fechada já tem a distância exata. Só a região
+    que a busca espaço-tempo realmente visita é calculada, em vez do
+    tabuleiro inteiro.
+    """
+    __slots__ = ('linhas', 'colunas', 'celulas', 'alvo', 'custo', 'fechadas', 'heap')
+
+    def __init__(self, linhas, colunas, celulas, destino, inicio):
+        """
+        Args:
+            linhas: Número de linhas do tabuleiro
+            colunas: Número de colunas do tabuleiro
+            celulas: Buffer plano de células
+            destino: Tupla (linha, coluna) até onde as distâncias são medidas
+            inicio: Tupla (linha, coluna) que guia a busca (o início do agente)
+        """
+        self.linhas = linhas
+        self.colunas = colunas
+        self.celulas = celulas
+        self.alvo = inicio
+        total = linhas * colunas
+        indice_destino = destino[0] * colunas + destino[1]
+        self.custo = array('i', [-1]) * total
+        self.custo[indice_destino] = 0
+        self.fechadas = bytearray(total)
+        self.heap = [(abs(destino[0] - inicio[0]) + abs(destino[1] - inicio[1]), 0, indice_destino)]
+
+    def distancia(self, celula):
+        """
+        Returns:
+            Distância da célula (índice plano) até o destino, ou -1 se não
+            houver caminho (ou se a célula for um obstáculo)
+        """
+        if self.fechadas[celula]:
+            return self.custo[celula]
+        if self.celulas[celula] == OBSTACULO:
+            return -1
+        linhas, colunas, celulas = self.linhas, self.colunas, self.celulas
+        custo, fechadas, heap = self.custo, self.fechadas, self.heap
+        linha_alvo, coluna_alvo = self.alvo
+        while heap:
+            _, g, atual = heapq.heappop(heap)
+            if fechadas[atual]:
+                continue
+            fechadas[atual] = 1
+            linha, coluna = divmod(atual, colunas)
+            proximo = g + 1
+            for dr, dc in DIRECOES:
+                nr, nc = linha + dr, coluna + dc
+                if 0 <= nr < linhas and 0 <= nc < colunas:
+                    vizinho = nr * colunas + nc
+                    if celulas[vizinho] == OBSTACULO or fechadas[vizinho]:
+                        continue
+                    anterior = custo[vizinho]
+                    if anterior == -1 or proximo < anterior:
+                        custo[vizinho] = proximo
+                        heapq.heappush(heap, (proximo + abs(nr - linha_alvo) + abs(nc - coluna_alvo),
+                                              proximo, vizinho))
+            if atual == celula:
+                return g
+        # Busca esgotada: a célula não alcança o destino
+        fechadas[celula] = 1
+        custo[celula] = -1
+        return -1
+
+def planejar_agentes(tabuleiro, agentes, folga=32, estatisticas=None):
+    """
+    Planeja caminhos sem colisão para vários agentes (A* cooperativo).
+
+    Os agentes são planejados na ordem da lista. Cada um faz uma busca A* no
+    espaço-tempo (célula, instante), em que esperar parado também é um
+    movimento, evitando as reservas dos agentes anteriores: duas posições
+    iguais no mesmo instante e duas trocas de lugar entre vizinhos. Depois de
+    planejado, o caminho do agente é reservado. Ao chegar, o agente fica
+    parado no destino.
+
+    Enquanto um agente não é planejado, o início dele fica reservado em todos
+    os instantes: os agentes anteriores não sabem quando ele sairá de lá. Um
+    agente sem caminho fica parado no início, que continua reservado para sempre.
+
+    Args:
+        tabuleiro: Tabuleiro compacto ou matriz representando o tabuleiro
+        agentes: Lista de pares (inicio, destino), com inícios diferentes entre si
+        folga: Quantos instantes, além do caminho mais curto sem outros agentes,
+               cada agente pode gastar com esperas e desvios
+        estatisticas: EstatisticasBusca que recebe os contadores das buscas (opcional)
+
+    Returns:
+        Lista com um caminho por agente, na ordem de agentes: a posição
+        (linha, coluna) em cada instante a partir de 0, repetida quando o agente
+        espera, ou None se o agente não tiver caminho dentro da folga
+    """
+    if estatisticas is None:
+        return _planejar_agentes(tabuleiro, agentes, folga)
+    return estatisticas.medir(_planejar_agentes, tabuleiro, agentes, folga, estatisticas)
+
+def _planejar_agentes(tabuleiro, agentes, folga=32, estatisticas=None):
+    """
+    Núcleo do A* cooperativo.
+
+    Returns:
+        Lista de caminhos (ou None), um por agente
+    """
+    linhas, colunas, celulas = grade_plana(tabuleiro)
+    inicios = [tuple(inicio) for inicio, _ in agentes]
+    if len(set(inicios)) != len(inicios):
+        raise ValueError("dois agentes não podem começar na mesma célula")
+
+    reservas = TabelaReservas(linhas * colunas)
+    # Cada agente ocupa o próprio início até ser planejado
+    for agente, (linha, coluna) in enumerate(inicios):
+        reservas.reservar(agente, [linha * colunas + coluna])
+
+    caminhos = []
+    totais = [0, 0, 0]
+    for agente, (inicio, destino) in enumerate(agentes):
+        indice_inicio = inicio[0] * colunas + inicio[1]
+        reservas.liberar_inicio(indice_inicio)
+        # Distâncias até o destino sem outros agentes: dizem se ele é alcançável,
+        # limitam o horizonte e servem de heurística exata para a busca
+        distancias = DistanciaReversa(linhas, colunas, celulas, destino, inicio)
+        celulas_caminho = None
+        if distancias.distancia(indice_inicio) != -1:
+            celulas_caminho = _busca_espaco_tempo(linhas, colunas, inicio, destino, agente,
+                                                  reservas, distancias, folga, totais)
+        if celulas_caminho is None:
+            # Sem caminho, o agente fica parado no início para sempre
+            reservas.reservar(agente, [indice_inicio])
+            caminhos.append(None)
+            continue
+        reservas.reservar(agente, celulas_caminho)
+        caminhos.append([divmod(celula, colunas) for celula in celulas_caminho])
+
+    if estatisticas is not None:
+        expansoes, insercoes, pico_fronteira = totais
+        estatisticas.registrar(expansoes=expansoes, insercoes=insercoes, remocoes=expansoes,
+                               pico_fronteira=pico_fronteira,
+                               profundidade_maxima=max((len(caminho) - 1 for caminho in caminhos if caminho),
+                                                       default=0))
+    return caminhos
+
+def _busca_espaco_tempo(linhas, colunas, inicio, destino, agente, reservas, distancias, folga, totais):
+    """
+    A* no espaço-tempo para um agente, respeitando as reservas.
+
+    Os estados são inteiros instante * total + célula, como as chaves da
+    tabela de reservas. O agente só termina no destino em um instante depois
+    da última reserva de outro agente naquela célula, já que ficará parado ali.
+
+    A heurística é a distância real até o destino sem outros agentes, e nunca
+    menos que o instante em que o agente pode parar nele: assim, quando é
+    preciso esperar, os estados empatam em f e o desempate pelo instante leva
+    a busca direto para a espera, em vez de explorar todas as células
+    alcançáveis antes daquele instante.
+
+    Args:
+        distancias: DistanciaReversa até o destino
+        folga: Instantes a mais permitidos, contados a partir de quando o
+               agente pode chegar (ver planejar_agentes)
+        totais: Lista [expansões, inserções, pico da fronteira],
+                acumulada entre os agentes
+
+    Returns:
+        Lista de índices planos, um por instante, ou None
+    """
+    total = linhas * colunas
+    linha_destino, coluna_destino = destino
+    indice_inicio = inicio[0] * colunas + inicio[1]
+    indice_destino = linha_destino * colunas + coluna_destino
+    ocupacao = reservas.ocupacao
+    finais = reservas.finais
+    # Instante a partir do qual o agente pode parar no destino
+    pode_parar = reservas.ultima.get(indice_destino, -1) + 1
+    if finais.get(indice_destino) is not None:
+        # Outro agente já termina nesta célula
+        return None
+    # Se outro agente passa pelo destino depois do caminho mais curto, a folga
+    # conta a partir dessa passagem
+    minimo = distancias.distancia(indice_inicio)
+    horizonte = max(minimo, pode_parar) + folga
+    # Consulta direta às distâncias já calculadas; as outras retomam a busca reversa
+    custo, fechadas, distancia = distancias.custo, distancias.fechadas, distancias.distancia
+
+    # Entradas (f, -instante, estado): nos empates vence o agente mais adiantado
+    heap = [(max(minimo, pode_parar), 0, indice_inicio)]
+    # Com passos de custo 1, g é o próprio instante: cada estado entra na fila
+    # uma única vez, quando é alcançado pela primeira vez
+    antecessor = {indice_inicio: -1}
+    expansoes = 0
+    insercoes = 1
+    pico_fronteira = 0
+    encontrado = -1
+
+    while heap:
+        if len(heap) > pico_fronteira:
+            pico_fronteira = len(heap)
+        _, menos_instante, estado = heapq.heappop(heap)
+        expansoes += 1
+        instante = -menos_instante
+        celula = estado - instante * total
+
+        if celula == indice_destino and instante >= pode_parar:
+            encontrado = estado
+            break
+        linha, coluna = divmod(celula, colunas)
+        proximo = instante + 1
+        base = proximo * total
+        for dr, dc in MOVIMENTOS:
+            nr, nc = linha + dr, coluna + dc
+            if not (0 <= nr < linhas and 0 <= nc < colunas):
+                continue
+            vizinho = nr * colunas + nc
+            novo_estado = base + vizinho
+            if novo_estado in antecessor:
+                continue
+            restante = custo[vizinho] if fechadas[vizinho] else distancia(vizinho)
+            if restante == -1 or proximo + restante > horizonte:
+                # Obstáculo, célula sem caminho até o destino ou destino fora do horizonte
+                continue
+            # Posição ocupada no próximo instante (inclusive por um agente já parado no destino)
+            if novo_estado in ocupacao:
+                continue
+            chegada = finais.get(vizinho)
+            if chegada is not None and chegada <= proximo:
+                continue
+            # Troca de lugar: quem está no vizinho agora estará na célula atual depois
+            if vizinho != celula:
+                outro = ocupacao.get(instante * total + vizinho)
+                if outro is not None and outro != agente and ocupacao.get(base + celula) == outro:
+                    continue
+            antecessor[novo_estado] = estado
+            insercoes += 1
+            f = proximo + restante
+            heapq.heappush(heap, (f if f > pode_parar else pode_parar, -proximo, novo_estado))
+
+    totais[0] += expansoes
+    totais[1] += insercoes
+    totais[2] = max(totais[2], pico_fronteira)
+    if encontrado == -1:
+        return None
+
+    caminho = []
+    estado = encontrado
+    while estado != -1:
+        caminho.append(estado % total)
+        estado = antecessor[estado]
+    caminho.reverse()
+    return caminho
+
+def colisoes(caminhos, agentes):
+    """
+    Procura colisões entre os caminhos de vários agentes.
+
+    Considera que cada agente fica parado na última posição depois de chegar
+    e que um agente sem caminho (None) fica parado no início.
+
+    Args:
+        caminhos: Lista de caminhos, um por agente, com uma posição por instante
+        agentes: Lista de pares (inicio, destino) dada a planejar_agentes
+
+    Returns:
+        Lista de tuplas (instante, agente, outro agente, 'vértice' ou 'troca'),
+        vazia se não houver colisões
+    """
+    validos = [(agente, caminho if caminho else [tuple(inicio)])
+               for agente, (caminho, (inicio, _)) in enumerate(zip(caminhos, agentes))]
+    duracao = max((len(caminho) for _, caminho in validos), default=0)
+
+    def posicao(caminho, instante):
+        return caminho[min(instante, len(caminho) - 1)]
+
+    encontradas = []
+    for instante in range(duracao):
+        ocupadas = {}
+        for agente, caminho in validos:
+            atual = posicao(caminho, instante)
+            if atual in ocupadas:
+                encontradas.append((instante, ocupadas[atual], agente, 'vértice'))
+            ocupadas[atual] = agente
+        if instante == 0:
+            continue
+        # Troca: a sai de p para q enquanto b sai de q para p
+        movimentos = {}
+        for agente, caminho in validos:
+            anterior, atual = posicao(caminho, instante - 1), posicao(caminho, instante)
+            if anterior != atual:
+                outro = movimentos.get((atual, anterior))
+                if outro is not None:
+                    encontradas.append((instante, outro, agente, 'troca'))
+                movimentos[(anterior, atual)] = agente
+    return encontradas
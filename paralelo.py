@@ -0,0 +1,96 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from multiprocessing import shared_memory
+
+from cache_caminhos import CacheCaminhos, assinatura_tabuleiro
+from jogo_tabuleiro_rafael import astar_lote
+from tabuleiro_compacto import Tabuleiro, grade_plana
+
+# Estado de cada processo trabalhador, preenchido uma única vez por _iniciar_trabalhador
+_memoria_trabalhador = None
+_tabuleiro_trabalhador = None
+_cache_trabalhador = None
+_assinatura_trabalhador = None
+
+def _iniciar_trabalhador(nome, linhas, colunas):
+    """
+    Conecta o processo trabalhador ao tabuleiro em memória compartilhada.
+
+    O Tabuleiro do trabalhador usa diretamente o buffer compartilhado, então
+    o tabuleiro nunca é serializado (pickle) para as tarefas.
+
+    Args:
+        nome: Nome do bloco de memória compartilhada
+        linhas: Número de linhas do tabuleiro
+        colunas: Número de colunas do tabuleiro
+    """
+    global _memoria_trabalhador, _tabuleiro_trabalhador, _cache_trabalhador, _assinatura_trabalhador
+    _memoria_trabalhador = shared_memory.SharedMemory(name=nome)
+    celulas = _memoria_trabalhador.buf[:linhas * colunas]
+    _tabuleiro_trabalhador = Tabuleiro(linhas, colunas, celulas)
+    _cache_trabalhador = CacheCaminhos()
+    # O tabuleiro não muda durante o lote: o hash é calculado uma vez, não por fatia
+    _assinatura_trabalhador = assinatura_tabuleiro(_tabuleiro_trabalhador)
+
+def _resolver_fatia(pares):
+    """
+    Resolve uma fatia de consultas no processo trabalhador.
+
+    Returns:
+        Lista de caminhos (ou None), na ordem da fatia
+    """
+    return astar_lote(_tabuleiro_trabalhador, pares, _cache_trabalhador,
+                      assinatura=_assinatura_trabalhador)
+
+def resolver_paralelo(tabuleiro, pares, processos=None, tamanho_fatia=256):
+    """
+    Resolve uma sequência de consultas (início, destino) em vários processos.
+
+    O tabuleiro é copiado uma única vez para um bloco de memória compartilhada,
+    usado por todos os trabalhadores. As consultas são divididas em fatias
+    consecutivas, resolvidas com astar_lote (que reaproveita a busca entre
+    consultas da mesma origem). Os resultados são devolvidos na ordem das
+    consultas, e no máximo 2 fatias por processo ficam em andamento ao mesmo
+    tempo, então a memória usada não cresce com o total de consultas.
+
+    Args:
+        tabuleiro: Tabuleiro compacto ou matriz representando o tabuleiro
+        pares: Iterável de tuplas (inicio, destino); pode ser um gerador
+        processos: Número de processos (por padrão, o número de CPUs)
+        tamanho_fatia: Número de consultas enviadas por tarefa
+
+    Yields:
+        Um caminho (ou None) para cada consulta, na ordem de pares
+    """
+    if processos is None:
+        processos = os.cpu_count() or 1
+    linhas, colunas, celulas = grade_plana(tabuleiro)
+
+    memoria = shared_memory.SharedMemory(create=True, size=max(linhas * colunas, 1))
+    try:
+        memoria.buf[:linhas * colunas] = celulas
+
+        with ProcessPoolExecutor(max_workers=processos, initializer=_iniciar_trabalhador,
+                                 initargs=(memoria.name, linhas, colunas)) as executor:
+            consultas = iter(pares)
+            pendentes = deque()
+            limite_pendentes = 2 * processos
+
+            while True:
+                # Mantém a fila de tarefas cheia, sem ler todas as consultas de uma vez
+                while len(pendentes) < limite_pendentes:
+                    fatia = list(islice(consultas, tamanho_fatia))
+                    if not fatia:
+                        break
+                    pendentes.append(executor.submit(_resolver_fatia, fatia))
+
+                if not pendentes:
+                    break
+
+                # Devolve os resultados da fatia mais antiga, preservando a ordem
+                yield from pendentes.popleft().result()
+    finally:
+        memoria.close()
+        memoria.unlink()
@@ -0,0 +1,164 @@
+import shutil
+import sys
+import time
+
+from tabuleiro_compacto import Tabuleiro, grade_plana
+
+# Sequências ANSI: limpar a tela, limpar do cursor até o fim da tela e da linha
+LIMPAR_TELA = '\x1b[H\x1b[2J'
+LIMPAR_ABAIXO = '\x1b[J'
+LIMPAR_LINHA = '\x1b[2K'
+
+# Linha da tela (a partir de 1) onde fica a primeira linha do tabuleiro:
+# título, linha em branco e "Tabuleiro atual:" vêm antes, como em mostrar_tabuleiro
+PRIMEIRA_LINHA = 4
+
+def _posicionar(linha, coluna):
+    # Move o cursor para a linha e a coluna da tela (a partir de 1)
+    return f'\x1b[{linha};{coluna}H'
+
+class RenderizadorTerminal:
+    """
+    Desenha o tabuleiro no terminal redesenhando só o que mudou.
+
+    O primeiro quadro é desenhado inteiro, no mesmo formato de
+    mostrar_tabuleiro ("| a | b |"). Nos seguintes, cada célula diferente da
+    do quadro anterior é reescrita com um movimento de cursor ANSI, sem limpar
+    a tela nem criar processos. Cada quadro é montado em uma string e enviado
+    com uma única escrita. O cursor termina abaixo do tabuleiro, então
+    mensagens e input() continuam funcionando normalmente depois de cada quadro.
+
+    Um tabuleiro maior que o terminal é mostrado por uma janela do tamanho da
+    tela, que acompanha a célula em foco; quando a janela se move, o quadro é
+    redesenhado inteiro. Assim as posições absolutas do cursor nunca passam
+    da borda da tela, o que faria o terminal rolar ou quebrar linhas.
+    """
+
+    def __init__(self, saida=None, tamanho_terminal=None):
+        """
+        Args:
+            saida: Arquivo de texto onde desenhar (padrão: sys.stdout)
+            tamanho_terminal: Tupla (colunas, linhas) da tela; se omitido, é
+                              consultado a cada quadro (acompanha redimensionamentos)
+        """
+        self.saida = saida or sys.stdout
+        self.tamanho_terminal = tamanho_terminal
+        # Janela e células visíveis do último quadro desenhado
+        self._anterior = None
+        # Canto superior esquerdo (linha, coluna) da janela sobre o tabuleiro
+        self._origem = (0, 0)
+
+    def _janela(self, linhas, colunas, foco):
+        """
+        Calcula a parte do tabuleiro que cabe na tela.
+
+        Returns:
+            Tupla (linha inicial, coluna inicial, linhas visíveis, colunas visíveis)
+        """
+        largura, altura = self.tamanho_terminal or shutil.get_terminal_size()
+        # Cada célula ocupa 4 caracteres ("| a ") mais a borda final; uma coluna
+        # de sobra evita a quebra automática de linha na última coluna da tela
+        visiveis_colunas = max(1, min(colunas, (largura - 2) // 4))
+        # Linhas do título antes do tabuleiro e, depois dele, a linha em branco e
+        # duas linhas para as mensagens e o input() que seguem cada quadro
+        visiveis_linhas = max(1, min(linhas, altura - PRIMEIRA_LINHA - 3))
+
+        def ajustar(origem, tamanho, visiveis, alvo):
+            if alvo is not None and not origem <= alvo < origem + visiveis:
+                # Foco fora da janela: centraliza nele
+                origem = alvo - visiveis // 2
+            return max(0, min(origem, tamanho - visiveis))
+
+        linha_foco, coluna_foco = foco if foco is not None else (None, None)
+        topo = ajustar(self._origem[0], linhas, visiveis_linhas, linha_foco)
+        esquerda = ajustar(self._origem[1], colunas, visiveis_colunas, coluna_foco)
+        self._origem = (topo, esquerda)
+        return topo, esquerda, visiveis_linhas, visiveis_colunas
+
+    def quadro(self, tabuleiro, titulo='', foco=None):
+        """
+        Desenha um quadro: completo no primeiro (ou se as dimensões ou a
+        janela mudaram) e, nos demais, só as células alteradas e a linha do título.
+
+        Args:
+            tabuleiro: Tabuleiro compacto ou matriz 2D com o estado atual
+            titulo: Texto exibido na primeira linha da tela
+            foco: Tupla (linha, coluna) que deve ficar visível quando o
+                  tabuleiro não cabe na tela (opcional)
+
+        Returns:
+            Número de células escritas no quadro
+        """
+        linhas, colunas, celulas = grade_plana(tabuleiro)
+        celulas = bytes(celulas)
+        topo, esquerda, visiveis_linhas, visiveis_colunas = self._janela(linhas, colunas, foco)
+        janela = (linhas, colunas, topo, esquerda, visiveis_linhas, visiveis_colunas)
+
+        if (visiveis_linhas, visiveis_colunas) != (linhas, colunas):
+            titulo += (f" [linhas {topo}-{topo + visiveis_linhas - 1} de {linhas}, "
+                       f"colunas {esquerda}-{esquerda + visiveis_colunas - 1} de {colunas}]")
+        # O título não pode quebrar linha: empurraria o tabuleiro para baixo
+        titulo = titulo[:(self.tamanho_terminal or shutil.get_terminal_size())[0] - 1]
+
+        if self._anterior is None or self._anterior[0] != janela:
+            partes = [LIMPAR_TELA, titulo, '\n\nTabuleiro atual:\n']
+            for linha in range(topo, topo + visiveis_linhas):
+                inicio = linha * colunas + esquerda
+                partes.append('| ' + ' | '.join(celulas[inicio:inicio + visiveis_colunas].decode('latin-1'))
+                              + ' |\n')
+            escritas = visiveis_linhas * visiveis_colunas
+        else:
+            anteriores = self._anterior[1]
+            partes = [_posicionar(1, 1), LIMPAR_LINHA, titulo]
+            escritas = 0
+            for linha in range(topo, topo + visiveis_linhas):
+                inicio = linha * colunas + esquerda
+                fim = inicio + visiveis_colunas
+                # Compara o trecho visível da linha de uma vez e só então célula a célula
+                if celulas[inicio:fim] == anteriores[inicio:fim]:
+                    continue
+                for coluna in range(visiveis_colunas):
+                    codigo = celulas[inicio + coluna]
+                    if codigo != anteriores[inicio + coluna]:
+                        partes.append(_posicionar(PRIMEIRA_LINHA + linha - topo, 3 + 4 * coluna) + chr(codigo))
+                        escritas += 1
+
+        # Cursor logo abaixo do tabuleiro, apagando o que sobrou de quadros anteriores
+        partes.append(_posicionar(PRIMEIRA_LINHA + visiveis_linhas + 1, 1) + LIMPAR_ABAIXO)
+        self.saida.write(''.join(partes))
+        self.saida.flush()
+        self._anterior = (janela, celulas)
+        return escritas
+
+    def reproduzir(self, tabuleiro, caminho, simbolo, fps=30):
+        """
+        Reproduz um caminho automaticamente, marcando uma célula por quadro,
+        a uma taxa fixa de quadros por segundo.
+
+        O tempo de desenho é descontado da espera, então a taxa não cai com
+        caminhos longos enquanto cada quadro couber no intervalo.
+
+        Args:
+            tabuleiro: Tabuleiro compacto ou matriz 2D (não é alterado)
+            caminho: Lista de tuplas (linha, coluna) a percorrer
+            simbolo: Caractere usado para marcar o caminho
+            fps: Quadros por segundo (0 ou None: sem espera)
+
+        Returns:
+            Tabuleiro compacto com o caminho marcado
+        """
+        linhas, colunas, celulas = grade_plana(tabuleiro)
+        copia = Tabuleiro(linhas, colunas, bytearray(bytes(celulas)))
+        intervalo = 1 / fps if fps else 0
+        proximo = time.perf_counter()
+        for passo, (linha, coluna) in enumerate(caminho, 1):
+            copia.celulas[linha * colunas + coluna] = ord(simbolo)
+            self.quadro(copia, f"Passo {passo} de {len(caminho)}:", (linha, coluna))
+            proximo += intervalo
+            espera = proximo - time.perf_counter()
+            if espera > 0:
+                time.sleep(espera)
+            else:
+                # Atrasado: recomeça a contagem a partir de agora, sem tentar compensar
+                proximo = time.perf_counter()
+        return copia
@@ -0,0 +1,261 @@
+import heapq
+
+from custos import CUSTOS_PADRAO
+from jogo_tabuleiro_rafael import distancia_manhattan
+from tabuleiro_compacto import DIRECOES, Tabuleiro, grade_plana
+
+# Custo "infinito" (célula inalcançável), mantido inteiro para as chaves da fila
+INFINITO = 1 << 30
+
+class PlanejadorIncremental:
+    """
+    Planejador incremental (D* Lite) para um destino fixo em um tabuleiro que muda.
+
+    A busca é feita do destino para a posição do agente e o estado (custos g e
+    rhs e a fila de prioridade) é mantido entre as chamadas. Quando uma célula
+    muda entre livre e obstáculo, apenas os vértices afetados voltam para a
+    fila, e a próxima consulta repara somente a parte da busca que mudou.
+    """
+
+    def __init__(self, tabuleiro, inicio, destino, estatisticas=None, custos=None):
+        """
+        Args:
+            tabuleiro: Tabuleiro compacto (alterado no lugar por atualizar_celula)
+                       ou matriz 2D (copiada para um Tabuleiro interno)
+            inicio: Tupla (linha, coluna) da posição inicial do agente
+            destino: Tupla (linha, coluna) da posição de destino
+            estatisticas: EstatisticasBusca que acumula os contadores de todas as
+                          chamadas a proximo_passo (opcional)
+            custos: TabelaCustos com o custo de entrar em cada tipo de célula
+                    (padrão: 'X' bloqueia, o resto custa 1); consultada a cada
+                    passo, então vale também para células alteradas depois
+        """
+        if not isinstance(tabuleiro, Tabuleiro):
+            linhas, colunas, celulas = grade_plana(tabuleiro)
+            tabuleiro = Tabuleiro(linhas, colunas, bytearray(celulas))
+        self.tabuleiro = tabuleiro
+        self.linhas = tabuleiro.linhas
+        self.colunas = tabuleiro.colunas
+        self.destino = tuple(destino)
+        self.posicao = tuple(inicio)
+
+        self.estatisticas = estatisticas
+        self.custos = custos or CUSTOS_PADRAO
+        # Tabela de 256 entradas: custo de entrar na célula conforme o caractere
+        self._tabela_custos = self.custos.tabela
+
+        total = self.linhas * self.colunas
+        self._g = [INFINITO] * total
+        self._rhs = [INFINITO] * total
+        # Chave atual de cada vértice na fila (None = fora da fila); entradas do
+        # heap com chave diferente são obsoletas e descartadas ao serem retiradas
+        self._chave_na_fila = [None] * total
+        self._heap = []
+        self._km = 0
+        self._ultima_posicao = self.posicao
+
+        indice_destino = self._indice(self.destino)
+        self._rhs[indice_destino] = 0
+        self._inserir(indice_destino)
+
+    def _indice(self, posicao):
+        return posicao[0] * self.colunas + posicao[1]
+
+    def _vizinhos(self, indice):
+        linha, coluna = divmod(indice, self.colunas)
+        for dr, dc in DIRECOES:
+            nr, nc = linha + dr, coluna + dc
+            if 0 <= nr < self.linhas and 0 <= nc < self.colunas:
+                yield nr * self.colunas + nc
+
+    def _custo(self, indice):
+        return self._tabela_custos[self.tabuleiro.celulas[indice]]
+
+    def _livre(self, indice):
+        return self._custo(indice) != 0
+
+    def _chave(self, indice):
+        menor = min(self._g[indice], self._rhs[indice])
+        posicao = divmod(indice, self.colunas)
+        return (menor + distancia_manhattan(self.posicao, posicao) * self.custos.menor + self._km, menor)
+
+    def _inserir(self, indice):
+        chave = self._chave(indice)
+        self._chave_na_fila[indice] = chave
+        heapq.heappush(self._heap, (chave, indice))
+        if self.estatisticas is not None:
+            self.estatisticas.registrar(insercoes=1)
+
+    def _atualizar_vertice(self, indice):
+        """
+        Recalcula rhs do vértice e o coloca na fila se ficou inconsistente.
+        """
+        if indice != self._indice(self.destino):
+            melhor = INFINITO
+            # Como no A*, a posição do agente é só o ponto de partida: mesmo
+            # bloqueada, sai dela pelas vizinhas livres
+            if self._livre(indice) or indice == self._indice(self.posicao):
+                for vizinho in self._vizinhos(indice):
+                    custo = self._custo(vizinho)
+                    if custo and self._g[vizinho] + custo < melhor:
+                        melhor = self._g[vizinho] + custo
+            self._rhs[indice] = melhor
+        if self._g[indice] != self._rhs[indice]:
+            self._inserir(indice)
+        else:
+            self._chave_na_fila[indice] = None
+
+    def _topo(self):
+        """
+        Descarta entradas obsoletas do topo da fila.
+
+        Returns:
+            Entrada (chave, índice) válida do topo, ou None se a fila estiver vazia
+        """
+        heap = self._heap
+        while heap:
+            chave, indice = heap[0]
+            if self._chave_na_fila[indice] == chave:
+                return heap[0]
+            heapq.heappop(heap)
+            if self.estatisticas is not None:
+                self.estatisticas.registrar(remocoes=1, remocoes_obsoletas=1)
+        return None
+
+    def _calcular_caminho(self):
+        """
+        Processa a fila até que o custo da posição atual esteja consistente.
+        """
+        indice_posicao = self._indice(self.posicao)
+        medir = self.estatisticas is not None
+        expansoes = pico_fronteira = profundidade_maxima = 0
+        while True:
+            topo = self._topo()
+            if topo is None:
+                break
+            chave_antiga, indice = topo
+            if not (chave_antiga < self._chave(indice_posicao)
+                    or self._rhs[indice_posicao] > self._g[indice_posicao]):
+                break
+            if medir and len(self._heap) > pico_fronteira:
+                pico_fronteira = len(self._heap)
+            heapq.heappop(self._heap)
+            expansoes += 1
+
+            chave_nova = self._chave(indice)
+            if chave_antiga < chave_nova:
+                # A chave ficou desatualizada (o agente se moveu): reinsere
+                self._inserir(indice)
+            elif self._g[indice] > self._rhs[indice]:
+                # Vértice sobreconsistente: o custo diminuiu
+                self._g[indice] = self._rhs[indice]
+                self._chave_na_fila[indice] = None
+                if medir and self._g[indice] > profundidade_maxima:
+                    profundidade_maxima = self._g[indice]
+                for vizinho in self._vizinhos(indice):
+                    self._atualizar_vertice(vizinho)
+            else:
+                # Vértice subconsistente: o custo aumentou
+                self._g[indice] = INFINITO
+                self._atualizar_vertice(indice)
+                for vizinho in self._vizinhos(indice):
+                    self._atualizar_vertice(vizinho)
+
+        if medir:
+            self.estatisticas.registrar(expansoes=expansoes, remocoes=expansoes,
+                                        pico_fronteira=pico_fronteira,
+                                        profundidade_maxima=profundidade_maxima)
+
+    def atualizar_celula(self, linha, coluna, bloqueado):
+        """
+        Marca uma célula como obstáculo ou livre e agenda o reparo da busca.
+
+        Args:
+            linha: Índice da linha da célula
+            coluna: Índice da coluna da célula
+            bloqueado: True para obstáculo ('X'), False para célula livre (' ')
+        """
+        indice = linha * self.colunas + coluna
+        if (not self._livre(indice)) == bool(bloqueado):
+            return
+        self.alterar_celula(linha, coluna, 'X' if bloqueado else ' ')
+
+    def alterar_celula(self, linha, coluna, caractere):
+        """
+        Troca o caractere (o tipo de terreno) de uma célula e agenda o reparo da busca.
+
+        Args:
+            linha: Índice da linha da célula
+            coluna: Índice da coluna da célula
+            caractere: Novo caractere da célula; o custo vem da tabela de custos
+        """
+        indice = linha * self.colunas + coluna
+        if self.tabuleiro.celulas[indice] == ord(caractere):
+            return
+        self.tabuleiro.celulas[indice] = ord(caractere)
+
+        # Mudam os custos das arestas entre a célula e seus vizinhos
+        self._atualizar_vertice(indice)
+        for vizinho in self._vizinhos(indice):
+            self._atualizar_vertice(vizinho)
+
+    def _melhor_vizinho(self, indice):
+        melhor, melhor_custo = None, INFINITO
+        for vizinho in self._vizinhos(indice):
+            custo = self._custo(vizinho)
+            if custo and self._g[vizinho] + custo < melhor_custo:
+                melhor, melhor_custo = vizinho, self._g[vizinho] + custo
+        return melhor
+
+    def proximo_passo(self, posicao):
+        """
+        Informa a posição atual do agente e devolve o próximo passo até o destino.
+
+        Args:
+            posicao: Tupla (linha, coluna) da posição atual do agente
+
+        Returns:
+            Tupla (linha, coluna) da próxima posição (a própria posição se já
+            estiver no destino), ou None se o destino estiver inalcançável
+        """
+        if self.estatisticas is None:
+            return self._proximo_passo(posicao)
+        return self.estatisticas.medir(self._proximo_passo, posicao)
+
+    def _proximo_passo(self, posicao):
+        posicao = tuple(posicao)
+        # As chaves já na fila continuam sendo limites inferiores válidos porque
+        # km acumula o quanto o agente andou desde que elas foram calculadas
+        self._km += distancia_manhattan(self._ultima_posicao, posicao) * self.custos.menor
+        self._ultima_posicao = self.posicao = posicao
+        if self.posicao == self.destino:
+            return self.posicao
+        indice = self._indice(self.posicao)
+        if not self._livre(indice):
+            # Célula bloqueada tem rhs infinito até virar a posição do agente
+            self._atualizar_vertice(indice)
+        self._calcular_caminho()
+        # rhs da posição é o menor custo pelos vizinhos, já consistentes ao fim da busca
+        if self._rhs[indice] >= INFINITO:
+            return None
+        return divmod(self._melhor_vizinho(indice), self.colunas)
+
+    def caminho(self, posicao):
+        """
+        Devolve o caminho completo da posição informada até o destino.
+
+        Args:
+            posicao: Tupla (linha, coluna) da posição atual do agente
+
+        Returns:
+            Lista de tuplas (linha, coluna) até o destino, ou None se não houver caminho
+        """
+        if self.proximo_passo(posicao) is None:
+            return None
+        caminho = [self.posicao]
+        indice = self._indice(self.posicao)
+        indice_destino = self._indice(self.destino)
+        while indice != indice_destino:
+            indice = self._melhor_vizinho(indice)
+            caminho.append(divmod(indice, self.colunas))
+        return caminho
@@ -0,0 +1,448 @@
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from cache_caminhos import CacheCaminhos
+from carregador import abrir
+from componentes import ComponentesConexas
+from formato_caminho import codificar_caminho
+from gerador import gerar_consultas, gerar_tabuleiro
+from jogo_tabuleiro_rafael import astar
+from tabuleiro_compacto import Tabuleiro, grade_plana
+
+# Maior linha aceita no protocolo (um tabuleiro enviado em "carregar" vai em uma linha só)
+TAMANHO_MAXIMO_LINHA = 1 << 26
+
+# Tabuleiros mantidos conectados em cada processo trabalhador
+LIMITE_TABULEIROS_TRABALHADOR = 16
+
+# Caminhos guardados no cache de cada processo trabalhador
+CAPACIDADE_CACHE_TRABALHADOR = 4096
+
+# Estado de cada processo trabalhador: tabuleiros em memória compartilhada já
+# conectados (nome do bloco -> (bloco, Tabuleiro, ComponentesConexas)) e cache de caminhos
+_tabuleiros_trabalhador = OrderedDict()
+_cache_trabalhador = None
+
+def _resolver_consulta(nome, linhas, colunas, inicio, destino):
+    """
+    Resolve uma consulta no processo trabalhador.
+
+    O tabuleiro é conectado ao bloco de memória compartilhada na primeira
+    consulta e continua conectado para as seguintes. Os blocos têm nome único
+    por carregamento e nunca mudam, então o nome basta como chave do cache.
+
+    Returns:
+        Caminho (lista de tuplas) ou None
+    """
+    global _cache_trabalhador
+    if _cache_trabalhador is None:
+        _cache_trabalhador = CacheCaminhos(CAPACIDADE_CACHE_TRABALHADOR)
+    chave = (nome, inicio, destino)
+    ausente = object()
+    caminho = _cache_trabalhador.obter(chave, ausente)
+    if caminho is not ausente:
+        return caminho
+
+    conectado = _tabuleiros_trabalhador.get(nome)
+    if conectado is None:
+        memoria = shared_memory.SharedMemory(name=nome)
+        tabuleiro = Tabuleiro(linhas, colunas, memoria.buf[:linhas * colunas])
+        # Os tabuleiros residentes não mudam: os rótulos de componentes valem até serem removidos
+        conectado = (memoria, tabuleiro, ComponentesConexas(tabuleiro))
+        _tabuleiros_trabalhador[nome] = conectado
+        while len(_tabuleiros_trabalhador) > LIMITE_TABULEIROS_TRABALHADOR:
+            _tabuleiros_trabalhador.popitem(last=False)
+    _tabuleiros_trabalhador.move_to_end(nome)
+
+    caminho = astar(conectado[1], inicio, destino, componentes=conectado[2])
+    _cache_trabalhador.guardar(chave, caminho)
+    return caminho
+
+class ServicoCaminhos:
+    """
+    Serviço de consultas de caminho sobre tabuleiros residentes.
+
+    Os tabuleiros são carregados uma vez, com um identificador, em blocos de
+    memória compartilhada que os processos trabalhadores usam sem cópia. As
+    consultas rodam em um ProcessPoolExecutor, e cada trabalhador guarda os
+    caminhos já calculados. Consultas idênticas (mesmo tabuleiro, início e
+    destino) que chegam enquanto uma delas ainda está sendo calculada são
+    agrupadas: todas esperam pelo mesmo cálculo.
+
+    O protocolo (ver atender) é uma linha JSON por pedido e por resposta sobre
+    TCP, no mesmo formato de linha_comando.py.
+    """
+
+    def __init__(self, processos=None):
+        """
+        Args:
+            processos: Número de processos trabalhadores (padrão: número de CPUs)
+        """
+        self._executor = ProcessPoolExecutor(max_workers=processos)
+        # Identificador -> (bloco de memória compartilhada, linhas, colunas)
+        self._tabuleiros = {}
+        # (nome do bloco, início, destino) -> futuro do cálculo em andamento
+        self._em_andamento = {}
+        # Nome do bloco -> número de cálculos em andamento que o usam
+        self._usos = {}
+        # Blocos substituídos ou removidos que ainda têm cálculos em andamento
+        # (nome -> bloco): só são liberados quando o último termina
+        self._aposentados = {}
+        self.calculadas = 0
+        self.agrupadas = 0
+
+    def carregar_tabuleiro(self, identificador, tabuleiro):
+        """
+        Torna um tabuleiro residente, substituindo o que tiver o mesmo identificador.
+
+        Consultas em andamento no tabuleiro substituído terminam normalmente:
+        cada carregamento usa um bloco de memória novo, e o bloco antigo só é
+        liberado quando o último cálculo que o usa termina.
+
+        Args:
+            identificador: Nome usado nas consultas
+            tabuleiro: Tabuleiro compacto ou matriz representando o tabuleiro
+        """
+        linhas, colunas, celulas = grade_plana(tabuleiro)
+        memoria = shared_memory.SharedMemory(create=True, size=max(linhas * colunas, 1))
+        memoria.buf[:linhas * colunas] = bytes(celulas)
+        anterior = self._tabuleiros.get(identificador)
+        self._tabuleiros[identificador] = (memoria, linhas, colunas)
+        if anterior is not None:
+            self._descartar(anterior[0])
+
+    def remover_tabuleiro(self, identificador):
+        """
+        Args:
+            identificador: Tabuleiro a remover
+
+        Returns:
+            Boolean indicando se o tabuleiro estava carregado
+        """
+        anterior = self._tabuleiros.pop(identificador, None)
+        if anterior is not None:
+            self._descartar(anterior[0])
+        return anterior is not None
+
+    def _descartar(self, memoria):
+        # Um trabalhador só se conecta ao bloco (pelo nome) quando começa a
+        # consulta: com cálculos ainda na fila, o bloco espera o último deles
+        if self._usos.get(memoria.name):
+            self._aposentados[memoria.name] = memoria
+        else:
+            self._liberar(memoria)
+
+    def _liberar(self, memoria):
+        # Remove o nome do bloco; os trabalhadores já conectados continuam
+        # com acesso a ele até descartarem a conexão
+        memoria.close()
+        memoria.unlink()
+
+    def _terminar(self, chave):
+        # Chamado quando um cálculo termina: libera o bloco aposentado sem mais usos
+        self._em_andamento.pop(chave, None)
+        nome = chave[0]
+        self._usos[nome] -= 1
+        if not self._usos[nome]:
+            del self._usos[nome]
+            memoria = self._aposentados.pop(nome, None)
+            if memoria is not None:
+                self._liberar(memoria)
+
+    async def caminho(self, identificador, inicio, destino):
+        """
+        Resolve uma consulta, agrupando-a com uma idêntica em andamento.
+
+        Args:
+            identificador: Identificador de um tabuleiro carregado
+            inicio: Tupla (linha, coluna) da posição inicial
+            destino: Tupla (linha, coluna) da posição de destino
+
+        Returns:
+            Lista de tuplas representando o caminho, ou None se não houver caminho
+        """
+        if identificador not in self._tabuleiros:
+            raise ValueError(f"tabuleiro desconhecido: {identificador!r}")
+        memoria, linhas, colunas = self._tabuleiros[identificador]
+        for linha, coluna in (inicio, destino):
+            if not (0 <= linha < linhas and 0 <= coluna < colunas):
+                raise ValueError(f"posição ({linha}, {coluna}) fora do tabuleiro")
+
+        chave = (memoria.name, inicio, destino)
+        futuro = self._em_andamento.get(chave)
+        if futuro is None:
+            futuro = asyncio.get_running_loop().run_in_executor(
+                self._executor, _resolver_consulta, memoria.name, linhas, colunas, inicio, destino)
+            self._em_andamento[chave] = futuro
+            self._usos[memoria.name] = self._usos.get(memoria.name, 0) + 1
+            futuro.add_done_callback(lambda _: self._terminar(chave))
+            self.calculadas += 1
+        else:
+            self.agrupadas += 1
+        # Um cliente que desiste não cancela o cálculo dos outros que esperam por ele
+        return await asyncio.shield(futuro)
+
+    async def _responder(self, pedido):
+        """
+        Executa um pedido já decodificado.
+
+        Returns:
+            Dicionário da resposta
+        """
+        operacao = pedido.get('op', 'caminho')
+        if operacao == 'caminho':
+            inicio = tuple(pedido['inicio'])
+            destino = tuple(pedido['destino'])
+            caminho = await self.caminho(pedido['tabuleiro'], inicio, destino)
+            passos = len(caminho) - 1 if caminho is not None else None
+            if caminho is not None and pedido.get('formato') == 'rle':
+                # Código de direções ("R5U3") em vez da lista de posições
+                caminho = codificar_caminho(caminho)
+            return {'caminho': caminho, 'passos': passos}
+        if operacao == 'carregar':
+            if 'arquivo' in pedido:
+                tabuleiro = await asyncio.get_running_loop().run_in_executor(None, abrir, pedido['arquivo'])
+            else:
+                tabuleiro = [list(linha) for linha in pedido['linhas']]
+                if any(len(linha) != len(tabuleiro[0]) for linha in tabuleiro):
+                    raise ValueError("as linhas do tabuleiro devem ter o mesmo tamanho")
+            self.carregar_tabuleiro(pedido['tabuleiro'], tabuleiro)
+            return {'carregado': pedido['tabuleiro']}
+        if operacao == 'remover':
+            return {'removido': self.remover_tabuleiro(pedido['tabuleiro'])}
+        if operacao == 'estatisticas':
+            return {'tabuleiros': len(self._tabuleiros), 'calculadas': self.calculadas,
+                    'agrupadas': self.agrupadas, 'em_andamento': len(self._em_andamento)}
+        raise ValueError(f"operação desconhecida: {operacao!r}")
+
+    async def _atender_pedido(self, linha, escritor):
+        try:
+            pedido = json.loads(linha)
+        except ValueError as erro:
+            pedido, resposta = {}, {'erro': f"pedido inválido: {erro}"}
+        else:
+            try:
+                resposta = await self._responder(pedido)
+            except (KeyError, TypeError, ValueError, OSError) as erro:
+                resposta = {'erro': f"{type(erro).__name__}: {erro}"}
+        if 'id' in pedido:
+            resposta['id'] = pedido['id']
+        escritor.write(json.dumps(resposta, separators=(',', ':'), ensure_ascii=False).encode('utf-8') + b'\n')
+
+    async def atender(self, leitor, escritor):
+        """
+        Atende uma conexão: um pedido JSON por linha, uma resposta JSON por linha.
+
+        Pedidos ("op" padrão: "caminho"):
+            {"op": "caminho", "tabuleiro": id, "inicio": [l, c], "destino": [l, c]},
+            com "formato": "rle" opcional para receber o caminho como "R5U3"
+            {"op": "carregar", "tabuleiro": id, "arquivo": caminho} ou com "linhas": [" X ", ...]
+            {"op": "remover", "tabuleiro": id}
+            {"op": "estatisticas"}
+
+        Os pedidos de uma conexão são atendidos em paralelo, então as respostas
+        podem sair fora de ordem: um campo "id" no pedido é devolvido na resposta.
+        Erros geram uma resposta com "erro".
+        """
+        tarefas = set()
+        try:
+            while True:
+                try:
+                    linha = await leitor.readline()
+                except ValueError:
+                    # Linha maior que TAMANHO_MAXIMO_LINHA
+                    escritor.write(b'{"erro":"pedido grande demais"}\n')
+                    break
+                if not linha:
+                    break
+                if not linha.strip():
+                    continue
+                tarefa = asyncio.create_task(self._atender_pedido(linha, escritor))
+                tarefas.add(tarefa)
+                tarefa.add_done_callback(tarefas.discard)
+                await escritor.drain()
+            if tarefas:
+                await asyncio.gather(*tarefas)
+            await escritor.drain()
+        except ConnectionError:
+            pass
+        finally:
+            escritor.close()
+
+    async def servir(self, host='127.0.0.1', porta=8765, pronto=None):
+        """
+        Aceita conexões até ser cancelado.
+
+        Args:
+            host: Endereço de escuta
+            porta: Porta TCP (0 escolhe uma livre)
+            pronto: Função chamada com a porta assim que o servidor estiver escutando (opcional)
+        """
+        servidor = await asyncio.start_server(self.atender, host, porta, limit=TAMANHO_MAXIMO_LINHA)
+        async with servidor:
+            if pronto is not None:
+                pronto(servidor.sockets[0].getsockname()[1])
+            await servidor.serve_forever()
+
+    def fechar(self):
+        """
+        Encerra os processos trabalhadores e libera os tabuleiros residentes.
+        """
+        self._executor.shutdown()
+        for identificador in list(self._tabuleiros):
+            self.remover_tabuleiro(identificador)
+        # Com os trabalhadores encerrados, nenhum cálculo usa mais os blocos aposentados
+        for memoria in self._aposentados.values():
+            self._liberar(memoria)
+        self._aposentados.clear()
+        self._usos.clear()
+
+async def teste_carga(host, porta, tabuleiro, pares, conexoes=8, em_voo=16, identificador='carga'):
+    """
+    Teste de carga: carrega o tabuleiro no serviço e dispara as consultas por
+    várias conexões, cada uma com até em_voo pedidos pendentes ao mesmo tempo.
+
+    Args:
+        host: Endereço do serviço
+        porta: Porta do serviço
+        tabuleiro: Tabuleiro compacto ou matriz enviado ao serviço
+        pares: Lista de consultas (início, destino)
+        conexoes: Número de conexões simultâneas
+        em_voo: Pedidos pendentes por conexão
+        identificador: Identificador usado para o tabuleiro no serviço
+
+    Returns:
+        Dicionário com consultas, erros, segundos, vazão (consultas por
+        segundo), latências p50/p90/p99 em ms e as estatísticas do serviço
+    """
+    linhas, colunas, celulas = grade_plana(tabuleiro)
+    celulas = bytes(celulas).decode('latin-1')
+
+    async def pedido_unico(pedido):
+        leitor, escritor = await asyncio.open_connection(host, porta, limit=TAMANHO_MAXIMO_LINHA)
+        escritor.write(json.dumps(pedido).encode('utf-8') + b'\n')
+        await escritor.drain()
+        resposta = json.loads(await leitor.readline())
+        escritor.close()
+        await escritor.wait_closed()
+        return resposta
+
+    resposta = await pedido_unico({'op': 'carregar', 'tabuleiro': identificador,
+                                   'linhas': [celulas[inicio:inicio + colunas]
+                                              for inicio in range(0, linhas * colunas, colunas)]})
+    if 'erro' in resposta:
+        raise RuntimeError(f"o serviço recusou o tabuleiro: {resposta['erro']}")
+
+    latencias = []
+    erros = 0
+
+    async def conexao(fatia):
+        nonlocal erros
+        leitor, escritor = await asyncio.open_connection(host, porta, limit=TAMANHO_MAXIMO_LINHA)
+        livres = asyncio.Semaphore(em_voo)
+        enviados = {}
+
+        async def enviar():
+            for numero, (inicio, destino) in fatia:
+                await livres.acquire()
+                enviados[numero] = time.perf_counter()
+                escritor.write(json.dumps({'id': numero, 'tabuleiro': identificador, 'inicio': inicio,
+                                           'destino': destino}).encode('utf-8') + b'\n')
+                await escritor.drain()
+
+        async def receber():
+            nonlocal erros
+            for _ in range(len(fatia)):
+                resposta = json.loads(await leitor.readline())
+                latencias.append(time.perf_counter() - enviados.pop(resposta['id']))
+                if 'erro' in resposta:
+                    erros += 1
+                livres.release()
+
+        await asyncio.gather(enviar(), receber())
+        escritor.close()
+        await escritor.wait_closed()
+
+    numerados = list(enumerate(pares))
+    comeco = time.perf_counter()
+    await asyncio.gather(*(conexao(numerados[indice::conexoes]) for indice in range(conexoes)))
+    segundos = time.perf_counter() - comeco
+
+    latencias.sort()
+
+    def percentil_ms(fracao):
+        # Percentil pelo posto mais próximo, em milissegundos
+        return latencias[min(len(latencias) - 1, int(fracao * len(latencias)))] * 1000 if latencias else 0.0
+
+    return {
+        'consultas': len(latencias),
+        'erros': erros,
+        'segundos': segundos,
+        'vazao': len(latencias) / segundos if segundos else 0.0,
+        'p50_ms': percentil_ms(0.50),
+        'p90_ms': percentil_ms(0.90),
+        'p99_ms': percentil_ms(0.99),
+        'servico': await pedido_unico({'op': 'estatisticas'}),
+    }
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Serviço de caminhos sobre TCP e teste de carga.")
+    subcomandos = parser.add_subparsers(dest='comando', required=True)
+
+    servir = subcomandos.add_parser('servir', help="inicia o serviço")
+    servir.add_argument('--host', default='127.0.0.1')
+    servir.add_argument('--porta', type=int, default=8765)
+    servir.add_argument('--processos', type=int, help="processos trabalhadores (padrão: número de CPUs)")
+    servir.add_argument('--tabuleiro', action='append', default=[], metavar='ID=ARQUIVO',
+                        help="tabuleiro carregado na partida (pode repetir)")
+
+    carga = subcomandos.add_parser('carga', help="mede vazão e latência de um serviço em execução")
+    carga.add_argument('--host', default='127.0.0.1')
+    carga.add_argument('--porta', type=int, default=8765)
+    carga.add_argument('--tamanho', type=int, default=200, help="lado do tabuleiro aleatório")
+    carga.add_argument('--densidade', type=float, default=0.2)
+    carga.add_argument('--consultas', type=int, default=2000)
+    carga.add_argument('--distintas', type=int, default=500,
+                       help="consultas distintas; as demais repetem estas, para exercitar o agrupamento")
+    carga.add_argument('--conexoes', type=int, default=8)
+    carga.add_argument('--em-voo', type=int, default=16, help="pedidos pendentes por conexão")
+    carga.add_argument('--semente', type=int, default=0)
+    opcoes = parser.parse_args(argumentos)
+
+    if opcoes.comando == 'servir':
+        servico = ServicoCaminhos(opcoes.processos)
+        try:
+            for definicao in opcoes.tabuleiro:
+                identificador, _, arquivo = definicao.partition('=')
+                servico.carregar_tabuleiro(identificador, abrir(arquivo))
+            asyncio.run(servico.servir(opcoes.host, opcoes.porta,
+                                       lambda porta: print(f"escutando em {opcoes.host}:{porta}", file=sys.stderr)))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            servico.fechar()
+        return 0
+
+    tabuleiro = gerar_tabuleiro(opcoes.tamanho, opcoes.tamanho, opcoes.densidade, semente=opcoes.semente)
+    distintas = gerar_consultas(tabuleiro, min(opcoes.distintas, opcoes.consultas) or 1, opcoes.semente)
+    pares = random.Random(opcoes.semente).choices(distintas, k=opcoes.consultas)
+    resultado = asyncio.run(teste_carga(opcoes.host, opcoes.porta, tabuleiro, pares,
+                                        opcoes.conexoes, opcoes.em_voo))
+    print(f"consultas:        {resultado['consultas']} ({resultado['erros']} com erro)")
+    print(f"tempo:            {resultado['segundos']:.3f} s")
+    print(f"vazão:            {resultado['vazao']:.1f} consultas/s")
+    print(f"latência p50:     {resultado['p50_ms']:.2f} ms")
+    print(f"latência p90:     {resultado['p90_ms']:.2f} ms")
+    print(f"latência p99:     {resultado['p99_ms']:.2f} ms")
+    print(f"serviço:          {resultado['servico']}")
+    return 1 if resultado['erros'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
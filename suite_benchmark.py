@@ -0,0 +1,290 @@
+import argparse
+import csv
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+from baldes import astar_baldes
+from benchmark import astar_original, backtracking_original
+from bidirecional import astar_bidirecional
+from estatisticas import EstatisticasBusca
+from gerador import TIPOS, gerar_consultas, gerar_tabuleiro
+from hierarquico import GrafoHierarquico
+from jogo_tabuleiro_rafael import astar, backtracking
+from jps import astar_jps
+from marcos import MarcosALT
+from replanejamento import PlanejadorIncremental
+
+# Cada algoritmo é uma função que recebe o tabuleiro, faz o pré-processamento
+# necessário e devolve resolver(inicio, destino, estatisticas)
+
+def _preparar_astar(tabuleiro):
+    return lambda inicio, destino, estatisticas: astar(tabuleiro, inicio, destino, estatisticas)
+
+def _preparar_backtracking(tabuleiro):
+    return lambda inicio, destino, estatisticas: backtracking(tabuleiro, inicio, destino,
+                                                              estatisticas=estatisticas)
+
+def _preparar_jps(tabuleiro):
+    return lambda inicio, destino, estatisticas: astar_jps(tabuleiro, inicio, destino, estatisticas)
+
+def _preparar_bidirecional(tabuleiro):
+    return lambda inicio, destino, estatisticas: astar_bidirecional(tabuleiro, inicio, destino, estatisticas)
+
+def _preparar_baldes(tabuleiro):
+    return lambda inicio, destino, estatisticas: astar_baldes(tabuleiro, inicio, destino, estatisticas)
+
+def _preparar_hierarquico(tabuleiro):
+    grafo = GrafoHierarquico(tabuleiro)
+    return grafo.caminho
+
+def _preparar_marcos(tabuleiro):
+    marcos = MarcosALT(tabuleiro)
+    return marcos.caminho
+
+def _preparar_dstar(tabuleiro):
+    # Uma consulta isolada do D* Lite inclui a busca inicial completa
+    return lambda inicio, destino, estatisticas: PlanejadorIncremental(
+        tabuleiro, inicio, destino, estatisticas).caminho(inicio)
+
+def _preparar_astar_original(tabuleiro):
+    matriz = tabuleiro.para_lista()
+    return lambda inicio, destino, estatisticas: astar_original(matriz, inicio, destino)
+
+def _preparar_backtracking_original(tabuleiro):
+    matriz = tabuleiro.para_lista()
+    return lambda inicio, destino, estatisticas: backtracking_original(matriz, inicio, destino)[0]
+
+# Nome -> (preparação, maior número de células em que o algoritmo é medido)
+ALGORITMOS = {
+    'astar': (_preparar_astar, None),
+    'jps': (_preparar_jps, None),
+    'bidirecional': (_preparar_bidirecional, None),
+    'baldes': (_preparar_baldes, None),
+    'hierarquico': (_preparar_hierarquico, None),
+    'marcos': (_preparar_marcos, None),
+    'dstar': (_preparar_dstar, 200 * 200),
+    'backtracking': (_preparar_backtracking, 32 * 32),
+    'astar_original': (_preparar_astar_original, 200 * 200),
+    # Exponencial: só em tabuleiros minúsculos
+    'backtracking_original': (_preparar_backtracking_original, 5 * 5),
+}
+
+# Campos de cada linha de resultado, na ordem das colunas do CSV
+CAMPOS = ['tipo', 'linhas', 'colunas', 'densidade', 'semente', 'algoritmo', 'consultas',
+          'repeticoes', 'encontrados', 'preparo_ms', 'mediana_ms', 'p90_ms', 'p99_ms',
+          'minimo_ms', 'maximo_ms', 'media_ms', 'expansoes_media', 'memoria_pico_kib']
+
+# Campos que identificam um cenário ao comparar com uma execução de referência
+CHAVE = ('tipo', 'linhas', 'colunas', 'densidade', 'semente', 'consultas', 'algoritmo')
+
+def percentil(valores, fracao):
+    """
+    Percentil com interpolação linear entre os dois valores mais próximos.
+
+    Args:
+        valores: Lista ordenada de números (não vazia)
+        fracao: Percentil desejado entre 0 e 1 (0.9 = p90)
+
+    Returns:
+        Valor do percentil
+    """
+    posicao = (len(valores) - 1) * fracao
+    abaixo = int(posicao)
+    acima = min(abaixo + 1, len(valores) - 1)
+    return valores[abaixo] + (valores[acima] - valores[abaixo]) * (posicao - abaixo)
+
+def medir_cenario(tabuleiro, consultas, algoritmo, repeticoes=3):
+    """
+    Mede um algoritmo em um tabuleiro com uma lista fixa de consultas.
+
+    As latências vêm de repeticoes passadas sem instrumentação. Uma passada
+    extra, separada para não distorcer os tempos, mede com tracemalloc o pico
+    de memória e, com EstatisticasBusca, os nós expandidos.
+
+    Args:
+        tabuleiro: Tabuleiro compacto
+        consultas: Lista de pares (início, destino)
+        algoritmo: Nome de um algoritmo em ALGORITMOS
+        repeticoes: Quantas vezes cada consulta é cronometrada
+
+    Returns:
+        Dicionário com as métricas do cenário (os campos de CAMPOS, menos os
+        que descrevem o tabuleiro)
+    """
+    preparar, _ = ALGORITMOS[algoritmo]
+    inicio_preparo = time.perf_counter()
+    resolver = preparar(tabuleiro)
+    preparo = time.perf_counter() - inicio_preparo
+
+    latencias = []
+    for _ in range(repeticoes):
+        for inicio, destino in consultas:
+            comeco = time.perf_counter()
+            resolver(inicio, destino, None)
+            latencias.append(time.perf_counter() - comeco)
+    latencias.sort()
+
+    estatisticas = EstatisticasBusca()
+    encontrados = 0
+    tracemalloc.start()
+    try:
+        for inicio, destino in consultas:
+            if resolver(inicio, destino, estatisticas) is not None:
+                encontrados += 1
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'algoritmo': algoritmo,
+        'consultas': len(consultas),
+        'repeticoes': repeticoes,
+        'encontrados': encontrados,
+        'preparo_ms': round(preparo * 1000, 4),
+        'mediana_ms': round(statistics.median(latencias) * 1000, 4),
+        'p90_ms': round(percentil(latencias, 0.9) * 1000, 4),
+        'p99_ms': round(percentil(latencias, 0.99) * 1000, 4),
+        'minimo_ms': round(latencias[0] * 1000, 4),
+        'maximo_ms': round(latencias[-1] * 1000, 4),
+        'media_ms': round(statistics.fmean(latencias) * 1000, 4),
+        'expansoes_media': round(estatisticas.expansoes / len(consultas), 1),
+        'memoria_pico_kib': round(pico / 1024, 1),
+    }
+
+def executar_suite(tamanhos, densidades, tipos, algoritmos, consultas=20, repeticoes=3,
+                   semente=0, progresso=None):
+    """
+    Mede cada algoritmo em cada combinação de tamanho, densidade e tipo de tabuleiro.
+
+    Os tabuleiros e as consultas são gerados com a semente informada, então duas
+    execuções com os mesmos parâmetros medem exatamente o mesmo trabalho. Um
+    algoritmo é pulado nos tabuleiros maiores que o seu limite em ALGORITMOS.
+
+    Args:
+        tamanhos: Lista com os lados dos tabuleiros quadrados
+        densidades: Lista de densidades de obstáculos (só para o tipo 'aberto')
+        tipos: Lista de tipos de tabuleiro ('aberto', 'labirinto')
+        algoritmos: Lista de nomes de ALGORITMOS
+        consultas: Número de consultas por tabuleiro
+        repeticoes: Quantas vezes cada consulta é cronometrada
+        semente: Semente dos tabuleiros e das consultas
+        progresso: Função chamada com cada linha de resultado (opcional)
+
+    Returns:
+        Lista de dicionários, um por cenário medido, com os campos de CAMPOS
+    """
+    resultados = []
+    for tipo in tipos:
+        # A densidade não se aplica a labirintos
+        for densidade in (densidades if tipo == 'aberto' else [0.0]):
+            for tamanho in tamanhos:
+                tabuleiro = gerar_tabuleiro(tamanho, tamanho, densidade, tipo, semente)
+                pares = gerar_consultas(tabuleiro, consultas, semente)
+                for algoritmo in algoritmos:
+                    _, limite_celulas = ALGORITMOS[algoritmo]
+                    if limite_celulas is not None and tamanho * tamanho > limite_celulas:
+                        continue
+                    linha = {'tipo': tipo, 'linhas': tamanho, 'colunas': tamanho,
+                             'densidade': densidade, 'semente': semente}
+                    linha.update(medir_cenario(tabuleiro, pares, algoritmo, repeticoes))
+                    resultados.append(linha)
+                    if progresso is not None:
+                        progresso(linha)
+    return resultados
+
+def escrever_csv(resultados, arquivo):
+    """
+    Escreve os resultados em CSV, uma linha por cenário.
+
+    Args:
+        resultados: Lista devolvida por executar_suite
+        arquivo: Arquivo de texto aberto para escrita
+    """
+    escritor = csv.DictWriter(arquivo, fieldnames=CAMPOS)
+    escritor.writeheader()
+    escritor.writerows(resultados)
+
+def escrever_json(resultados, arquivo):
+    """
+    Escreve os resultados em JSON, junto com a versão do Python e a plataforma.
+
+    Args:
+        resultados: Lista devolvida por executar_suite
+        arquivo: Arquivo de texto aberto para escrita
+    """
+    json.dump({
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'resultados': resultados,
+    }, arquivo, indent=2, ensure_ascii=False)
+    arquivo.write('\n')
+
+def comparar_com_referencia(resultados, referencia, tolerancia=0.25):
+    """
+    Procura regressões: cenários cuja mediana ficou mais lenta que a da referência.
+
+    Args:
+        resultados: Lista devolvida por executar_suite
+        referencia: Lista de resultados de uma execução anterior (por exemplo,
+                    o campo 'resultados' de um JSON salvo por escrever_json)
+        tolerancia: Aumento relativo aceito na mediana (0.25 = 25% mais lento)
+
+    Returns:
+        Lista de tuplas (cenário, mediana de referência, mediana atual) das regressões
+    """
+    medianas = {tuple(linha[campo] for campo in CHAVE): linha['mediana_ms'] for linha in referencia}
+    regressoes = []
+    for linha in resultados:
+        chave = tuple(linha[campo] for campo in CHAVE)
+        anterior = medianas.get(chave)
+        if anterior is not None and linha['mediana_ms'] > anterior * (1 + tolerancia):
+            regressoes.append((dict(zip(CHAVE, chave)), anterior, linha['mediana_ms']))
+    return regressoes
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(
+        description="Mede os algoritmos de caminho em tabuleiros aleatórios reproduzíveis.")
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[16, 64, 256])
+    parser.add_argument('--densidades', type=float, nargs='+', default=[0.0, 0.2, 0.35])
+    parser.add_argument('--tipos', nargs='+', choices=TIPOS, default=list(TIPOS))
+    parser.add_argument('--algoritmos', nargs='+', choices=list(ALGORITMOS), default=list(ALGORITMOS))
+    parser.add_argument('--consultas', type=int, default=20)
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--formato', choices=('csv', 'json'), default='csv')
+    parser.add_argument('--saida', help="arquivo de saída (padrão: saída padrão)")
+    parser.add_argument('--referencia', help="JSON de uma execução anterior para detectar regressões")
+    parser.add_argument('--tolerancia', type=float, default=0.25,
+                        help="aumento relativo aceito na mediana (padrão: 0.25)")
+    opcoes = parser.parse_args(argumentos)
+
+    def progresso(linha):
+        print(f"{linha['tipo']:>9} {linha['linhas']:>5} {linha['densidade']:>5.2f} "
+              f"{linha['algoritmo']:>22} {linha['mediana_ms']:>10.3f} ms", file=sys.stderr)
+
+    resultados = executar_suite(opcoes.tamanhos, opcoes.densidades, opcoes.tipos, opcoes.algoritmos,
+                                opcoes.consultas, opcoes.repeticoes, opcoes.semente, progresso)
+
+    escrever = escrever_csv if opcoes.formato == 'csv' else escrever_json
+    if opcoes.saida:
+        with open(opcoes.saida, 'w', newline='', encoding='utf-8') as arquivo:
+            escrever(resultados, arquivo)
+    else:
+        escrever(resultados, sys.stdout)
+
+    if opcoes.referencia:
+        with open(opcoes.referencia, encoding='utf-8') as arquivo:
+            referencia = json.load(arquivo)['resultados']
+        regressoes = comparar_com_referencia(resultados, referencia, opcoes.tolerancia)
+        for cenario, anterior, atual in regressoes:
+            print(f"REGRESSÃO {cenario}: mediana {anterior:.3f} ms -> {atual:.3f} ms", file=sys.stderr)
+        if regressoes:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,316 @@
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional: o tabuleiro funciona só com bytearray
+    np = None
+
+# Cada célula guarda o próprio caractere em um byte, mantendo a convenção ' ' / 'X'
+LIVRE = ord(' ')
+OBSTACULO = ord('X')
+
+# Direções possíveis: cima, direita, baixo, esquerda (mesma ordem do A*)
+DIRECOES = [(-1, 0), (0, 1), (1, 0), (0, -1)]
+
+# Decodificação de um byte compactado nos 8 caracteres que ele representa
+# (bit menos significativo primeiro; bit 1 = obstáculo)
+_DECODIFICA_BYTE = [bytes(OBSTACULO if byte >> bit & 1 else LIVRE for bit in range(8))
+                    for byte in range(256)]
+
+# Tabela para bytes.translate: '1' para obstáculo, '0' para qualquer outra célula
+_PARA_BINARIO = bytes(ord('1') if byte == OBSTACULO else ord('0') for byte in range(256))
+
+class CelulasCompactadas:
+    """
+    Células guardadas com um bit por célula (1 = obstáculo, 0 = livre).
+
+    Imita a interface de leitura do buffer de bytes de um Tabuleiro: celulas[i]
+    devolve o código de ' ' ou 'X', então os algoritmos de busca funcionam sem
+    alterações sobre um arquivo mapeado em memória. Qualquer caractere que não
+    seja 'X' é guardado como célula livre.
+    """
+    __slots__ = ('bits', 'total')
+
+    def __init__(self, bits, total):
+        """
+        Args:
+            bits: Buffer (bytearray, memoryview, mmap...) com (total + 7) // 8 bytes
+            total: Número de células representadas
+        """
+        if len(bits) < (total + 7) // 8:
+            raise ValueError("o buffer de bits é menor que o número de células")
+        self.bits = bits
+        self.total = total
+
+    @classmethod
+    def de_celulas(cls, celulas):
+        """
+        Compacta um buffer de caracteres (um byte por célula) em bits.
+
+        Args:
+            celulas: Buffer com um caractere por célula
+
+        Returns:
+            CelulasCompactadas em um bytearray novo
+        """
+        return cls(compactar_celulas(celulas), len(celulas))
+
+    def __len__(self):
+        return self.total
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            inicio, fim, passo = indice.indices(self.total)
+            if passo != 1:
+                return bytes(self[i] for i in range(inicio, fim, passo))
+            if fim <= inicio:
+                return b''
+            primeiro = inicio >> 3
+            decodificado = b''.join(_DECODIFICA_BYTE[byte] for byte in self.bits[primeiro:(fim + 7) >> 3])
+            deslocamento = inicio - (primeiro << 3)
+            return decodificado[deslocamento:deslocamento + fim - inicio]
+        if indice < 0:
+            indice += self.total
+        return OBSTACULO if self.bits[indice >> 3] >> (indice & 7) & 1 else LIVRE
+
+    def __setitem__(self, indice, codigo):
+        if indice < 0:
+            indice += self.total
+        posicao = indice >> 3
+        mascara = 1 << (indice & 7)
+        if codigo == OBSTACULO:
+            self.bits[posicao] = self.bits[posicao] | mascara
+        else:
+            self.bits[posicao] = self.bits[posicao] & ~mascara
+
+    def __bytes__(self):
+        return self[:]
+
+    def __iter__(self):
+        # Decodifica em blocos para não gerar o tabuleiro inteiro de uma vez
+        bloco = 1 << 16
+        for inicio in range(0, self.total, bloco):
+            yield from self[inicio:inicio + bloco]
+
+def compactar_celulas(celulas):
+    """
+    Converte um buffer de caracteres (um byte por célula) para um bit por célula.
+
+    Args:
+        celulas: Buffer com um caractere por célula
+
+    Returns:
+        bytearray com (len(celulas) + 7) // 8 bytes, bit menos significativo primeiro
+    """
+    total = len(celulas)
+    bits = bytearray((total + 7) // 8)
+    # Blocos múltiplos de 8 células: cada bloco vira um inteiro em base 2
+    bloco = 8 << 16
+    for inicio in range(0, total, bloco):
+        digitos = bytes(celulas[inicio:inicio + bloco]).translate(_PARA_BINARIO)
+        quantidade = (len(digitos) + 7) // 8
+        digitos = digitos.ljust(quantidade * 8, b'0')
+        bits[inicio // 8:inicio // 8 + quantidade] = int(digitos[::-1], 2).to_bytes(quantidade, 'little')
+    return bits
+
+class LinhaTabuleiro:
+    """
+    Visão (sem cópia) de uma linha do tabuleiro compacto.
+    Se comporta como a lista de caracteres do formato antigo: indexação,
+    atribuição, iteração e fatiamento (que devolve uma lista nova).
+    """
+    __slots__ = ('_celulas', '_inicio', '_colunas')
+
+    def __init__(self, celulas, inicio, colunas):
+        self._celulas = celulas
+        self._inicio = inicio
+        self._colunas = colunas
+
+    def __len__(self):
+        return self._colunas
+
+    def __getitem__(self, coluna):
+        if isinstance(coluna, slice):
+            return [chr(byte) for byte in self._celulas[self._inicio:self._inicio + self._colunas][coluna]]
+        if coluna < 0:
+            coluna += self._colunas
+        if not 0 <= coluna < self._colunas:
+            raise IndexError("coluna fora do tabuleiro")
+        return chr(self._celulas[self._inicio + coluna])
+
+    def __setitem__(self, coluna, caractere):
+        if coluna < 0:
+            coluna += self._colunas
+        if not 0 <= coluna < self._colunas:
+            raise IndexError("coluna fora do tabuleiro")
+        self._celulas[self._inicio + coluna] = ord(caractere)
+
+    def __iter__(self):
+        for byte in self._celulas[self._inicio:self._inicio + self._colunas]:
+            yield chr(byte)
+
+class Tabuleiro:
+    """
+    Tabuleiro compacto armazenado em um único buffer de bytes (um byte por célula).
+
+    A célula (linha, coluna) fica no índice plano linha * colunas + coluna, o que
+    permite verificar se uma posição é transitável em O(1) sem listas aninhadas.
+    O buffer pode ser um bytearray, um memoryview, um mmap, um array NumPy uint8
+    ou CelulasCompactadas (um bit por célula).
+    """
+    __slots__ = ('linhas', 'colunas', 'celulas')
+
+    def __init__(self, linhas, colunas, celulas=None):
+        """
+        Args:
+            linhas: Número de linhas do tabuleiro
+            colunas: Número de colunas do tabuleiro
+            celulas: Buffer com linhas * colunas bytes; se omitido, cria um
+                     tabuleiro totalmente livre
+        """
+        if celulas is None:
+            celulas = bytearray(b' ') * (linhas * colunas)
+        elif len(celulas) != linhas * colunas:
+            raise ValueError("o buffer não corresponde às dimensões do tabuleiro")
+        self.linhas = linhas
+        self.colunas = colunas
+        self.celulas = celulas
+
+    @classmethod
+    def de_lista(cls, matriz):
+        """
+        Converte o formato antigo (lista de listas de caracteres) para o compacto.
+
+        Args:
+            matriz: Matriz 2D de caracteres ' ' / 'X'
+
+        Returns:
+            Novo Tabuleiro com uma cópia das células
+        """
+        linhas, colunas, celulas = _celulas_da_lista(matriz)
+        return cls(linhas, colunas, bytearray(celulas))
+
+    def para_lista(self):
+        """
+        Converte o tabuleiro para o formato antigo (lista de listas de caracteres).
+
+        Returns:
+            Matriz 2D de caracteres
+        """
+        texto = bytes(self.celulas).decode('latin-1')
+        return [list(texto[inicio:inicio + self.colunas])
+                for inicio in range(0, self.linhas * self.colunas, self.colunas)]
+
+    def copiar(self):
+        """
+        Returns:
+            Novo Tabuleiro com uma cópia independente do buffer
+        """
+        return Tabuleiro(self.linhas, self.colunas, bytearray(bytes(self.celulas)))
+
+    def indice(self, linha, coluna):
+        """
+        Returns:
+            Índice plano (linha * colunas + coluna) da posição
+        """
+        return linha * self.colunas + coluna
+
+    def dentro(self, linha, coluna):
+        """
+        Returns:
+            Boolean indicando se a posição está dentro dos limites do tabuleiro
+        """
+        return 0 <= linha < self.linhas and 0 <= coluna < self.colunas
+
+    def livre(self, indice):
+        """
+        Verifica em O(1) se a célula de índice plano informado é transitável.
+
+        Returns:
+            Boolean indicando se a célula não é um obstáculo
+        """
+        return self.celulas[indice] != OBSTACULO
+
+    def linha(self, linha):
+        """
+        Returns:
+            memoryview (sem cópia) com os bytes da linha informada
+        """
+        inicio = linha * self.colunas
+        return memoryview(self.celulas)[inicio:inicio + self.colunas]
+
+    def como_array(self):
+        """
+        Expõe o buffer como um array NumPy (linhas, colunas) de uint8, sem cópia.
+
+        Returns:
+            numpy.ndarray que compartilha a memória do tabuleiro
+        """
+        if np is None:
+            raise ImportError("como_array() requer o NumPy instalado")
+        return np.frombuffer(self.celulas, dtype=np.uint8).reshape(self.linhas, self.colunas)
+
+    def __len__(self):
+        return self.linhas
+
+    def __getitem__(self, posicao):
+        # tabuleiro[linha, coluna] devolve o caractere; tabuleiro[linha] devolve
+        # uma visão da linha, compatível com o acesso tabuleiro[linha][coluna]
+        if isinstance(posicao, tuple):
+            linha, coluna = posicao
+            return chr(self.celulas[linha * self.colunas + coluna])
+        if posicao < 0:
+            posicao += self.linhas
+        if not 0 <= posicao < self.linhas:
+            raise IndexError("linha fora do tabuleiro")
+        return LinhaTabuleiro(self.celulas, posicao * self.colunas, self.colunas)
+
+    def __setitem__(self, posicao, caractere):
+        linha, coluna = posicao
+        self.celulas[linha * self.colunas + coluna] = ord(caractere)
+
+    def __iter__(self):
+        for linha in range(self.linhas):
+            yield LinhaTabuleiro(self.celulas, linha * self.colunas, self.colunas)
+
+    def __eq__(self, outro):
+        if not isinstance(outro, Tabuleiro):
+            return NotImplemented
+        return (self.linhas, self.colunas) == (outro.linhas, outro.colunas) and \
+            bytes(self.celulas) == bytes(outro.celulas)
+
+    def __repr__(self):
+        return f"Tabuleiro({self.linhas}x{self.colunas})"
+
+def _celulas_da_lista(matriz):
+    """
+    Serializa uma matriz de caracteres em bytes, uma célula por byte.
+
+    Returns:
+        Tupla (linhas, colunas, bytes)
+    """
+    linhas = len(matriz)
+    colunas = len(matriz[0]) if linhas else 0
+    try:
+        celulas = ''.join(map(''.join, matriz)).encode('latin-1')
+    except UnicodeEncodeError:
+        raise ValueError("as células do tabuleiro devem ser caracteres de um byte")
+    if len(celulas) != linhas * colunas:
+        raise ValueError("o tabuleiro deve ser retangular, com um caractere por célula")
+    return linhas, colunas, celulas
+
+def grade_plana(tabuleiro):
+    """
+    Obtém a representação plana usada pelos algoritmos de busca.
+
+    Para um Tabuleiro, devolve o próprio buffer (sem cópia); para o formato
+    antigo de lista de listas, serializa as células em um único bytes.
+
+    Args:
+        tabuleiro: Tabuleiro compacto ou matriz 2D de caracteres
+
+    Returns:
+        Tupla (linhas, colunas, celulas), onde celulas[linha * colunas + coluna]
+        é o código do caractere da célula
+    """
+    if isinstance(tabuleiro, Tabuleiro):
+        return tabuleiro.linhas, tabuleiro.colunas, tabuleiro.celulas
+    return _celulas_da_lista(tabuleiro)